@@ -0,0 +1,142 @@
+"""Pattern Compiler
+Turn (note, duration) patterns into ready-to-play number arrays, once
+
+A pattern like [('C5', 0.5), ('G4', 0.25)] is easy to read and write,
+but playing it means looking up every note name and working out every
+duration again on every repetition. The gumboot pattern is played over
+and over, so the same sums are done again and again.
+
+COMPILING does that work once. Each note becomes three numbers, stored
+in compact arrays (2-4 bytes each instead of a Python tuple):
+
+    frequency    Hz, 0 for a rest
+    on_ticks     how long the note sounds (tempo already applied)
+    off_ticks    the silence after it
+
+A tick is one millisecond, the step of the sequencer's timer. Compiled
+patterns are kept in a CACHE by (pattern, tempo, pause), so the second
+time a pattern is played it is found, not compiled again. The cache
+knows a pattern by the list itself, not by its notes, so looking it up
+costs the same for a long pattern as for a short one: build a new list
+(or call clear()) rather than changing a pattern that was played. Or
+keep the CompiledPattern and play that: it is not looked up at all.
+
+Usage:
+    compiler = PatternCompiler(NOTES, pause=0.1)
+    compiled = compiler.compile(gumboot_pattern, tempo=0.8)
+    compiled.freqs[0], compiled.on_ticks[0], compiled.off_ticks[0]   # 523 400 100
+    compiled.length_ticks                                            # Whole pattern
+
+Ubuntu Connection: Doing the hard work once leaves more time for everyone to play!
+"""
+
+from array import array
+
+# Milliseconds per tick (the sequencer's timer counts whole milliseconds)
+TICK_MS = 1
+
+# Silence after every note, as in pattern_music_maker.py (seconds)
+NOTE_PAUSE = 0.1
+
+# Compiled patterns kept; the oldest is dropped when it is full
+CACHE_SIZE = 32
+
+
+def to_ticks(seconds):
+    """Seconds as a whole number of ticks."""
+    return round(seconds * 1000 / TICK_MS)
+
+
+class CompiledPattern:
+    """A pattern as parallel arrays of frequency, on_ticks and off_ticks."""
+
+    __slots__ = ('freqs', 'on_ticks', 'off_ticks', 'length_ticks')
+
+    def __init__(self, freqs, on_ticks, off_ticks):
+        self.freqs = freqs
+        self.on_ticks = on_ticks
+        self.off_ticks = off_ticks
+        self.length_ticks = sum(on_ticks) + sum(off_ticks)
+
+    def __len__(self):
+        return len(self.freqs)
+
+
+def compile_pattern(pattern, notes, tempo=1.0, pause=NOTE_PAUSE):
+    """Compile a list of (note, duration in seconds) tuples.
+
+    Args:
+        pattern: List of (note, duration) tuples
+        notes: Note name -> frequency in Hz (0 = rest)
+        tempo: Duration multiplier (0.8 = faster, 1.2 = slower)
+        pause: Silence after every note, in seconds (not scaled by tempo)
+    """
+    count = len(pattern)
+    freqs = array('H', [0] * count)
+    on_ticks = array('I', [0] * count)
+    off_ticks = array('I', [to_ticks(pause)] * count)
+    for i in range(count):
+        note, duration = pattern[i]
+        freqs[i] = notes[note]
+        on_ticks[i] = to_ticks(duration * tempo)
+    return CompiledPattern(freqs, on_ticks, off_ticks)
+
+
+class PatternCompiler:
+    """Compiles patterns with one set of notes, remembering the results.
+
+    Args:
+        notes: Note name -> frequency in Hz
+        pause: Default silence after every note, in seconds
+        cache_size: Most compiled patterns to keep
+    """
+
+    def __init__(self, notes, pause=NOTE_PAUSE, cache_size=CACHE_SIZE):
+        self.notes = notes
+        self.pause = pause
+        self.cache_size = cache_size
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def compile(self, pattern, tempo=1.0, pause=None):
+        """The compiled pattern, from the cache when it was compiled before.
+
+        A CompiledPattern is passed straight through.
+        """
+        if isinstance(pattern, CompiledPattern):
+            return pattern
+        if pause is None:
+            pause = self.pause
+        key = (id(pattern), tempo, pause)    # The same list, not a copy of its notes
+        entry = self._cache.get(key)
+        if entry is None:
+            return self._store(key, compile_pattern(pattern, self.notes, tempo, pause), pattern)
+        self.hits += 1
+        return entry[1]
+
+    def rest(self, seconds):
+        """A compiled silence."""
+        key = ('rest', seconds)
+        entry = self._cache.get(key)
+        if entry is None:
+            return self._store(key, CompiledPattern(
+                array('H', [0]), array('I', [to_ticks(seconds)]), array('I', [0])))
+        self.hits += 1
+        return entry[1]
+
+    def _store(self, key, compiled, pattern=None):
+        self.misses += 1
+        if len(self._cache) >= self.cache_size:
+            del self._cache[next(iter(self._cache))]
+        # The pattern is kept with it, so its id() cannot be reused by another list
+        self._cache[key] = (pattern, compiled)
+        return compiled
+
+    def clear(self):
+        """Forget every compiled pattern (e.g. after changing the notes)."""
+        self._cache = {}
+
+    def stats(self):
+        """Return cache hits, misses and size."""
+        return {'hits': self.hits, 'misses': self.misses, 'cached': len(self._cache)}
@@ -13,16 +13,31 @@ Learning Objectives:
 Hardware Setup:
 - Raspberry Pi Pico
 - Passive buzzer connected to GPIO 15
+- Optional: second passive buzzer on GPIO 16, for two parts at once
 - Ground connection
 
+The patterns are played by a timer-driven sequencer (rhythm_sequencer.py),
+so the rhythm stays exactly on time however long the music plays.
+
 Ubuntu Connection: Music brings communities together!
 """
 
-from machine import Pin, PWM
-from time import sleep
+from pattern_tree import Repeat
+
+try:
+    from machine import Pin, PWM
+    PICO_AVAILABLE = True
+except ImportError:
+    # Running on a computer (e.g. rendering the patterns with pattern_renderer.py)
+    PICO_AVAILABLE = False
+
+if PICO_AVAILABLE:
+    # Outside the try: a missing or broken lib file must not look like "no Pico"
+    from rhythm_sequencer import RhythmSequencer
 
-# Setup buzzer on GPIO 15
-buzzer = PWM(Pin(15))
+# Setup buzzer on GPIO 15, and a second buzzer on GPIO 16 for playing together
+buzzer = PWM(Pin(15)) if PICO_AVAILABLE else None
+second_buzzer = PWM(Pin(16)) if PICO_AVAILABLE else None
 
 # Musical note frequencies (Hz)
 NOTES = {
@@ -42,30 +57,28 @@ BEAT_LONG = 0.5    # Quarter note
 BEAT_SHORT = 0.25   # Eighth note
 BEAT_PAUSE = 0.1    # Rest between notes
 
-def play_note(frequency, duration):
-    """Play a single note at given frequency for duration."""
-    if frequency > 0:
-        buzzer.freq(frequency)
-        buzzer.duty_u16(1000)  # Set volume (0-65535)
-        sleep(duration)
-    else:
-        sleep(duration)  # Rest/silence
-    
-    # Brief pause between notes
-    buzzer.duty_u16(0)
-    sleep(BEAT_PAUSE)
+# Plays queued patterns in the background, on an exact timeline
+# (voice 0 = GPIO 15, voice 1 = GPIO 16)
+sequencer = (RhythmSequencer([buzzer, second_buzzer], NOTES, pause=BEAT_PAUSE)
+             if PICO_AVAILABLE else None)
 
-def play_pattern(pattern, tempo=1.0):
+def play_pattern(pattern, tempo=1.0, name="pattern", gap=0):
     """Play a rhythm pattern (list of note-duration tuples).
     
+    The pattern is queued on the sequencer, which plays it on time from
+    a timer. This waits until the pattern has nearly finished, so the
+    next one can be queued to follow on without a gap.
+    
     Args:
         pattern: List of (note, duration) tuples
-        tempo: Speed multiplier (1.0 = normal, 0.5 = half speed, 2.0 = double speed)
+        tempo: Duration multiplier (1.0 = normal, 0.8 = faster, 1.2 = slower)
+        name: Name for the timing report
+        gap: Seconds of silence after the pattern
     """
-    print("Playing pattern...")
-    for note, duration in pattern:
-        adjusted_duration = duration * tempo
-        play_note(NOTES[note], adjusted_duration)
+    sequencer.play(pattern, tempo, name)
+    if gap:
+        sequencer.rest(gap)
+    sequencer.wait()
 
 # ========== TRADITIONAL RHYTHM PATTERNS ==========
 
@@ -115,6 +128,24 @@ clapping_pattern = [
     ('G4', BEAT_LONG),
 ]
 
+# ========== PLAYING TOGETHER ==========
+# Each part is a pattern tree (see pattern_tree.py): Repeat(3, ...) plays
+# its steps 3 times without writing them out 3 times. A step is
+# (pattern, tempo, name), or a rest in seconds.
+# Two parts play at the same time, one on each buzzer.
+
+# Mbube: the group starts its response before the leader has finished calling
+mbube_leader = Repeat(3, (call_pattern, 0.8, "call"), 0.6)
+mbube_group = Repeat(3, 0.6, (response_pattern, 0.8, "response"))
+
+# The clapping game, with the djembe bass underneath
+clapping_line = Repeat(4, (clapping_pattern, 1.2, "clapping"))
+djembe_bass = Repeat(3, (djembe_pattern, 1.0, "djembe"), 0.3)
+
+def play_together(*parts):
+    """Play parts at the same time, each on its own buzzer (waits until nearly done)."""
+    sequencer.perform(*parts)
+
 def demonstrate_patterns():
     """Demonstrate all traditional rhythm patterns."""
     print("\n=== SOUTH AFRICAN RHYTHM PATTERNS ===")
@@ -125,40 +156,45 @@ def demonstrate_patterns():
     print("   Pattern: SLAP-SLAP-tap-SLAP")
     for i in range(4):  # Repeat 4 times
         print(f"   Repetition {i+1}...")
-        play_pattern(gumboot_pattern)
-        sleep(0.5)
+        play_pattern(gumboot_pattern, name="gumboot", gap=0.5)
     
-    sleep(1.5)
+    sequencer.rest(1.5)
     
     # 2. Call and Response
     print("\n2. Mbube/Isicathamiya Call and Response")
     for i in range(3):  # 3 call-response cycles
         print(f"   Call {i+1}...")
-        play_pattern(call_pattern, tempo=0.8)
-        sleep(0.3)
+        play_pattern(call_pattern, tempo=0.8, name="call", gap=0.3)
         print(f"   Response {i+1}...")
-        play_pattern(response_pattern, tempo=0.8)
-        sleep(0.5)
+        play_pattern(response_pattern, tempo=0.8, name="response", gap=0.5)
     
-    sleep(1.5)
+    sequencer.rest(1.5)
     
     # 3. Djembe Drum
     print("\n3. Djembe Drum Pattern")
     print("   Pattern: BASS-tone-tone-BASS-slap-slap")
     for i in range(3):  # Repeat 3 times
         print(f"   Repetition {i+1}...")
-        play_pattern(djembe_pattern)
-        sleep(0.3)
+        play_pattern(djembe_pattern, name="djembe", gap=0.3)
     
-    sleep(1.5)
+    sequencer.rest(1.5)
     
     # 4. Children's Clapping Game
     print("\n4. Children's Clapping Game")
     print("   Simple pattern for Foundation Phase learners")
     for i in range(4):  # Repeat 4 times
         print(f"   Repetition {i+1}...")
-        play_pattern(clapping_pattern, tempo=1.2)
-        sleep(0.2)
+        play_pattern(clapping_pattern, tempo=1.2, name="clapping", gap=0.2)
+    
+    sequencer.rest(1.5)
+    
+    # 5. Playing Together (needs the second buzzer on GPIO 16)
+    print("\n5. Playing Together (two buzzers)")
+    print("   Call and response, overlapping like a real choir")
+    play_together(mbube_leader, mbube_group)
+    sequencer.rest(1.5)
+    print("   Djembe bass under the clapping game")
+    play_together(clapping_line, djembe_bass)
     
     print("\n=== DEMONSTRATION COMPLETE ===")
     print("Computational Thinking Concepts:")
@@ -191,8 +227,7 @@ def create_custom_pattern():
     
     for i in range(2):
         print(f"Playing your pattern... (repetition {i+1})")
-        play_pattern(custom_pattern)
-        sleep(0.5)
+        play_pattern(custom_pattern, name="custom", gap=0.5)
     
     print("\nWell done! You've created a unique rhythm!")
     print("Try changing the notes and durations to make your own pattern.")
@@ -205,28 +240,30 @@ def main():
     print("PATTERN MUSIC MAKER - Week 4")
     print("South African Rhythm Patterns")
     print("="*50)
+    if sequencer is None:
+        print("The buzzers need a Pico (or the host HAL)!")
+        return
     
     try:
         # Startup sound
-        play_note(NOTES['C4'], 0.1)
-        play_note(NOTES['G4'], 0.1)
-        play_note(NOTES['C5'], 0.2)
-        sleep(1)
+        play_pattern([('C4', 0.1), ('G4', 0.1), ('C5', 0.2)], name="startup", gap=1)
         
         # Demonstrate traditional patterns
         demonstrate_patterns()
         
-        sleep(2)
+        sequencer.rest(2)
         
         # Custom pattern exploration
         create_custom_pattern()
         
-        sleep(1)
+        sequencer.rest(1)
         
         # Closing sound
-        play_note(NOTES['C5'], 0.1)
-        play_note(NOTES['G4'], 0.1)
-        play_note(NOTES['C4'], 0.2)
+        play_pattern([('C5', 0.1), ('G4', 0.1), ('C4', 0.2)], name="closing")
+        sequencer.wait(0)
+        
+        # Timer-driven notes stay on the planned beat
+        sequencer.report()
         
         print("\n" + "="*50)
         print("Thank you for exploring SA musical patterns!")
@@ -236,9 +273,14 @@ def main():
     except KeyboardInterrupt:
         print("\nProgram stopped by user.")
     finally:
-        # Clean up - turn off buzzer
-        buzzer.duty_u16(0)
-        buzzer.deinit()
+        # Clean up - stop the music and turn off buzzer
+        if sequencer is not None:
+            sequencer.stop()
+        if buzzer is not None:
+            buzzer.duty_u16(0)
+            buzzer.deinit()
+        if second_buzzer is not None:
+            second_buzzer.deinit()
 
 # Run the program
 if __name__ == "__main__":
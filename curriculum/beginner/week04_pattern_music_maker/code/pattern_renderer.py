@@ -0,0 +1,302 @@
+"""Pattern Renderer - Week 4
+Turn rhythm patterns into WAV sound files (runs on a computer)
+
+Teachers can listen to the traditional patterns, and share them with
+learners, without a Pico or a buzzer. The renderer works out the sound
+the buzzer would make, number by number:
+
+- A buzzer driven by PWM is switched fully on for a short part of every
+  wave and off for the rest (duty_u16(1000) is on for 1000/65536 of each
+  wave). The renderer makes the same PULSE wave, so it sounds thin and
+  buzzy like the real thing.
+- An optional ENVELOPE shapes each note's loudness: 'soft' fades every
+  note in and out quickly so there are no clicks, 'drum' dies away like
+  a hand hitting a drum.
+- Notes are placed on the same timeline as the sequencer (see
+  pattern_compiler.py), so the file keeps exactly the same time.
+- Several VOICES (one per buzzer) are MIXED by adding their samples
+  together, so a call and its response can overlap, or a djembe bass
+  play under the clapping game.
+
+The sound is worked out and written in CHUNKS of a few thousand samples,
+so a ten-minute song needs no more memory than a ten-second one.
+
+With NumPy installed each chunk is computed in one vectorised step.
+Without NumPy the same samples are produced with a simple (slower) loop.
+
+Usage:
+    # Every pattern, plus the whole lesson (pattern_tree.py is in common/lib)
+    PYTHONPATH=../../../common/lib python pattern_renderer.py [folder]
+
+    renderer = PatternRenderer(NOTES, envelope='drum')
+    renderer.render("djembe.wav", Repeat(3, djembe_pattern))
+
+    render_voices("together.wav", [(PatternRenderer(NOTES), clapping_line),
+                                   (renderer, djembe_bass)])
+
+Ubuntu Connection: Sharing our rhythms means everyone can join in, even without a buzzer!
+"""
+
+import math
+import time
+import wave
+from array import array
+
+from pattern_compiler import CompiledPattern, PatternCompiler, TICK_MS
+from pattern_tree import Repeat, Section, Tempo, expand
+from pattern_music_maker import (
+    NOTES, BEAT_PAUSE,
+    gumboot_pattern, call_pattern, response_pattern, djembe_pattern, clapping_pattern,
+    mbube_leader, mbube_group, clapping_line, djembe_bass,
+)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Samples per second (22 050 is plenty for a buzzer and keeps files small)
+SAMPLE_RATE = 22050
+
+# Samples worked out and written at a time
+CHUNK = 4096
+
+# The sequencer's buzzer volume: on for DUTY_U16 / 65536 of each wave
+DUTY_U16 = 1000
+
+# Loudest sample, as a fraction of the WAV file's range
+AMPLITUDE = 0.5
+
+# Envelope name -> (fade in ms, fade out ms, die-away time in ms or None)
+ENVELOPES = {
+    'none': (0, 0, None),
+    'soft': (5, 15, None),
+    'drum': (1, 10, 120),
+}
+
+
+class PatternRenderer:
+    """Renders compiled patterns to 16-bit mono WAV files.
+
+    Args:
+        notes: Note name -> frequency in Hz
+        rate: Samples per second
+        duty_u16: PWM duty the buzzer is played at (sets the pulse width)
+        envelope: 'none', 'soft' or 'drum' (see ENVELOPES)
+        amplitude: Loudest sample, 0-1
+        pause: Silence after every note, in seconds
+    """
+
+    def __init__(self, notes, rate=SAMPLE_RATE, duty_u16=DUTY_U16, envelope='soft',
+                 amplitude=AMPLITUDE, pause=BEAT_PAUSE):
+        if envelope not in ENVELOPES:
+            raise ValueError(f"envelope must be one of {', '.join(ENVELOPES)}")
+        self.compiler = PatternCompiler(notes, pause)
+        self.rate = rate
+        self.duty = duty_u16 / 65536
+        self.envelope = ENVELOPES[envelope]
+        # A pulse wave without its average, so it swings around silence
+        # (the louder half reaches `amplitude`)
+        scale = amplitude * 32767 / max(self.duty, 1 - self.duty)
+        self.high = (1 - self.duty) * scale
+        self.low = -self.duty * scale
+
+    def segments(self, items):
+        """Yield (frequency, samples) for every note and silence in `items`.
+
+        `items` is a pattern tree (see pattern_tree.py) or a list of
+        steps, as for the sequencer: (pattern, tempo) pairs (a third
+        item, the name, is ignored), patterns, CompiledPatterns, or a
+        number of seconds of silence. Note starts are rounded from the
+        running tick count, so rounding never adds up over a long song.
+        """
+        ticks = 0
+        position = 0
+        samples_per_tick = self.rate * TICK_MS / 1000
+        if isinstance(items, (Repeat, Section, Tempo)):
+            stream = expand(items)
+        else:
+            stream = ((item, 1.0) for item in items)
+        for item, tempo in stream:
+            if isinstance(item, CompiledPattern):
+                compiled = item
+            elif isinstance(item, (int, float)):
+                compiled = self.compiler.rest(item)
+            elif isinstance(item, list):
+                compiled = self.compiler.compile(item, tempo)
+            else:
+                compiled = self.compiler.compile(item[0], tempo * (item[1] if len(item) > 1 else 1.0))
+            freqs, on_ticks, off_ticks = compiled.freqs, compiled.on_ticks, compiled.off_ticks
+            for i in range(len(freqs)):
+                for frequency, length in ((freqs[i], on_ticks[i]), (0, off_ticks[i])):
+                    ticks += length
+                    end = round(ticks * samples_per_tick)
+                    if end > position:
+                        yield frequency, end - position
+                        position = end
+
+    def chunks(self, items):
+        """Yield the samples of `items`, at most CHUNK at a time (int16 arrays)."""
+        for frequency, count in self.segments(items):
+            for start in range(0, count, CHUNK):
+                size = min(CHUNK, count - start)
+                if NUMPY_AVAILABLE:
+                    yield self._chunk_numpy(frequency, count, start, size)
+                else:
+                    yield self._chunk_python(frequency, count, start, size)
+
+    def _chunk_numpy(self, frequency, count, start, size):
+        if frequency <= 0:
+            return np.zeros(size, dtype=np.int16)
+        index = np.arange(start, start + size, dtype=np.float64)
+        phase = (index * (frequency / self.rate)) % 1.0
+        samples = np.where(phase < self.duty, self.high, self.low)
+        attack_ms, release_ms, decay_ms = self.envelope
+        if attack_ms or release_ms:
+            gain = np.ones(size)
+            if attack_ms:
+                np.minimum(gain, index / (attack_ms * self.rate / 1000), out=gain)
+            if release_ms:
+                np.minimum(gain, (count - index) / (release_ms * self.rate / 1000), out=gain)
+            samples *= gain
+        if decay_ms:
+            samples *= np.exp(index * (-1000 / (decay_ms * self.rate)))
+        return samples.astype(np.int16)
+
+    def _chunk_python(self, frequency, count, start, size):
+        samples = array('h', bytes(2 * size))
+        if frequency <= 0:
+            return samples
+        step = frequency / self.rate
+        attack_ms, release_ms, decay_ms = self.envelope
+        attack = attack_ms * self.rate / 1000
+        release = release_ms * self.rate / 1000
+        for k in range(size):
+            index = start + k
+            value = self.high if (index * step) % 1.0 < self.duty else self.low
+            if attack and index < attack:
+                value *= index / attack
+            if release and count - index < release:
+                value *= (count - index) / release
+            if decay_ms:
+                value *= math.exp(index * (-1000 / (decay_ms * self.rate)))
+            samples[k] = int(value)
+        return samples
+
+    def render(self, path, items):
+        """Write `items` (see segments()) to a WAV file. See render_voices()."""
+        return render_voices(path, [(self, items)])
+
+
+def _mixed_chunks(streams):
+    """Add chunk streams of different lengths together, CHUNK samples at a time."""
+    pieces = [None] * len(streams)   # Current chunk of each stream, and how much is used
+    used = [0] * len(streams)
+    while streams:
+        if NUMPY_AVAILABLE:
+            mixed = np.zeros(CHUNK, dtype=np.int32)
+        else:
+            mixed = array('i', bytes(4 * CHUNK))
+        longest = 0
+        for v in range(len(streams) - 1, -1, -1):
+            filled = 0
+            while filled < CHUNK:
+                if pieces[v] is None or used[v] == len(pieces[v]):
+                    pieces[v] = next(streams[v], None)
+                    used[v] = 0
+                    if pieces[v] is None:
+                        break
+                take = min(CHUNK - filled, len(pieces[v]) - used[v])
+                piece = pieces[v]
+                if NUMPY_AVAILABLE:
+                    mixed[filled:filled + take] += piece[used[v]:used[v] + take]
+                else:
+                    start = used[v]
+                    for k in range(take):
+                        mixed[filled + k] += piece[start + k]
+                filled += take
+                used[v] += take
+            longest = max(longest, filled)
+            if pieces[v] is None:
+                del streams[v], pieces[v], used[v]
+        if longest:
+            if NUMPY_AVAILABLE:
+                yield np.clip(mixed[:longest], -32768, 32767).astype(np.int16)
+            else:
+                yield array('h', [min(32767, max(-32768, value)) for value in mixed[:longest]])
+
+
+def render_voices(path, voices):
+    """Mix voices into one WAV file.
+
+    Args:
+        path: WAV file to write
+        voices: List of (PatternRenderer, items), one per buzzer; see
+            PatternRenderer.segments() for the items. Every renderer must
+            use the same sample rate.
+
+    Returns a dict with 'seconds' of sound, 'samples' and 'time_ms'
+    taken to render it.
+    """
+    started = time.monotonic()
+    rate = voices[0][0].rate
+    if any(renderer.rate != rate for renderer, _ in voices):
+        raise ValueError("all voices must use the same sample rate")
+    if len(voices) == 1:
+        chunks = voices[0][0].chunks(voices[0][1])
+    else:
+        chunks = _mixed_chunks([renderer.chunks(items) for renderer, items in voices])
+    samples = 0
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        for chunk in chunks:
+            wav.writeframes(chunk.tobytes())
+            samples += len(chunk)
+    return {
+        'seconds': samples / rate,
+        'samples': samples,
+        'time_ms': (time.monotonic() - started) * 1000,
+    }
+
+
+# The patterns in the order demonstrate_patterns() plays them
+LESSON = Section("lesson",
+    [('C4', 0.1), ('G4', 0.1), ('C5', 0.2)], 1,
+    Repeat(4, gumboot_pattern, 0.5), 1.5,
+    Tempo(0.8, Repeat(3, call_pattern, 0.3, response_pattern, 0.5)), 1.5,
+    Repeat(3, djembe_pattern, 0.3), 1.5,
+    Tempo(1.2, Repeat(4, clapping_pattern, 0.2)),
+)
+
+# File name -> [(pattern tree, envelope), ...], one per voice
+RECORDINGS = {
+    'gumboot.wav': [(Repeat(4, gumboot_pattern, 0.5), 'soft')],
+    'call_and_response.wav': [(Tempo(0.8, Repeat(3, call_pattern, 0.3, response_pattern, 0.5)), 'soft')],
+    'djembe.wav': [(Repeat(3, djembe_pattern, 0.3), 'drum')],
+    'clapping.wav': [(Tempo(1.2, Repeat(4, clapping_pattern, 0.2)), 'drum')],
+    'mbube_together.wav': [(mbube_leader, 'soft'), (mbube_group, 'soft')],
+    'clapping_and_djembe.wav': [(clapping_line, 'drum'), (djembe_bass, 'drum')],
+}
+
+
+def main(folder='.'):
+    """Render every pattern, and the whole lesson, into `folder`."""
+    print("🎵 Rendering South African rhythm patterns to WAV files")
+    if not NUMPY_AVAILABLE:
+        print("   (NumPy not installed: using the slower loop)")
+    total_ms = 0
+    jobs = list(RECORDINGS.items()) + [('lesson.wav', [(LESSON, 'soft')])]
+    for name, parts in jobs:
+        voices = [(PatternRenderer(NOTES, envelope=envelope), items) for items, envelope in parts]
+        result = render_voices(folder + '/' + name, voices)
+        total_ms += result['time_ms']
+        print(f"   {name}: {result['seconds']:.1f} s of sound in {result['time_ms']:.0f} ms")
+    print(f"✅ Done in {total_ms:.0f} ms. Ubuntu: share the rhythm!")
+
+
+if __name__ == "__main__":
+    import sys
+    main(sys.argv[1] if len(sys.argv) > 1 else '.')
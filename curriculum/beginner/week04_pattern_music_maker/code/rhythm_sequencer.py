@@ -0,0 +1,349 @@
+"""Rhythm Sequencer
+Play rhythm patterns on time, in the background, with a timer
+
+Playing a pattern with `sleep(duration)` after every note has two
+problems:
+
+1. Every sleep starts a little late (printing, Python itself), and the
+   small errors ADD UP: after a few minutes the rhythm has slowed down.
+2. The program can do nothing else while the music plays.
+
+The sequencer works like a conductor with a stopwatch that is never
+reset. Every note has a planned time from the START of the music
+("C5 on at 1 500 ms, off at 2 000 ms"), and a `machine.Timer` wakes it
+up at each planned time to switch the buzzer. A late wake-up does not
+move the notes after it, so errors never add up. Between wake-ups the
+main program is free: print, read buttons, light LEDs.
+
+Patterns are compiled to arrays of (frequency, on_ticks, off_ticks)
+before they are queued (see pattern_compiler.py), so a timer wake-up
+only reads three numbers; patterns played again come from the cache.
+
+Several buzzers can play at once, each one a VOICE with its own queue
+of patterns: a call and its response overlapping, a djembe bass under
+the clapping game. One timer serves every voice.
+
+Each played pattern reports its DRIFT: how far (in microseconds) its
+notes were from their planned time, measured from when the music
+started. It should stay below a millisecond, even after ten minutes.
+
+Usage:
+    sequencer = RhythmSequencer(PWM(Pin(15)), NOTES)
+    sequencer.play(gumboot_pattern, name="gumboot")   # Returns at once
+    sequencer.rest(0.5)
+    sequencer.wait()                                   # Until it is nearly done
+    sequencer.report()
+
+    duet = RhythmSequencer([PWM(Pin(15)), PWM(Pin(16))], NOTES)
+    duet.queue([(clapping_pattern, 1.2, "clapping")] * 4, voice=0)
+    duet.queue([(djembe_pattern, 1.0, "djembe")] * 3, voice=1)
+    duet.sync()                                        # Next parts start together
+
+    song = Repeat(8, Section("verse", (call_pattern, 0.8, "call"), 0.3))
+    sequencer.perform(song)                            # Long pieces, a few notes at a time
+
+Run this file on its own to play the djembe pattern for ten minutes and
+check the drift.
+
+Ubuntu Connection: Keeping time together is how a drum circle stays one circle!
+"""
+
+import time
+from machine import Timer, disable_irq, enable_irq
+from pattern_compiler import CompiledPattern, PatternCompiler, NOTE_PAUSE, TICK_MS
+from pattern_tree import Section, expand
+
+# Buzzer volume while a note sounds (0-65535)
+VOLUME = 1000
+
+# The first note starts this long after play(), so the timer is ready
+START_DELAY_MS = 5
+
+# wait() returns this long before the music runs out, leaving time to
+# queue what comes next without a gap
+LOOKAHEAD_MS = 50
+
+
+class _Voice:
+    """One buzzer and the patterns queued for it."""
+
+    def __init__(self, buzzer):
+        self.buzzer = buzzer
+        self.queue = []           # (name, CompiledPattern) waiting or playing, oldest first
+        self.index = 0            # Note of queue[0] playing next
+        self.sounding = False     # The next event switches the note off
+        self.at_ms = 0            # Planned time of the next event
+        self.end_ms = 0           # Planned time this voice's queued music ends
+
+
+class RhythmSequencer:
+    """Plays queued patterns on one or more PWM buzzers from timer callbacks.
+
+    Every buzzer is a VOICE with its own queue. One timer serves all the
+    voices: each wake-up switches whichever notes are due, then sleeps
+    until the next one, so an extra voice only adds its own notes.
+
+    Args:
+        buzzers: machine.PWM driving a passive buzzer, or a list of them
+        notes: Note name -> frequency in Hz
+        pause: Silence after every note, in seconds
+        volume: duty_u16 while a note sounds
+    """
+
+    def __init__(self, buzzers, notes, pause=NOTE_PAUSE, volume=VOLUME):
+        if not isinstance(buzzers, (list, tuple)):
+            buzzers = [buzzers]
+        self.voices = [_Voice(buzzer) for buzzer in buzzers]
+        self.compiler = PatternCompiler(notes, pause)
+        self.volume = volume
+        self._timer = Timer(-1)
+        self._running = False     # A timer callback is on its way
+        self._start_ms = 0        # ticks_ms() the music's planned times count from
+        self._start_us = None     # ticks_us() of the first event, measured
+        self.results = {}         # Pattern name -> timing (see report())
+
+    def play(self, pattern, tempo=1.0, name=None, voice=0):
+        """Queue a pattern of (note, duration) tuples, or a CompiledPattern. Returns at once."""
+        self._queue_compiled(self.voices[voice], self.compiler.compile(pattern, tempo), name)
+
+    def rest(self, seconds, voice=0):
+        """Queue a silence."""
+        self._queue_compiled(self.voices[voice], self.compiler.rest(seconds), None)
+
+    def queue(self, part, voice=0):
+        """Queue a whole part at once: a list of steps (see _queue_step())."""
+        for item in part:
+            self._queue_step(item, 1.0, voice)
+
+    def _queue_step(self, item, tempo, voice):
+        """Queue one step of a part.
+
+        A step is a rest in seconds, a pattern (list of (note, duration)),
+        a CompiledPattern, or (pattern, tempo, name), where the tempo and
+        name may be left out. `tempo` multiplies the step's own tempo;
+        rests are not scaled, like the pause after each note.
+        """
+        if isinstance(item, (int, float)):
+            self.rest(item, voice)
+        elif isinstance(item, (list, CompiledPattern)):
+            self.play(item, tempo, None, voice)
+        else:
+            self.play(item[0], tempo * (item[1] if len(item) > 1 else 1.0),
+                      item[2] if len(item) > 2 else None, voice)
+
+    def perform(self, *parts, on_section=None):
+        """Play pattern trees (see pattern_tree.py), one per voice, all starting together.
+
+        Steps are taken from each tree only shortly before they are
+        needed, so a piece of any length starts at once and uses no
+        more memory than a short one. `on_section(name)` is called as
+        each named Section is reached. Returns when the music is nearly
+        done, like wait().
+        """
+        if len(parts) > len(self.voices):
+            raise ValueError(f"one part per voice: {len(parts)} parts for {len(self.voices)} buzzer(s)")
+        self.sync()
+        feeds = [expand(part, marks=True) for part in parts]
+        while True:
+            next_ms = None
+            for v in range(len(feeds)):
+                voice = self.voices[v]
+                while feeds[v] is not None and voice.end_ms - self._elapsed_ms() < 2 * LOOKAHEAD_MS:
+                    step = next(feeds[v], None)
+                    if step is None:
+                        feeds[v] = None
+                    elif isinstance(step[0], Section):
+                        if on_section is not None:
+                            on_section(step[0].name)
+                    else:
+                        self._queue_step(step[0], step[1], v)
+                if feeds[v] is not None:
+                    ahead = voice.end_ms - self._elapsed_ms() - 2 * LOOKAHEAD_MS
+                    next_ms = ahead if next_ms is None else min(next_ms, ahead)
+            if next_ms is None:
+                break
+            time.sleep_ms(max(1, next_ms))
+        self.wait()
+
+    def _elapsed_ms(self):
+        """Planned time now: ms since the music's planned start."""
+        if self._start_us is None and not self._running:
+            return -START_DELAY_MS
+        return time.ticks_diff(time.ticks_ms(), self._start_ms)
+
+    def _queue_compiled(self, voice, compiled, name):
+        # The timer callback changes the same queues and times: keep it
+        # out until they are consistent again
+        state = disable_irq()
+        try:
+            if not self._running and self.remaining_ms() == 0:
+                # Nothing left to follow on from: start a new timeline
+                self._start_ms = time.ticks_add(time.ticks_ms(), START_DELAY_MS)
+                self._start_us = None
+                for other in self.voices:
+                    other.at_ms = other.end_ms = 0
+            elif not voice.queue:
+                elapsed = self._elapsed_ms()
+                if voice.end_ms <= elapsed:
+                    # This voice has been quiet: join the music now
+                    voice.at_ms = voice.end_ms = elapsed + START_DELAY_MS
+            voice.queue.append((name, compiled))
+            voice.end_ms += compiled.length_ticks * TICK_MS
+            if not self._running:
+                self._running = True
+                self._arm(time.ticks_diff(time.ticks_add(self._start_ms, voice.at_ms), time.ticks_ms()))
+            elif len(voice.queue) == 1:
+                # Its first note may be due before the timer wakes up: wake
+                # it now (the callback, not this program, plays the notes)
+                self._arm(1)
+        finally:
+            enable_irq(state)
+
+    def sync(self):
+        """Line the voices up: what is queued next on each voice starts together."""
+        elapsed = self._elapsed_ms()
+        for voice in self.voices:
+            if not voice.queue and voice.end_ms <= elapsed:
+                voice.at_ms = voice.end_ms = elapsed + START_DELAY_MS
+        together = 0
+        for voice in self.voices:
+            together = max(together, voice.end_ms)
+        for voice in self.voices:
+            if voice.end_ms < together:
+                self._queue_compiled(voice, self.compiler.rest((together - voice.end_ms) / 1000), None)
+
+    def _arm(self, wait_ms):
+        self._timer.init(mode=Timer.ONE_SHOT, period=max(1, wait_ms), callback=self._tick)
+
+    def _tick(self, timer=None):
+        """Timer callback: do every event that is due, then sleep until the next."""
+        while True:
+            voice = None
+            for other in self.voices:
+                if other.queue and (voice is None or other.at_ms < voice.at_ms):
+                    voice = other
+            if voice is None:
+                self._running = False
+                return
+            wait_ms = time.ticks_diff(time.ticks_add(self._start_ms, voice.at_ms), time.ticks_ms())
+            if wait_ms > 0:
+                self._arm(wait_ms)
+                return
+            self._event(voice)
+
+    def _event(self, voice):
+        name, compiled = voice.queue[0]
+        i = voice.index
+        now_us = time.ticks_us()
+        if self._start_us is None:
+            self._start_us = time.ticks_add(now_us, -voice.at_ms * 1000)
+        drift_us = time.ticks_diff(now_us, self._start_us) - voice.at_ms * 1000
+        if not voice.sounding:
+            frequency = compiled.freqs[i]
+            if frequency > 0:
+                voice.buzzer.freq(frequency)
+                voice.buzzer.duty_u16(self.volume)
+            voice.sounding = True
+            voice.at_ms += compiled.on_ticks[i] * TICK_MS
+        else:
+            voice.buzzer.duty_u16(0)
+            voice.sounding = False
+            voice.at_ms += compiled.off_ticks[i] * TICK_MS
+            voice.index = i = i + 1
+        if name is not None:
+            self._record(name, drift_us)
+        if i == len(compiled.freqs):
+            voice.queue.pop(0)
+            voice.index = 0
+            if name is not None:
+                self.results[name]['plays'] += 1
+
+    def _record(self, name, drift_us):
+        result = self.results.get(name)
+        if result is None:
+            result = self.results[name] = {'plays': 0, 'events': 0, 'drift_us': 0, 'worst_us': 0}
+        result['events'] += 1
+        result['drift_us'] = drift_us
+        if abs(drift_us) > abs(result['worst_us']):
+            result['worst_us'] = drift_us
+
+    def busy(self):
+        """True while queued notes are still to be played."""
+        for voice in self.voices:
+            if voice.queue:
+                return True
+        return False
+
+    def remaining_ms(self):
+        """Milliseconds until the queued music (with its last pause) ends."""
+        if self._start_us is None and not self._running:
+            return 0
+        end_ms = 0
+        for voice in self.voices:
+            end_ms = max(end_ms, voice.end_ms)
+        left = time.ticks_diff(time.ticks_add(self._start_ms, end_ms), time.ticks_ms())
+        return max(0, left)
+
+    def wait(self, lookahead_ms=LOOKAHEAD_MS):
+        """Sleep until the music is `lookahead_ms` from its end.
+
+        Queue the next pattern straight after, and it follows on exactly
+        in time. Use lookahead_ms=0 to wait for the very end.
+        """
+        while True:
+            left = self.remaining_ms() - lookahead_ms
+            if left <= 0 and (lookahead_ms or not self.busy()):
+                return
+            time.sleep_ms(max(1, left))
+
+    def stop(self):
+        """Silence the buzzers and forget the queued music."""
+        state = disable_irq()
+        try:
+            self._timer.deinit()
+            self._running = False
+            self._start_us = None
+            for voice in self.voices:
+                voice.queue = []
+                voice.index = 0
+                voice.sounding = False
+                voice.at_ms = voice.end_ms = 0
+                voice.buzzer.duty_u16(0)
+        finally:
+            enable_irq(state)
+
+    def report(self):
+        """Print the timing of every pattern played."""
+        print("\nTiming (drift from the planned time, in µs):")
+        for name, result in self.results.items():
+            print(f"   {name}: played {result['plays']}x, {result['events']} events, "
+                  f"last {result['drift_us']} µs, worst {result['worst_us']} µs")
+        stats = self.compiler.stats()
+        print(f"   Patterns compiled: {stats['misses']}, "
+              f"played again from the cache: {stats['hits']}")
+
+
+if __name__ == "__main__":
+    from machine import Pin, PWM
+
+    NOTES = {'C4': 262, 'F4': 349, 'G4': 392}
+    djembe_pattern = [('C4', 0.5), ('F4', 0.25), ('F4', 0.25),
+                      ('C4', 0.5), ('G4', 0.25), ('G4', 0.25)]
+
+    buzzer = PWM(Pin(15))
+    sequencer = RhythmSequencer(buzzer, NOTES)
+    djembe = sequencer.compiler.compile(djembe_pattern)   # Compile once, play many times
+    minutes = 10
+    print(f"🥁 Playing the djembe pattern for {minutes} minutes...")
+    started = time.ticks_ms()
+    try:
+        while time.ticks_diff(time.ticks_ms(), started) < minutes * 60_000:
+            sequencer.play(djembe, name="djembe")
+            sequencer.wait()
+        sequencer.wait(0)
+    except KeyboardInterrupt:
+        print("\nStopped early.")
+    finally:
+        sequencer.stop()
+        buzzer.deinit()
+    sequencer.report()
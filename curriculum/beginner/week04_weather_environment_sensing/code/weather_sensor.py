@@ -20,6 +20,11 @@ Hardware Requirements:
 import machine
 import time
 import dht
+from sampling_scheduler import Scheduler
+from adaptive_sampling import AdaptiveSampler
+from sensor_log import SensorLogWriter, FLAG_ALERT
+from sensor_cache import cached_reading, DHT11_MIN_INTERVAL_MS
+from stream_stats import TemperatureWatch, describe_alert
 
 # Pin Configuration
 SENSOR_PIN = 15  # DHT sensor data pin
@@ -37,8 +42,29 @@ led_hot = machine.Pin(LED_HOT_PIN, machine.Pin.OUT)
 COLD_THRESHOLD = 18
 WARM_THRESHOLD = 25
 
+# Binary data log (12 bytes per reading, written in blocks to save flash)
+LOG_FILE = "weather.log"
+LOG_MAX_RECORDS = 50000  # About 600 KB, then the log starts again
+data_logger = SensorLogWriter(LOG_FILE, max_records=LOG_MAX_RECORDS)
+
+# Task periods (in milliseconds) - fast while the weather changes,
+# slow while it is steady (see adaptive_sampling.py). The LEDs and the
+# report follow the sensor's period, just after each reading.
+SAMPLE_MIN_PERIOD_MS = 2000   # DHT11 allows at most 1 reading per second
+SAMPLE_MAX_PERIOD_MS = 60000  # Steady weather: one reading a minute
+TEMP_STEP = 1.5       # °C change worth reading faster (DHT11 shows whole degrees)
+HUMIDITY_STEP = 5     # % change worth reading faster
+
+# On battery: sleep the Pico between readings (USB serial stops while asleep)
+LOW_POWER = False
+
+@cached_reading(DHT11_MIN_INTERVAL_MS)  # Use DHT22_MIN_INTERVAL_MS for a DHT22
 def read_sensor():
-    """Read temperature and humidity from DHT sensor."""
+    """Read temperature and humidity from DHT sensor.
+    
+    The DHT sensor needs a rest between measurements, so calls within
+    DHT11_MIN_INTERVAL_MS share the last reading (see sensor_cache.py).
+    """
     try:
         sensor.measure()
         temp = sensor.temperature()
@@ -93,24 +119,35 @@ def display_reading(temp, humidity, status):
     else:
         print("❤️ It's hot! Stay hydrated and find shade.")
 
-def log_data(temp, humidity):
+def log_data(temp, humidity, flags=0):
     """
-    Log data for pattern analysis (simplified version).
-    In a full implementation, this would write to a file.
+    Log data for pattern analysis.
+    Each reading is saved to LOG_FILE as a small binary record
+    (see sensor_log.py) that can be analysed later on a computer.
     """
+    data_logger.append(time.time(), temp, humidity, flags=flags)
     timestamp = time.localtime()
     print(f"\nData logged at {timestamp[3]:02d}:{timestamp[4]:02d}:{timestamp[5]:02d}")
     print(f"Pattern observation: Temp={temp}°C, Humidity={humidity}%")
 
 def main():
     """
-    Main monitoring loop.
+    Main monitoring program.
+    
+    Each job is its own periodic task, so reading the sensor never
+    blocks the LEDs or the report (see sampling_scheduler.py). The
+    sensor task picks how often all three run: every 2 seconds while
+    the weather changes, up to once a minute while it is steady (see
+    adaptive_sampling.py).
     
     Computational Thinking:
     - Sequencing: Follow step-by-step monitoring process
     - Pattern Recognition: Identify temperature trends
     - Abstraction: Convert sensor data to meaningful indicators
     - Data Collection: Gather environmental information
+    - Decomposition: Split the program into small tasks (sensor, LEDs,
+      report) that take turns
+    - Feedback: Let the data decide how often to measure
     """
     print("\n" + "*"*50)
     print("🌍 WEATHER ENVIRONMENT SENSING - Week 4 🌍")
@@ -120,41 +157,74 @@ def main():
     print("Starting weather monitoring...")
     print("Press Ctrl+C to stop\n")
     
-    reading_count = 0
+    # Watches the temperature trend to warn about frost or heat early
+    temp_watch = TemperatureWatch()
     
-    try:
-        while True:
-            # Read sensor
-            temp, humidity = read_sensor()
+    # Reads often while the weather changes, rarely while it is steady
+    sampler = AdaptiveSampler(SAMPLE_MIN_PERIOD_MS, SAMPLE_MAX_PERIOD_MS)
+    sampler.watch('temp', step=TEMP_STEP)
+    sampler.watch('humidity', step=HUMIDITY_STEP)
+    
+    # Latest values shared between the tasks
+    state = {'temp': None, 'humidity': None, 'status': None, 'reading_count': 0}
+    
+    def read_climate():
+        # DHT sensors can only be read about once per second (DHT11)
+        state['temp'], state['humidity'] = read_sensor()
+        
+        # Choose when to read next; the LEDs and report keep in step
+        period = sampler.update(time.time(), temp=state['temp'], humidity=state['humidity'])
+        for task in scheduler.tasks:
+            task.period_ms = period
+    
+    def refresh_leds():
+        if state['temp'] is not None:
+            state['status'] = update_leds(state['temp'])
+    
+    def report():
+        temp, humidity = state['temp'], state['humidity']
+        if temp is not None and humidity is not None:
+            status = state['status'] or update_leds(temp)
+            
+            # Display information
+            display_reading(temp, humidity, status)
             
-            if temp is not None and humidity is not None:
-                # Update visual indicators
-                status = update_leds(temp)
-                
-                # Display information
-                display_reading(temp, humidity, status)
-                
-                # Log for pattern analysis
-                log_data(temp, humidity)
-                
-                reading_count += 1
-                print(f"\nTotal readings collected: {reading_count}")
-                
-                # Cultural connection
-                if reading_count % 5 == 0:
-                    print("\n🌟 Ubuntu Reflection:")
-                    print("We monitor our environment together.")
-                    print("Our actions affect everyone in our community.\n")
-            else:
-                print("Waiting for sensor to stabilize...")
+            # Early warnings from the temperature trend
+            alerts = temp_watch.update(time.time(), temp)
+            for alert in alerts:
+                print(describe_alert(alert))
             
-            # Wait before next reading (2 seconds)
-            time.sleep(2)
+            # Log for pattern analysis
+            log_data(temp, humidity, FLAG_ALERT if alerts else 0)
             
+            state['reading_count'] += 1
+            print(f"\nTotal readings collected: {state['reading_count']}")
+            
+            # Cultural connection
+            if state['reading_count'] % 5 == 0:
+                print("\n🌟 Ubuntu Reflection:")
+                print("We monitor our environment together.")
+                print("Our actions affect everyone in our community.\n")
+        else:
+            print("Waiting for sensor to stabilize...")
+    
+    scheduler = Scheduler(low_power=LOW_POWER)
+    scheduler.every("climate", sampler.period_ms, read_climate)
+    scheduler.every("leds", sampler.period_ms, refresh_leds, offset_ms=50)
+    scheduler.every("report", sampler.period_ms, report, offset_ms=100)
+    
+    try:
+        scheduler.run()
     except KeyboardInterrupt:
         print("\n\nMonitoring stopped.")
-        print(f"Total readings collected: {reading_count}")
+        print(f"Total readings collected: {state['reading_count']}")
+        scheduler.print_stats()
+        sampler.print_stats()
+        print(f"Readings saved in {LOG_FILE}: {len(data_logger)}")
         print("\n🌍 Remember: Caring for our environment is Ubuntu in action!")
+    finally:
+        # Save readings still waiting in memory, however the program stops
+        data_logger.close()
         
         # Turn off all LEDs
         led_cold.value(0)
@@ -0,0 +1,203 @@
+"""Distance Matrix
+Every distance between every pair of spaces, worked out once and kept
+
+Map questions like "which spaces are furthest apart?" or "plan a route
+through ten rooms" need MANY distances. Working each one out again with
+a Python loop is slow once a map has hundreds of spaces.
+
+`DistanceMatrix` keeps a table with one row and one column per space.
+The table is filled in one vectorised NumPy step the first time it is
+needed, then kept up to date:
+
+- adding a space fills in only its new row and column
+- moving a space recalculates only its row and column
+- removing a space closes up its row and column
+
+Two distances are available:
+- 'manhattan': grid steps (left/right plus up/down), like walking
+  along corridors
+- 'euclidean': straight line, "as the crow flies"
+
+Each table needs 4 bytes per pair: 1000 spaces = 4 MB, 3000 = 36 MB.
+Without NumPy (e.g. on a Pico) nothing is cached and each distance is
+calculated when asked for.
+
+Usage:
+    distances = DistanceMatrix()
+    distances.append(2, 2)
+    distances.append(7, 2)
+    distances.distance(0, 1)                  # 5.0
+    table = distances.matrix('euclidean')     # NumPy array, n x n
+"""
+
+import math
+from array import array
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+METRICS = ('manhattan', 'euclidean')
+
+# Starting room in the tables (grows by doubling)
+INITIAL_CAPACITY = 64
+
+
+def _check_metric(metric):
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {METRICS}")
+
+
+def _distance(dx, dy, metric):
+    if metric == 'manhattan':
+        return abs(dx) + abs(dy)
+    return math.sqrt(dx * dx + dy * dy)
+
+
+class DistanceMatrix:
+    """Cached all-pairs distances between points, updated one row at a time."""
+
+    def __init__(self):
+        self.xs = array('d')
+        self.ys = array('d')
+        self._tables = {}      # metric -> capacity x capacity float32 array
+        self.full_builds = 0   # Times a whole table was calculated
+        self.row_updates = 0   # Times one row and column were recalculated
+
+    def __len__(self):
+        return len(self.xs)
+
+    def _coords(self):
+        n = len(self.xs)
+        return (np.frombuffer(self.xs, dtype=np.float64, count=n),
+                np.frombuffer(self.ys, dtype=np.float64, count=n))
+
+    def _row(self, x, y, metric):
+        """Distances from (x, y) to every point, as one NumPy array."""
+        xs, ys = self._coords()
+        dx = xs - x
+        dy = ys - y
+        if metric == 'manhattan':
+            return np.abs(dx) + np.abs(dy)
+        return np.hypot(dx, dy)
+
+    def _update(self, i):
+        """Recalculate row and column i of every cached table."""
+        for metric, table in self._tables.items():
+            row = self._row(self.xs[i], self.ys[i], metric)
+            n = len(row)
+            table[i, :n] = row
+            table[:n, i] = row
+        if self._tables:
+            self.row_updates += 1
+
+    def _table(self, metric):
+        """The cached table for `metric`, calculated in one pass if needed."""
+        _check_metric(metric)
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("distance tables need NumPy (pip install numpy)")
+        table = self._tables.get(metric)
+        if table is None:
+            n = len(self.xs)
+            capacity = max(INITIAL_CAPACITY, n)
+            table = np.zeros((capacity, capacity), dtype=np.float32)
+            xs, ys = self._coords()
+            dx = xs[:, None] - xs[None, :]
+            dy = ys[:, None] - ys[None, :]
+            if metric == 'manhattan':
+                table[:n, :n] = np.abs(dx) + np.abs(dy)
+            else:
+                table[:n, :n] = np.hypot(dx, dy)
+            self._tables[metric] = table
+            self.full_builds += 1
+        return table
+
+    def append(self, x, y):
+        """Add a point and return its number."""
+        self.xs.append(x)
+        self.ys.append(y)
+        n = len(self.xs)
+        for metric, table in list(self._tables.items()):
+            if n > table.shape[0]:
+                # Out of room: double the table, keeping what we have
+                bigger = np.zeros((2 * table.shape[0],) * 2, dtype=np.float32)
+                bigger[:n - 1, :n - 1] = table[:n - 1, :n - 1]
+                self._tables[metric] = bigger
+        self._update(n - 1)
+        return n - 1
+
+    def move(self, i, x, y):
+        """Move point i to (x, y)."""
+        self.xs[i] = x
+        self.ys[i] = y
+        self._update(i)
+
+    def remove(self, i):
+        """Remove point i. Later points move up one number."""
+        n = len(self.xs)
+        if not 0 <= i < n:
+            raise IndexError(i)
+        del self.xs[i]
+        del self.ys[i]
+        for table in self._tables.values():
+            # NumPy copies safely even though the slices overlap
+            table[i:n - 1, :n] = table[i + 1:n, :n]
+            table[:n - 1, i:n - 1] = table[:n - 1, i + 1:n]
+
+    def clear(self):
+        self.xs = array('d')
+        self.ys = array('d')
+        self._tables = {}
+
+    def distance(self, i, j, metric='manhattan'):
+        """Distance between points i and j.
+
+        Uses the cached table if there is one; a single distance never
+        builds a whole table.
+        """
+        _check_metric(metric)
+        table = self._tables.get(metric)
+        if table is not None:
+            return float(table[i, j])
+        return float(_distance(self.xs[i] - self.xs[j], self.ys[i] - self.ys[j], metric))
+
+    def matrix(self, metric='manhattan'):
+        """The n x n table of distances (read-only NumPy view)."""
+        n = len(self.xs)
+        view = self._table(metric)[:n, :n]
+        view.flags.writeable = False
+        return view
+
+    def row(self, i, metric='manhattan'):
+        """Distances from point i to every point."""
+        if not NUMPY_AVAILABLE:
+            return [self.distance(i, j, metric) for j in range(len(self.xs))]
+        return self.matrix(metric)[i]
+
+    def sub_table(self, points, metric='manhattan'):
+        """Distances between the listed points only, as a list of lists.
+
+        Row k holds the distances from points[k]. Uses the cached table
+        if there is one; otherwise only these points are calculated.
+        """
+        _check_metric(metric)
+        if not NUMPY_AVAILABLE:
+            return [[self.distance(i, j, metric) for j in points] for i in points]
+        rows = np.asarray(points, dtype=np.intp)
+        table = self._tables.get(metric)
+        if table is not None:
+            return table[np.ix_(rows, rows)].tolist()
+        xs, ys = self._coords()
+        dx = xs[rows][:, None] - xs[rows][None, :]
+        dy = ys[rows][:, None] - ys[rows][None, :]
+        if metric == 'manhattan':
+            return (np.abs(dx) + np.abs(dy)).tolist()
+        return np.hypot(dx, dy).tolist()
+
+    def lookup(self, rows, cols, metric='manhattan'):
+        """Distances for many pairs at once: rows[k] to cols[k]."""
+        if not NUMPY_AVAILABLE:
+            return [self.distance(i, j, metric) for i, j in zip(rows, cols)]
+        return self.matrix(metric)[np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)]
@@ -0,0 +1,145 @@
+"""Distance Sensor
+Measure how far away things are with an HC-SR04 ultrasonic sensor
+
+The HC-SR04 works like a bat. A short TRIGGER pulse makes it send out a
+click of sound too high for us to hear. When the echo comes back, the
+ECHO pin has been high for exactly as long as the sound took to get
+there and back. Sound travels about 343 metres per second at 20 °C, so
+every 58 microseconds of echo means 1 cm to the object.
+
+Timing the echo well matters:
+
+- `machine.time_pulse_us` times the pulse in the firmware (C code) to
+  the microsecond, instead of a slow Python loop reading the pin over
+  and over.
+- Every wait has a TIMEOUT. When no echo comes back (nothing in range,
+  a soft curtain, a loose wire) the reading is skipped instead of the
+  program freezing.
+- One ping can be wrong: an echo off the ceiling or a passing learner.
+  `measure()` takes a BURST of pings and keeps the MEDIAN (the middle
+  value), so a few wrong echoes cannot move the answer.
+- Warm air carries sound faster. Pass the temperature from the weather
+  station for better distances.
+
+Wiring (the HC-SR04 needs 5 V, the Pico's pins are 3.3 V):
+    VCC  -> VBUS (5 V)          GND  -> GND
+    TRIG -> GP14                ECHO -> GP15 through a 1 kΩ / 2 kΩ divider
+
+On a computer the host HAL simulates the sensor (see common/host).
+
+Usage:
+    sensor = DistanceSensor()
+    distance = sensor.measure()          # cm, or None if no good echoes
+    print(sensor.stats())
+
+Ubuntu Connection: Measuring carefully means our map is fair to everyone!
+"""
+
+import time
+import machine
+
+TRIGGER_PIN = 14  # Starts a ping
+ECHO_PIN = 15     # High while the echo is on its way (use a divider!)
+
+# The sensor's working range in cm
+MIN_CM = 2
+MAX_CM = 400
+
+# Echoes of one ping must die down before the next one (datasheet: 60 ms)
+PING_GAP_MS = 60
+
+# Pings per measure(); odd, so the median is a real reading
+BURST = 5
+
+
+def sound_speed_cm_per_us(temperature_c=20.0):
+    """Speed of sound in air, in cm per microsecond."""
+    return (331.3 + 0.606 * temperature_c) / 10000
+
+
+def median(values):
+    """The middle value (the average of the two middle values for an even count)."""
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+class DistanceSensor:
+    """HC-SR04 ultrasonic distance sensor.
+
+    Args:
+        trigger_pin: GPIO connected to TRIG
+        echo_pin: GPIO connected to ECHO (through a voltage divider)
+        max_cm: Furthest distance to wait for; sets the echo timeout
+        temperature_c: Air temperature, for the speed of sound
+    """
+
+    def __init__(self, trigger_pin=TRIGGER_PIN, echo_pin=ECHO_PIN,
+                 max_cm=MAX_CM, temperature_c=20.0):
+        self.trigger = machine.Pin(trigger_pin, machine.Pin.OUT, value=0)
+        self.echo = machine.Pin(echo_pin, machine.Pin.IN)
+        self.max_cm = max_cm
+        self.set_temperature(temperature_c)
+        self.pings = 0
+        self.timeouts = 0
+        self.out_of_range = 0
+        self.measurements = 0
+        self.failed = 0
+
+    def set_temperature(self, temperature_c):
+        """Use a new air temperature (e.g. from the DHT sensor)."""
+        self.cm_per_us = sound_speed_cm_per_us(temperature_c)
+        # Longest echo worth waiting for: to max_cm and back, plus 10 %
+        self.timeout_us = int(2 * self.max_cm / self.cm_per_us * 1.1)
+
+    def ping_us(self):
+        """Send one ping and return the echo length in µs (negative on timeout)."""
+        self.trigger.value(0)
+        time.sleep_us(2)
+        self.trigger.value(1)     # 10 µs pulse starts a ping
+        time.sleep_us(10)
+        self.trigger.value(0)
+        self.pings += 1
+        return machine.time_pulse_us(self.echo, 1, self.timeout_us)
+
+    def read_cm(self):
+        """One ping in cm, or None when the echo is lost or out of range."""
+        echo_us = self.ping_us()
+        if echo_us < 0:
+            self.timeouts += 1
+            return None
+        distance = echo_us * self.cm_per_us / 2   # There and back
+        if not MIN_CM <= distance <= self.max_cm:
+            self.out_of_range += 1
+            return None
+        return distance
+
+    def measure(self, samples=BURST, gap_ms=PING_GAP_MS):
+        """Median distance in cm of a burst of pings.
+
+        Returns None when fewer than half of the pings got a good echo.
+        """
+        readings = []
+        for i in range(samples):
+            if i:
+                time.sleep_ms(gap_ms)
+            distance = self.read_cm()
+            if distance is not None:
+                readings.append(distance)
+        self.measurements += 1
+        if len(readings) * 2 < samples:
+            self.failed += 1
+            return None
+        return round(median(readings), 1)
+
+    def stats(self):
+        """Return ping and measurement counts."""
+        return {
+            'pings': self.pings,
+            'timeouts': self.timeouts,
+            'out_of_range': self.out_of_range,
+            'measurements': self.measurements,
+            'failed': self.failed,
+        }
@@ -0,0 +1,246 @@
+"""Map File
+Save big school maps in tiles, and load only the tiles you need
+
+Saving a whole map as one file means reading ALL of it back every time,
+even to look at one corner, and holding all of it in RAM. A district
+map with thousands of spaces would take seconds to open on a Pico and
+might not fit at all.
+
+A map is saved as a FOLDER instead:
+
+    mymap/
+        index          which tiles exist, the map size and space types
+                       (small JSON text, read when the map is opened)
+        t_0_0          spaces, walls and painted areas of the tile at column 0, row 0
+        t_1_0          ...
+
+The grid is cut into square TILES of `tile_size` x `tile_size` cells,
+like pages of a map book. A tile is only read when something needs
+it (drawing part of the map, a nearby-spaces question), and saving only
+rewrites the tiles that changed since the last save.
+
+Tile file format (little-endian):
+
+    offset  size  field
+    0       4     magic "SAMT"
+    4       1     version
+    5       1     flags: 1 = a terrain block follows the spaces,
+                  2 = an area block follows (after the terrain)
+    6       2     number of spaces
+    then, per space:
+            4     space number (its number in the whole map)
+            2     x
+            2     y
+            1     type code (position in the index's type list)
+            1     name length in bytes
+            n     name (UTF-8)
+    then, if flagged: one cost byte per cell of the tile, row by row
+    (0 = wall, 1 = open, see pathfinding.py)
+    then, if flagged: one byte per cell of the tile, row by row, for
+    painted areas (0 = not painted, else type code + 1, see regions.py)
+
+Each space keeps its number in the tile, so "space 7" is the same space
+whichever tiles happen to be read first.
+
+Each file is written under a temporary name and then renamed, so a
+power cut during a save leaves the old tile in place.
+
+Usage:
+    map_file = MapFile("mymap")
+    map_file.create(grid_size=200, tile_size=32)
+    map_file.write_tile(0, 0, [(0, "Library", 2, 5, "library")], None)
+    map_file.save_index()
+    spaces, terrain, areas = map_file.read_tile(0, 0)
+"""
+
+import json
+import struct
+
+try:
+    import os
+except ImportError:
+    import uos as os  # Older MicroPython firmware
+
+MAGIC = b'SAMT'
+VERSION = 2
+TILE_HEADER_FORMAT = '<4sBBH'
+TILE_HEADER_SIZE = struct.calcsize(TILE_HEADER_FORMAT)  # 8 bytes
+SPACE_FORMAT = '<IhhBB'
+SPACE_SIZE = struct.calcsize(SPACE_FORMAT)  # 10 bytes + name
+
+# Tile flags: which blocks follow the spaces
+HAS_TERRAIN = 1
+HAS_AREAS = 2
+
+INDEX_NAME = 'index'
+INDEX_FORMAT = 'sam-map'
+
+# 32 x 32 cells: a classroom map is one tile, a 1000 x 1000 district
+# about 1000 tiles, and a tile's walls take 1 KB
+DEFAULT_TILE_SIZE = 32
+
+
+def _exists(path):
+    try:
+        os.stat(path)
+        return True
+    except OSError:
+        return False
+
+
+def _replace(temp_path, path):
+    """Rename temp_path to path, replacing it (MicroPython's rename won't overwrite)."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    os.rename(temp_path, path)
+
+
+class MapFile:
+    """A tiled map folder: an index plus one file per tile.
+
+    Args:
+        path: Folder name (created by create())
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.grid_size = 0
+        self.tile_size = DEFAULT_TILE_SIZE
+        self.types = []          # Type code -> type name
+        self._type_codes = {}    # Type name -> type code
+        self.tiles = {}          # (tile_x, tile_y) -> number of spaces in it
+        self.tiles_read = 0
+        self.tiles_written = 0
+
+    def exists(self):
+        return _exists(self.path + '/' + INDEX_NAME)
+
+    def create(self, grid_size, tile_size=DEFAULT_TILE_SIZE):
+        """Start an empty map in the folder (old tiles are removed)."""
+        if not _exists(self.path):
+            os.mkdir(self.path)
+        for name in os.listdir(self.path):
+            if name.startswith('t_'):
+                os.remove(self.path + '/' + name)
+        self.grid_size = grid_size
+        self.tile_size = tile_size
+        self.types = []
+        self._type_codes = {}
+        self.tiles = {}
+        self.save_index()
+
+    def open(self):
+        """Read the index. Tiles are read later, one at a time."""
+        with open(self.path + '/' + INDEX_NAME) as f:
+            index = json.load(f)
+        if index.get('format') != INDEX_FORMAT or index.get('version') != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} SAM map")
+        self.grid_size = index['grid_size']
+        self.tile_size = index['tile_size']
+        self.types = list(index['types'])
+        self._type_codes = {name: code for code, name in enumerate(self.types)}
+        self.tiles = {}
+        for key, count in index['tiles'].items():
+            tile_x, tile_y = key.split(',')
+            self.tiles[(int(tile_x), int(tile_y))] = count
+
+    def save_index(self):
+        index = {
+            'format': INDEX_FORMAT,
+            'version': VERSION,
+            'grid_size': self.grid_size,
+            'tile_size': self.tile_size,
+            'types': self.types,
+            'tiles': {f"{tx},{ty}": count for (tx, ty), count in self.tiles.items()},
+        }
+        temp_path = self.path + '/' + INDEX_NAME + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(index, f)
+        _replace(temp_path, self.path + '/' + INDEX_NAME)
+
+    def tile_of(self, x, y):
+        """(tile_x, tile_y) of the tile holding cell (x, y)."""
+        return x // self.tile_size, y // self.tile_size
+
+    def tile_rect(self, tile_x, tile_y):
+        """Cells covered by a tile as (x0, y0, x1, y1), clipped to the map."""
+        x0, y0 = tile_x * self.tile_size, tile_y * self.tile_size
+        return (x0, y0,
+                min(x0 + self.tile_size, self.grid_size) - 1,
+                min(y0 + self.tile_size, self.grid_size) - 1)
+
+    def tiles_in(self, x0, y0, x1, y1):
+        """Saved tiles that overlap the rectangle (corners included)."""
+        tx0, ty0 = self.tile_of(min(x0, x1), min(y0, y1))
+        tx1, ty1 = self.tile_of(max(x0, x1), max(y0, y1))
+        if (tx1 - tx0 + 1) * (ty1 - ty0 + 1) > len(self.tiles):
+            return [t for t in self.tiles if tx0 <= t[0] <= tx1 and ty0 <= t[1] <= ty1]
+        return [(tx, ty) for ty in range(ty0, ty1 + 1) for tx in range(tx0, tx1 + 1)
+                if (tx, ty) in self.tiles]
+
+    def _tile_path(self, tile_x, tile_y):
+        return f"{self.path}/t_{tile_x}_{tile_y}"
+
+    def type_code(self, space_type):
+        """The code for `space_type` in this map, adding it if it is new."""
+        code = self._type_codes.get(space_type)
+        if code is None:
+            code = len(self.types)
+            if code > 255:
+                raise ValueError("too many space types (at most 256)")
+            self._type_codes[space_type] = code
+            self.types.append(space_type)
+        return code
+
+    def read_tile(self, tile_x, tile_y):
+        """Spaces [(number, name, x, y, type), ...], terrain and area bytes (or None) of one tile."""
+        with open(self._tile_path(tile_x, tile_y), 'rb') as f:
+            magic, version, flags, count = struct.unpack(
+                TILE_HEADER_FORMAT, f.read(TILE_HEADER_SIZE))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"tile {tile_x},{tile_y} of {self.path} is damaged")
+            spaces = []
+            for _ in range(count):
+                number, x, y, code, name_length = struct.unpack(SPACE_FORMAT, f.read(SPACE_SIZE))
+                name = f.read(name_length).decode('utf-8')
+                spaces.append((number, name, x, y, self.types[code]))
+            x0, y0, x1, y1 = self.tile_rect(tile_x, tile_y)
+            cells = (x1 - x0 + 1) * (y1 - y0 + 1)
+            terrain = f.read(cells) if flags & HAS_TERRAIN else None
+            areas = f.read(cells) if flags & HAS_AREAS else None
+        self.tiles_read += 1
+        return spaces, terrain, areas
+
+    def write_tile(self, tile_x, tile_y, spaces, terrain, areas=None):
+        """Save one tile. An empty tile (no spaces, terrain or areas) is deleted.
+
+        `spaces` is [(number, name, x, y, type), ...]; `areas` holds one
+        byte per cell, 0 or this map's type code + 1 (see type_code()).
+        """
+        path = self._tile_path(tile_x, tile_y)
+        if not spaces and terrain is None and areas is None:
+            if self.tiles.pop((tile_x, tile_y), None) is not None:
+                os.remove(path)
+            return
+        flags = (0 if terrain is None else HAS_TERRAIN) | (0 if areas is None else HAS_AREAS)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(struct.pack(TILE_HEADER_FORMAT, MAGIC, VERSION, flags, len(spaces)))
+            for number, name, x, y, space_type in spaces:
+                # At most 255 bytes, cut between letters (not inside one)
+                name = name.encode('utf-8')[:255].decode('utf-8', 'ignore').encode('utf-8')
+                f.write(struct.pack(SPACE_FORMAT, number, x, y, self.type_code(space_type), len(name)))
+                f.write(name)
+            if terrain is not None:
+                f.write(terrain)
+            if areas is not None:
+                f.write(areas)
+        _replace(temp_path, path)
+        self.tiles[(tile_x, tile_y)] = len(spaces)
+        self.tiles_written += 1
+
+    def space_count(self):
+        """Spaces in the whole saved map, read from the index."""
+        return sum(self.tiles.values())
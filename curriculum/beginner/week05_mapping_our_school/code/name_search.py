@@ -0,0 +1,259 @@
+"""Name Search
+Find spaces by the first few letters of any of their names
+
+Looking a space up by its exact English key ("library") is hard for
+learners who think "Biblioteek" or "Umtapo", or who are still typing.
+A PREFIX TREE (a "trie") finds every name that starts with the letters
+typed so far:
+
+    b ─ i ─ b ─ l ─ i ─ o ─ t ─ e ─ e ─ k    -> library
+    │   └ l ─ ...
+    └ a ─ ...
+
+Each letter typed moves one step down the tree, so a search-as-you-type
+box never has to check every name again: `PrefixSearch` remembers where
+it is and only takes one step per key press.
+
+Names are FOLDED before they go in or are looked up: capitals become
+small letters and accents are dropped ("Kantoor", "KANTOOR" and
+"kantóór" are all "kantoor"), apostrophes are dropped, and every other
+gap between words becomes one space. Every word of a name is indexed, so
+"lib" finds "School Library".
+
+Items can be anything; SchoolMapper stores space numbers (ints) and
+space types (strings such as "library").
+
+Usage:
+    index = PrefixIndex()
+    index.add("Biblioteek", "library")
+    index.add("School Library", 3)
+    index.find("bib")                 # ["library"]
+
+    search = PrefixSearch(index)      # Search as you type
+    search.type("li")
+    search.results()                  # [3]
+    search.backspace()
+
+Ubuntu Connection: Everyone can find their way, in their own language!
+"""
+
+try:
+    import unicodedata  # Not on the Pico, which uses the table below
+except ImportError:
+    unicodedata = None
+
+# Accented letters used in Afrikaans, isiZulu loan words and names,
+# for when unicodedata is not available
+_PLAIN = {}
+for _plain, _accented in (
+        ('a', 'àáâäãåÀÁÂÄÃÅ'), ('e', 'èéêëÈÉÊË'), ('i', 'ìíîïÌÍÎÏ'),
+        ('o', 'òóôöõøÒÓÔÖÕØ'), ('u', 'ùúûüÙÚÛÜ'), ('y', 'ýÿÝ'),
+        ('c', 'çÇ'), ('n', 'ñÑŉ')):
+    for _letter in _accented:
+        _PLAIN[_letter] = _plain
+
+# Dropped without leaving a gap ("Principal's" -> "principals")
+_SILENT = "'’`"
+
+# Key in a tree node holding the items whose name ends there
+_END = ''
+
+
+def fold_letter(letter):
+    """A letter as it is stored: small, without accents.
+
+    Returns '' for letters that are dropped and ' ' for word gaps.
+    """
+    if letter in _SILENT:
+        return ''
+    # Before isalpha(): on the Pico that is only True for a-z and A-Z
+    plain = _PLAIN.get(letter)
+    if plain:
+        return plain
+    if letter.isalpha() or letter.isdigit():
+        if unicodedata is not None and ord(letter) > 127:
+            decomposed = unicodedata.normalize('NFKD', letter)
+            letter = ''.join(c for c in decomposed if not unicodedata.combining(c))
+        return letter.lower()
+    return ' '
+
+
+def fold(text):
+    """Text as it is stored: folded letters, words separated by single spaces."""
+    letters = []
+    for letter in text:
+        letter = fold_letter(letter)
+        if letter == ' ' and (not letters or letters[-1] == ' '):
+            continue
+        letters.append(letter)
+    return ''.join(letters).strip()
+
+
+def _keys(text):
+    """The folded name, and the name from the start of each later word."""
+    folded = fold(text)
+    keys = [folded] if folded else []
+    i = folded.find(' ')
+    while i != -1:
+        keys.append(folded[i + 1:])
+        i = folded.find(' ', i + 1)
+    return keys
+
+
+class PrefixIndex:
+    """Prefix tree of names, each leading to one or more items."""
+
+    def __init__(self):
+        self.root = {}
+        self.count = 0     # Names added (not counting extra word keys)
+
+    def add(self, name, item):
+        """Make `item` findable by `name` and by every word in it."""
+        for key in _keys(name):
+            node = self.root
+            for letter in key:
+                child = node.get(letter)
+                if child is None:
+                    child = node[letter] = {}
+                node = child
+            items = node.get(_END)
+            if items is None:
+                node[_END] = [item]
+            else:
+                items.append(item)
+        self.count += 1
+
+    def remove(self, name, item):
+        """Forget that `name` leads to `item`. Empty branches are pruned."""
+        for key in _keys(name):
+            path = [self.root]
+            for letter in key:
+                node = path[-1].get(letter)
+                if node is None:
+                    break
+                path.append(node)
+            else:
+                items = path[-1].get(_END)
+                if items and item in items:
+                    items.remove(item)
+                    if not items:
+                        del path[-1][_END]
+                    # Prune letters that now lead nowhere
+                    for depth in range(len(key), 0, -1):
+                        if path[depth]:
+                            break
+                        del path[depth - 1][key[depth - 1]]
+        self.count -= 1
+
+    def renumber_after(self, removed):
+        """After space `removed` is deleted, shift later space numbers down by one.
+
+        Takes one pass over the whole tree, so remove spaces in batches
+        where possible on very large maps.
+        """
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            for letter, child in node.items():
+                if letter == _END:
+                    for k, item in enumerate(child):
+                        if isinstance(item, int) and item > removed:
+                            child[k] = item - 1
+                else:
+                    stack.append(child)
+
+    def node(self, prefix):
+        """The tree node reached by a folded prefix, or None."""
+        node = self.root
+        for letter in prefix:
+            node = node.get(letter)
+            if node is None:
+                return None
+        return node
+
+    def items(self, node):
+        """Yield the items below a node, shortest names first, each item once.
+
+        Stop reading whenever you have enough: the rest of the tree is
+        never visited.
+        """
+        if node is None:
+            return
+        seen = set()
+        level = [node]
+        while level:
+            # One letter deeper each time round, so shorter names come first
+            deeper = []
+            for node in level:
+                for letter, child in node.items():
+                    if letter == _END:
+                        for item in child:
+                            if item not in seen:
+                                seen.add(item)
+                                yield item
+                    else:
+                        deeper.append(child)
+            level = deeper
+
+    def collect(self, node, limit=None):
+        """Up to `limit` items below a node, shortest names first."""
+        found = []
+        for item in self.items(node):
+            found.append(item)
+            if limit is not None and len(found) >= limit:
+                break
+        return found
+
+    def find(self, prefix, limit=None):
+        """Items with a name (or a word in it) starting with `prefix`."""
+        return self.collect(self.node(fold(prefix)), limit)
+
+
+class PrefixSearch:
+    """Search as you type: one step down the tree per letter.
+
+    Args:
+        index: The PrefixIndex to search
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.clear()
+
+    def clear(self):
+        self.text = ''
+        self.folded = ''
+        self._added = []             # Folded letters added for each typed letter
+        self._path = [self.index.root]
+
+    def type(self, text):
+        """Add letters to the search."""
+        for letter in text:
+            folded = fold_letter(letter)
+            node = self._path[-1]
+            if folded == ' ' and (not self.folded or self.folded[-1] == ' '):
+                folded = ''          # Gaps at the start or twice in a row count once
+            if folded and node is not None:
+                node = node.get(folded)
+            self.text += letter
+            self.folded += folded
+            self._added.append(folded)
+            self._path.append(node)
+
+    def backspace(self):
+        """Remove the last letter typed."""
+        if self._added:
+            self.text = self.text[:-1]
+            self.folded = self.folded[:len(self.folded) - len(self._added.pop())]
+            self._path.pop()
+
+    @property
+    def node(self):
+        """Tree node for what has been typed (None if nothing matches)."""
+        return self._path[-1]
+
+    def results(self, limit=10):
+        """Items matching what has been typed so far."""
+        if not self.folded.strip():
+            return []
+        return self.index.collect(self._path[-1], limit)
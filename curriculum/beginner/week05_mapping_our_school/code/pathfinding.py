@@ -0,0 +1,291 @@
+"""Pathfinding
+Find a walking route between two places on the school grid
+
+Counting grid steps assumes we can walk straight through walls. Real
+schools have walls, fences and locked gates, and some ground is slower
+to cross (sand, long grass, stairs). This module finds real routes:
+
+- Terrain: the walking cost of every cell. 0 means "can't pass" (a
+  wall), 1 is an open corridor, bigger numbers are slower ground.
+- BFS (breadth-first search): spreads out one step at a time like a
+  ripple in a pond. Finds the route with the fewest steps, ignoring
+  slow ground.
+- Dijkstra: like BFS, but always grows the cheapest route so far, so it
+  finds the quickest route over slow ground too.
+- A* ("A star"): Dijkstra plus a hint - the grid distance still to go
+  (Manhattan distance). It heads towards the goal first, so it looks at
+  far fewer cells and still finds the quickest route.
+
+Moves are up, down, left and right. Cells are numbered y * width + x
+and costs live in one bytearray, so a 1000 x 1000 campus needs 1 MB.
+
+`PathCache` remembers recent routes (least recently used are dropped
+first) and forgets them all as soon as the terrain changes.
+
+Usage:
+    terrain = Terrain(10, 10)
+    terrain.fill(4, 0, 4, 8, WALL)            # A wall with a gap at the bottom
+    route = find_path(terrain, (2, 2), (7, 2))
+    print(route['steps'], route['path'])
+
+Ubuntu Connection: A good path gets everyone there together!
+"""
+
+import heapq
+from array import array
+from collections import deque, OrderedDict
+
+WALL = 0
+OPEN = 1
+MAX_COST = 255
+
+METHODS = ('astar', 'dijkstra', 'bfs')
+
+_UNSEEN = 0x7FFFFFFF
+
+
+class Terrain:
+    """Walking cost of every cell in a width x height grid.
+
+    Args:
+        width, height: Grid size in cells
+        default_cost: Cost of every cell to start with (OPEN)
+    """
+
+    def __init__(self, width, height, default_cost=OPEN):
+        if width <= 0 or height <= 0:
+            raise ValueError("width and height must be positive")
+        self.width = width
+        self.height = height
+        self.cost = bytearray([default_cost]) * (width * height)
+        self.version = 0   # Goes up on every change, so caches know
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def get(self, x, y):
+        """Cost of cell (x, y); WALL (0) means it cannot be entered."""
+        return self.cost[y * self.width + x]
+
+    def passable(self, x, y):
+        return self.in_bounds(x, y) and self.cost[y * self.width + x] != WALL
+
+    def set(self, x, y, cost):
+        """Set the cost of one cell (0 = wall, 1 = open, up to 255 = very slow)."""
+        if not 0 <= cost <= MAX_COST:
+            raise ValueError("cost must be between 0 and 255")
+        if not self.in_bounds(x, y):
+            raise IndexError("cell is outside the grid")
+        self.cost[y * self.width + x] = cost
+        self.version += 1
+
+    def fill(self, x0, y0, x1, y1, cost):
+        """Set the cost of every cell in a rectangle (corners included)."""
+        if not 0 <= cost <= MAX_COST:
+            raise ValueError("cost must be between 0 and 255")
+        x0, x1 = max(0, min(x0, x1)), min(self.width - 1, max(x0, x1))
+        y0, y1 = max(0, min(y0, y1)), min(self.height - 1, max(y0, y1))
+        if x0 > x1 or y0 > y1:
+            return
+        row = bytes([cost]) * (x1 - x0 + 1)
+        for y in range(y0, y1 + 1):
+            start = y * self.width + x0
+            self.cost[start:start + len(row)] = row
+        self.version += 1
+
+    def read_block(self, x0, y0, x1, y1):
+        """Costs of the rectangle (corners included, inside the grid) as bytes, row by row."""
+        width = x1 - x0 + 1
+        return b''.join(bytes(self.cost[y * self.width + x0:y * self.width + x0 + width])
+                        for y in range(y0, y1 + 1))
+
+    def write_block(self, x0, y0, x1, y1, data):
+        """Set the costs of a rectangle from bytes made by read_block()."""
+        width = x1 - x0 + 1
+        for row, y in enumerate(range(y0, y1 + 1)):
+            start = y * self.width + x0
+            self.cost[start:start + width] = data[row * width:(row + 1) * width]
+        self.version += 1
+
+    def walls(self, x0=0, y0=0, x1=None, y1=None):
+        """(x, y) of every wall cell, or only those in a rectangle (corners included)."""
+        width, cost = self.width, self.cost
+        x1 = width - 1 if x1 is None else min(x1, width - 1)
+        y1 = self.height - 1 if y1 is None else min(y1, self.height - 1)
+        x0, y0 = max(0, x0), max(0, y0)
+        found = []
+        if x0 > x1:
+            return found
+        for y in range(y0, y1 + 1):
+            # find() scans the row in C, so open ground costs almost nothing
+            end = y * width + x1 + 1
+            i = cost.find(WALL, y * width + x0, end)
+            while i != -1:
+                found.append((i - y * width, y))
+                i = cost.find(WALL, i + 1, end)
+        return found
+
+
+def _neighbours(i, width, size):
+    """Cell numbers next to cell i (up, down, left, right) inside the grid."""
+    x = i % width
+    if i >= width:
+        yield i - width
+    if i + width < size:
+        yield i + width
+    if x > 0:
+        yield i - 1
+    if x < width - 1:
+        yield i + 1
+
+
+def _build_route(came_from, start, goal, width, cost, method, expanded):
+    path = []
+    i = goal
+    while i != start:
+        path.append((i % width, i // width))
+        i = came_from[i]
+    path.append((start % width, start // width))
+    path.reverse()
+    return {
+        'path': path,
+        'steps': len(path) - 1,
+        'cost': cost,
+        'method': method,
+        'expanded': expanded,
+    }
+
+
+def _bfs(terrain, start, goal):
+    width, size, costs = terrain.width, len(terrain.cost), terrain.cost
+    came_from = array('i', [-1]) * size
+    came_from[start] = start
+    queue = deque((), size)
+    queue.append(start)
+    expanded = 0
+    while queue:
+        i = queue.popleft()
+        expanded += 1
+        if i == goal:
+            # Cost of the route actually walked (BFS only counts steps)
+            total = 0
+            j = goal
+            while j != start:
+                total += costs[j]
+                j = came_from[j]
+            return came_from, total, expanded
+        for j in _neighbours(i, width, size):
+            if came_from[j] == -1 and costs[j] != WALL:
+                came_from[j] = i
+                queue.append(j)
+    return None, None, expanded
+
+
+def _best_first(terrain, start, goal, use_heuristic):
+    """Dijkstra, or A* when use_heuristic is True."""
+    width, size, costs = terrain.width, len(terrain.cost), terrain.cost
+    gx, gy = goal % width, goal // width
+    came_from = array('i', [-1]) * size
+    best = array('i', [_UNSEEN]) * size
+    best[start] = 0
+    came_from[start] = start
+    heap = [(0, 0, 0, start)]
+    expanded = 0
+    while heap:
+        _, _, g, i = heapq.heappop(heap)
+        if g > best[i]:
+            continue   # An old entry: a cheaper way here was found later
+        expanded += 1
+        if i == goal:
+            return came_from, g, expanded
+        x = i % width
+        # Neighbours inlined (up, down, left, right): this loop is the hot spot
+        for j in (i - width if i >= width else -1,
+                  i + width if i + width < size else -1,
+                  i - 1 if x > 0 else -1,
+                  i + 1 if x < width - 1 else -1):
+            if j < 0:
+                continue
+            step = costs[j]
+            if step == WALL:
+                continue
+            new_g = g + step
+            if new_g < best[j]:
+                best[j] = new_g
+                came_from[j] = i
+                if use_heuristic:
+                    # Every step costs at least 1, so this never overestimates
+                    h = abs(j % width - gx) + abs(j // width - gy)
+                else:
+                    h = 0
+                # Equal totals: try the cell closest to the goal first, so
+                # open ground is crossed in a straight line
+                heapq.heappush(heap, (new_g + h, h, new_g, j))
+    return None, None, expanded
+
+
+def find_path(terrain, start, goal, method='astar'):
+    """Find a route from `start` to `goal` (both (x, y) cells).
+
+    Returns a dict with 'path' (list of (x, y) cells, start and goal
+    included), 'steps', 'cost', 'method' and 'expanded' (cells looked
+    at), or None when walls block every route.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+    for x, y in (start, goal):
+        if not terrain.in_bounds(x, y):
+            raise ValueError(f"({x}, {y}) is outside the {terrain.width} x {terrain.height} grid")
+        if terrain.get(x, y) == WALL:
+            return None
+    width = terrain.width
+    s = start[1] * width + start[0]
+    g = goal[1] * width + goal[0]
+    if method == 'bfs':
+        came_from, cost, expanded = _bfs(terrain, s, g)
+    else:
+        came_from, cost, expanded = _best_first(terrain, s, g, method == 'astar')
+    if came_from is None:
+        return None
+    return _build_route(came_from, s, g, width, cost, method, expanded)
+
+
+class PathCache:
+    """Recently found routes, forgotten when the terrain changes.
+
+    Args:
+        terrain: The Terrain the routes were found on
+        maxsize: Routes to keep; the least recently used is dropped first
+    """
+
+    def __init__(self, terrain, maxsize=128):
+        self.terrain = terrain
+        self.maxsize = maxsize
+        self._routes = OrderedDict()
+        self._version = terrain.version
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._routes)
+
+    def clear(self):
+        self._routes = OrderedDict()
+        self._version = self.terrain.version
+
+    def find(self, start, goal, method='astar'):
+        """Like find_path(), but reuses a cached route when it can."""
+        if self._version != self.terrain.version:
+            self.clear()
+        key = (tuple(start), tuple(goal), method)
+        if key in self._routes:
+            self.hits += 1
+            route = self._routes.pop(key)
+            self._routes[key] = route   # Now the most recently used
+            return route
+        self.misses += 1
+        route = find_path(self.terrain, start, goal, method)
+        self._routes[key] = route
+        if len(self._routes) > self.maxsize:
+            self._routes.pop(next(iter(self._routes)))
+        return route
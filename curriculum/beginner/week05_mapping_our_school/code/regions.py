@@ -0,0 +1,384 @@
+"""Regions
+Paint the areas of the school and let the computer find each room
+
+A space on the map is one point, but a classroom, a playground or a
+corridor covers many grid cells. Here every cell can be PAINTED with a
+kind of area (a small number, 0 = not painted). Touching cells (up,
+down, left or right) painted with the same kind form one REGION - one
+room, one field, one corridor - and each region knows its area, its
+centre point (centroid) and which regions it touches.
+
+Working regions out from scratch after every brush stroke would mean
+visiting every cell of a 1000 x 1000 campus each time. Instead:
+
+- Painting a cell joins it to the regions of its painted neighbours.
+  When a cell touches two regions of the same kind they MERGE. Merges
+  use "union-find": the smaller region just points at the bigger one,
+  so no cells are relabelled.
+- Erasing a cell can cut a region in two. The region is only marked to
+  be CHECKED; the next question about regions re-labels just that
+  region's cells (a flood fill over its bounding box), however many
+  cells were erased in between.
+- Which regions touch (the adjacency graph) is remembered per region
+  and forgotten only for regions next to a change.
+
+Usage:
+    areas = RegionMap(20, 10)
+    areas.paint_rect(0, 0, 4, 4, 1)           # A classroom
+    areas.paint_rect(5, 0, 5, 9, 2)           # A corridor
+    room = areas.region_at(2, 2)
+    areas.info(room)                          # {'kind': 1, 'area': 25, 'centroid': (2.0, 2.0), ...}
+    areas.neighbours(room)                    # {<corridor region>}
+
+Ubuntu Connection: Every room is its own place, and every room is joined to the others!
+"""
+
+from array import array
+
+NOT_PAINTED = 0
+
+# Positions in a region's stats list
+_KIND, _AREA, _SUM_X, _SUM_Y, _MIN_X, _MIN_Y, _MAX_X, _MAX_Y = range(8)
+
+
+class RegionMap:
+    """Painted grid cells, grouped into connected regions.
+
+    Args:
+        width, height: Grid size in cells
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.kinds = bytearray(width * height)           # Painted kind per cell
+        self.labels = array('i', [0]) * (width * height)  # Region id per cell (0 = none)
+        self._parent = {}       # Region id -> id it was merged into
+        self._stats = {}        # Live region id -> [kind, area, sum_x, sum_y, bounding box]
+        self._dirty = set()     # Regions that lost cells and may have split
+        self._touching = {}     # Region id -> remembered neighbouring region ids
+        self._next_id = 1
+        self.merges = 0
+        self.splits = 0
+        self.relabelled = 0     # Cells re-labelled while checking for splits
+
+    def _find(self, region):
+        """The live region a (possibly merged) region id belongs to."""
+        parent = self._parent
+        while region in parent:
+            up = parent[region]
+            if up in parent:
+                parent[region] = parent[up]   # Path halving keeps chains short
+            region = parent[region]
+        return region
+
+    def _cell_neighbours(self, i):
+        width = self.width
+        if i >= width:
+            yield i - width
+        if i + width < len(self.kinds):
+            yield i + width
+        x = i % width
+        if x > 0:
+            yield i - 1
+        if x < width - 1:
+            yield i + 1
+
+    def _forget_touching(self, i):
+        """Adjacency of the regions at and around cell i is out of date."""
+        for j in (i,) + tuple(self._cell_neighbours(i)):
+            if self.labels[j]:
+                self._touching.pop(self._find(self.labels[j]), None)
+
+    def kind_at(self, x, y):
+        return self.kinds[y * self.width + x]
+
+    def paint(self, x, y, kind):
+        """Paint one cell (kind 0 erases it)."""
+        if not 0 <= kind <= 255:
+            raise ValueError("kind must be between 0 and 255")
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError("cell is outside the grid")
+        i = y * self.width + x
+        if self.kinds[i] == kind:
+            return
+        self._forget_touching(i)
+        if self.kinds[i] != NOT_PAINTED:
+            self._take(i, x, y)
+        self.kinds[i] = kind
+        if kind != NOT_PAINTED:
+            self._give(i, x, y, kind)
+        self._forget_touching(i)
+
+    def paint_rect(self, x0, y0, x1, y1, kind):
+        """Paint every cell in a rectangle (corners included, clipped to the grid).
+
+        The rectangle becomes one region in a single step, joined to
+        same-kind regions along its edges, instead of cell by cell.
+        """
+        if not 0 <= kind <= 255:
+            raise ValueError("kind must be between 0 and 255")
+        x0, x1 = max(0, min(x0, x1)), min(self.width - 1, max(x0, x1))
+        y0, y1 = max(0, min(y0, y1)), min(self.height - 1, max(y0, y1))
+        if x0 > x1 or y0 > y1:
+            return
+        width, kinds, labels = self.width, self.kinds, self.labels
+        columns = x1 - x0 + 1
+        empty = bytes(columns)
+
+        # Take painted cells out of their old regions, a region at a time
+        lost = {}   # region -> [cells, sum_x, sum_y]
+        for y in range(y0, y1 + 1):
+            start = y * width + x0
+            if kinds[start:start + columns] == empty:
+                continue
+            for i in range(start, start + columns):
+                if kinds[i]:
+                    region = self._find(labels[i])
+                    taken = lost.get(region)
+                    if taken is None:
+                        taken = lost[region] = [0, 0, 0]
+                    taken[0] += 1
+                    taken[1] += i - y * width
+                    taken[2] += y
+        for region, (cells, sum_x, sum_y) in lost.items():
+            self._touching.pop(region, None)
+            stats = self._stats[region]
+            stats[_AREA] -= cells
+            stats[_SUM_X] -= sum_x
+            stats[_SUM_Y] -= sum_y
+            if stats[_AREA] == 0:
+                del self._stats[region]
+                self._dirty.discard(region)
+            else:
+                self._dirty.add(region)
+
+        # Paint and label the whole rectangle
+        row_kind = bytes([kind]) * columns
+        if kind == NOT_PAINTED:
+            region = 0
+        else:
+            region = self._next_id
+            self._next_id += 1
+            cells = columns * (y1 - y0 + 1)
+            self._stats[region] = [kind, cells,
+                                   (x0 + x1) * cells // 2, (y0 + y1) * cells // 2,
+                                   x0, y0, x1, y1]
+        row_label = array('i', [region]) * columns
+        for y in range(y0, y1 + 1):
+            start = y * width + x0
+            kinds[start:start + columns] = row_kind
+            labels[start:start + columns] = row_label
+
+        # Regions along the edges now touch something new
+        edge = []
+        if y0 > 0:
+            edge.extend(range((y0 - 1) * width + x0, (y0 - 1) * width + x1 + 1))
+        if y1 < self.height - 1:
+            edge.extend(range((y1 + 1) * width + x0, (y1 + 1) * width + x1 + 1))
+        if x0 > 0:
+            edge.extend(range(y0 * width + x0 - 1, (y1 + 1) * width, width))
+        if x1 < width - 1:
+            edge.extend(range(y0 * width + x1 + 1, (y1 + 1) * width, width))
+        joins = []
+        for i in edge:
+            if labels[i]:
+                other = self._find(labels[i])
+                self._touching.pop(other, None)
+                if kinds[i] == kind and other not in joins:
+                    joins.append(other)
+        if joins:
+            self._merge([region] + joins)
+
+    def read_block(self, x0, y0, x1, y1):
+        """Painted kinds of the rectangle (corners included, inside the grid) as bytes, row by row."""
+        width = x1 - x0 + 1
+        return b''.join(bytes(self.kinds[y * self.width + x0:y * self.width + x0 + width])
+                        for y in range(y0, y1 + 1))
+
+    def write_block(self, x0, y0, x1, y1, data):
+        """Paint a rectangle from bytes made by read_block(), a run of one kind at a time."""
+        width = x1 - x0 + 1
+        for row, y in enumerate(range(y0, y1 + 1)):
+            line = data[row * width:(row + 1) * width]
+            start = 0
+            while start < width:
+                end = start + 1
+                while end < width and line[end] == line[start]:
+                    end += 1
+                self.paint_rect(x0 + start, y, x0 + end - 1, y, line[start])
+                start = end
+
+    def _take(self, i, x, y):
+        """Remove cell i from its region."""
+        region = self._find(self.labels[i])
+        stats = self._stats[region]
+        stats[_AREA] -= 1
+        stats[_SUM_X] -= x
+        stats[_SUM_Y] -= y
+        self.labels[i] = 0
+        if stats[_AREA] == 0:
+            del self._stats[region]
+            self._dirty.discard(region)
+            self._touching.pop(region, None)
+        else:
+            self._dirty.add(region)   # Might be cut in two; checked when asked
+
+    def _give(self, i, x, y, kind):
+        """Add cell i to the region of its same-kind neighbours, merging them."""
+        roots = []
+        for j in self._cell_neighbours(i):
+            if self.kinds[j] == kind and self.labels[j]:
+                root = self._find(self.labels[j])
+                if root not in roots:
+                    roots.append(root)
+        if not roots:
+            region = self._next_id
+            self._next_id += 1
+            self._stats[region] = [kind, 0, 0, 0, x, y, x, y]
+        else:
+            region = self._merge(roots)
+        stats = self._stats[region]
+        stats[_AREA] += 1
+        stats[_SUM_X] += x
+        stats[_SUM_Y] += y
+        stats[_MIN_X] = min(stats[_MIN_X], x)
+        stats[_MIN_Y] = min(stats[_MIN_Y], y)
+        stats[_MAX_X] = max(stats[_MAX_X], x)
+        stats[_MAX_Y] = max(stats[_MAX_Y], y)
+        self.labels[i] = region
+
+    def _merge(self, roots):
+        """Join regions of the same kind. Returns the id they all share now."""
+        # Keep the biggest region; the others point at it
+        region = max(roots, key=lambda r: self._stats[r][_AREA])
+        keep = self._stats[region]
+        for other in roots:
+            if other == region:
+                continue
+            merged = self._stats.pop(other)
+            keep[_AREA] += merged[_AREA]
+            keep[_SUM_X] += merged[_SUM_X]
+            keep[_SUM_Y] += merged[_SUM_Y]
+            keep[_MIN_X] = min(keep[_MIN_X], merged[_MIN_X])
+            keep[_MIN_Y] = min(keep[_MIN_Y], merged[_MIN_Y])
+            keep[_MAX_X] = max(keep[_MAX_X], merged[_MAX_X])
+            keep[_MAX_Y] = max(keep[_MAX_Y], merged[_MAX_Y])
+            self._parent[other] = region
+            self._touching.pop(other, None)
+            if other in self._dirty:
+                self._dirty.discard(other)
+                self._dirty.add(region)
+            self.merges += 1
+        self._touching.pop(region, None)
+        return region
+
+    def _refresh(self):
+        """Re-label every region that lost cells, splitting any that came apart."""
+        while self._dirty:
+            self._split(self._dirty.pop())
+
+    def _split(self, region):
+        stats = self._stats.get(region)
+        if stats is None:
+            return
+        kind, width = stats[_KIND], self.width
+        kinds, labels = self.kinds, self.labels
+        mark = bytes([kind])
+
+        # Every cell still in the region: same kind inside its bounding box
+        cells = set()
+        for y in range(stats[_MIN_Y], stats[_MAX_Y] + 1):
+            row_start = y * width
+            end = row_start + stats[_MAX_X] + 1
+            i = kinds.find(mark, row_start + stats[_MIN_X], end)
+            while i != -1:
+                if labels[i] and self._find(labels[i]) == region:
+                    cells.add(i)
+                i = kinds.find(mark, i + 1, end)
+        self.relabelled += len(cells)
+
+        # Flood fill the pieces; the first keeps the region's id
+        pieces = []
+        while cells:
+            start = cells.pop()
+            piece = [start]
+            k = 0
+            while k < len(piece):
+                for j in self._cell_neighbours(piece[k]):
+                    if j in cells:
+                        cells.remove(j)
+                        piece.append(j)
+                k += 1
+            pieces.append(piece)
+
+        del self._stats[region]
+        self._touching.pop(region, None)
+        if len(pieces) > 1:
+            self.splits += 1
+            # Regions next to the old one may now touch a new piece instead
+            for other, touching in list(self._touching.items()):
+                if any(self._find(r) == region for r in touching):
+                    del self._touching[other]
+        for n, piece in enumerate(pieces):
+            if n == 0:
+                new = region
+            else:
+                new = self._next_id
+                self._next_id += 1
+            xs = [i % width for i in piece]
+            ys = [i // width for i in piece]
+            self._stats[new] = [kind, len(piece), sum(xs), sum(ys),
+                                min(xs), min(ys), max(xs), max(ys)]
+            for i in piece:
+                labels[i] = new
+
+    def region_at(self, x, y):
+        """Region id of the cell at (x, y), or None if it is not painted."""
+        self._refresh()
+        label = self.labels[y * self.width + x]
+        return self._find(label) if label else None
+
+    def regions(self):
+        """Ids of every region."""
+        self._refresh()
+        return list(self._stats)
+
+    def info(self, region):
+        """Kind, area (cells), centroid (x, y) and bounding box of a region."""
+        self._refresh()
+        stats = self._stats[self._find(region)]
+        area = stats[_AREA]
+        return {
+            'kind': stats[_KIND],
+            'area': area,
+            'centroid': (stats[_SUM_X] / area, stats[_SUM_Y] / area),
+            'bbox': (stats[_MIN_X], stats[_MIN_Y], stats[_MAX_X], stats[_MAX_Y]),
+        }
+
+    def neighbours(self, region):
+        """Ids of the regions that touch `region`."""
+        self._refresh()
+        region = self._find(region)
+        touching = self._touching.get(region)
+        if touching is None:
+            touching = set()
+            stats, width = self._stats[region], self.width
+            labels, find = self.labels, self._find
+            for y in range(stats[_MIN_Y], stats[_MAX_Y] + 1):
+                for i in range(y * width + stats[_MIN_X], y * width + stats[_MAX_X] + 1):
+                    if labels[i] and find(labels[i]) == region:
+                        for j in self._cell_neighbours(i):
+                            if labels[j] and labels[j] != labels[i]:
+                                touching.add(labels[j])
+            self._touching[region] = touching
+        found = set()
+        for other in touching:
+            other = self._find(other)
+            if other != region and other in self._stats:
+                found.add(other)
+        return found
+
+    def adjacency(self):
+        """{region: set of touching regions} for every region."""
+        return {region: self.neighbours(region) for region in self.regions()}
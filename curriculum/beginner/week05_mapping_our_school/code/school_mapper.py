@@ -17,6 +17,16 @@ Hardware Requirements:
 """
 
 import time
+from spatial_index import SpatialIndex
+from distance_matrix import DistanceMatrix
+from pathfinding import Terrain, PathCache, WALL, OPEN
+from map_renderer import MapFrame
+from space_store import SpaceStore
+from map_file import MapFile
+from tour_planner import plan_tour
+from name_search import PrefixIndex, PrefixSearch, fold
+from regions import RegionMap
+
 try:
     import machine  # For Raspberry Pi Pico
     PICO_AVAILABLE = True
@@ -24,6 +34,9 @@ except ImportError:
     PICO_AVAILABLE = False
     print("Running in simulation mode (no Pico hardware)")
 
+if PICO_AVAILABLE:
+    from distance_sensor import DistanceSensor
+
 # School spaces with multilingual names
 SCHOOL_SPACES = {
     "classroom": {"en": "Classroom", "zu": "Igumbi Lokufunda", "af": "Klaskamer", "symbol": "□"},
@@ -33,79 +46,510 @@ SCHOOL_SPACES = {
     "entrance": {"en": "Entrance", "zu": "Umnyango", "af": "Ingang", "symbol": "△"}
 }
 
+# Map symbols for walls and walking routes
+WALL_SYMBOL = "█"
+ROUTE_SYMBOL = "·"
+
+# Measuring with the distance sensor: real size of one grid square
+CM_PER_CELL = 50
+
+# Which way the sensor points (the map's y grows downwards)
+DIRECTIONS = {
+    "north": (0, -1),
+    "south": (0, 1),
+    "east": (1, 0),
+    "west": (-1, 0)
+}
+
 class SchoolMapper:
     """Simple school mapping system using coordinates and measurements."""
     
-    def __init__(self):
-        self.map_data = []
-        self.grid_size = 10  # 10x10 grid
+    def __init__(self, grid_size=10):
+        # Spaces are kept as compact columns; map_data[i] still reads
+        # like a dictionary (see space_store.py)
+        self.map_data = SpaceStore(SCHOOL_SPACES, default_type="classroom")
+        self.grid_size = grid_size  # 10x10 grid for a classroom map
+        # Buckets spaces by location so "what is near here?" stays fast
+        # on campus maps with thousands of spaces (see spatial_index.py)
+        self.index = SpatialIndex()
+        # Every pairwise distance, kept up to date as spaces change
+        # (see distance_matrix.py)
+        self.distances = DistanceMatrix()
+        # Walls and slow ground, and recently found routes (see pathfinding.py)
+        self.terrain = Terrain(grid_size, grid_size)
+        self.routes = PathCache(self.terrain)
+        # Painted areas (rooms, fields, corridors), grouped into regions
+        # as they are painted (see regions.py)
+        self.areas = RegionMap(grid_size, grid_size)
+        # Every space and space type by the first letters of its names,
+        # in English, isiZulu and Afrikaans (see name_search.py)
+        self.names = PrefixIndex()
+        for key, info in SCHOOL_SPACES.items():
+            for name in (key, info["en"], info["zu"], info["af"]):
+                self.names.add(name, key)
+        # Saved map folder; its tiles are read only when needed (see map_file.py)
+        self.map_file = None
+        self._loaded_tiles = set()
+        self._dirty_tiles = set()
+    
+    @classmethod
+    def open_map(cls, path):
+        """Open a map saved with save_map(). No spaces are read yet."""
+        map_file = MapFile(path)
+        map_file.open()
+        mapper = cls(map_file.grid_size)
+        mapper.map_file = map_file
+        # Every saved space keeps its number: the numbers are made now
+        # and filled in as their tiles are read
+        count = map_file.space_count()
+        mapper.map_data.reserve(count)
+        for _ in range(count):
+            mapper.distances.append(0, 0)
+        return mapper
+    
+    def save_map(self, path):
+        """Save the map to a folder, one file per tile.
         
-    def add_space(self, name, x, y, space_type):
-        """Add a space to the school map."""
+        Saving again to the same folder rewrites only the tiles that
+        changed. Returns the number of tiles written.
+        """
+        if self.map_file is None or self.map_file.path != path:
+            # A new folder needs every tile, so read anything not in memory yet
+            self._load_tiles()
+            self.map_file = MapFile(path)
+            self.map_file.create(self.grid_size)
+            self._loaded_tiles = set()
+            self._dirty_tiles = self._tiles_with_content()
+        map_file = self.map_file
+        spaces = self.map_data
+        tile_size = map_file.tile_size
+        # Painted kinds are type codes + 1, as the map file numbers its types
+        to_file = bytearray(256)
+        for tile in sorted(self._dirty_tiles):
+            left, top = tile[0] * tile_size, tile[1] * tile_size
+            in_tile = self.index.in_rect(left, top, left + tile_size - 1, top + tile_size - 1)
+            tile_spaces = [(idx, spaces.names[idx], spaces.xs[idx], spaces.ys[idx], spaces.type_of(idx))
+                           for idx in sorted(in_tile)]
+            # Terrain and areas only exist inside the grid
+            x0, y0, x1, y1 = map_file.tile_rect(*tile)
+            terrain = areas = None
+            if x0 <= x1 and y0 <= y1:
+                block = self.terrain.read_block(x0, y0, x1, y1)
+                if block != bytes([OPEN]) * len(block):
+                    terrain = block
+                kinds = self.areas.read_block(x0, y0, x1, y1)
+                if kinds != bytes(len(kinds)):
+                    for kind in set(kinds):
+                        if kind and not to_file[kind]:
+                            to_file[kind] = map_file.type_code(spaces.type_names[kind - 1]) + 1
+                    areas = kinds.translate(to_file)
+            map_file.write_tile(tile[0], tile[1], tile_spaces, terrain, areas)
+        map_file.save_index()
+        written = len(self._dirty_tiles)
+        # Everything just saved is in memory, so never read it back
+        self._loaded_tiles.update(self._dirty_tiles)
+        self._dirty_tiles = set()
+        return written
+    
+    def _tiles_with_content(self):
+        """Tiles holding a space, a cell that is not open ground, or a painted cell."""
+        map_file = self.map_file
+        spaces = self.map_data
+        tiles = {map_file.tile_of(spaces.xs[i], spaces.ys[i]) for i in range(len(spaces))}
+        last = self.grid_size - 1
+        for ty in range(map_file.tile_of(0, last)[1] + 1):
+            for tx in range(map_file.tile_of(last, 0)[0] + 1):
+                if (tx, ty) not in tiles:
+                    rect = map_file.tile_rect(tx, ty)
+                    block = self.terrain.read_block(*rect)
+                    kinds = self.areas.read_block(*rect)
+                    if block != bytes([OPEN]) * len(block) or kinds != bytes(len(kinds)):
+                        tiles.add((tx, ty))
+        return tiles
+    
+    def _load_tiles(self, x0=None, y0=None, x1=None, y1=None):
+        """Read the saved tiles overlapping a rectangle (or all of them) that are not in memory yet."""
+        if self.map_file is None:
+            return
+        if x0 is None:
+            tiles = list(self.map_file.tiles)
+        else:
+            tiles = self.map_file.tiles_in(x0, y0, x1, y1)
+        map_file = self.map_file
+        for tile in tiles:
+            if tile in self._loaded_tiles:
+                continue
+            self._loaded_tiles.add(tile)
+            tile_spaces, terrain, areas = map_file.read_tile(*tile)
+            for space_idx, name, x, y, space_type in tile_spaces:
+                # The number was made by open_map(); now it gets its space
+                self.map_data.put(space_idx, name, x, y, space_type)
+                self.index.insert(space_idx, x, y)
+                self.distances.move(space_idx, x, y)
+                self.names.add(name, space_idx)
+            if terrain is not None:
+                self.terrain.write_block(*map_file.tile_rect(*tile), terrain)
+            if areas is not None:
+                from_file = bytearray(256)
+                for kind in set(areas):
+                    if kind:
+                        from_file[kind] = self.map_data.type_code(map_file.types[kind - 1]) + 1
+                self.areas.write_block(*map_file.tile_rect(*tile), areas.translate(from_file))
+    
+    def _touch(self, x0, y0, x1, y1):
+        """About to change a rectangle: read its tiles first and mark them for saving."""
+        if self.map_file is None:
+            return
+        self._load_tiles(x0, y0, x1, y1)
+        tx0, ty0 = self.map_file.tile_of(min(x0, x1), min(y0, y1))
+        tx1, ty1 = self.map_file.tile_of(max(x0, x1), max(y0, y1))
+        for ty in range(ty0, ty1 + 1):
+            for tx in range(tx0, tx1 + 1):
+                self._dirty_tiles.add((tx, ty))
+        
+    def _check_cell(self, x, y):
+        """Spaces must be on the map: tiles, walls and areas only cover the grid."""
+        if not (0 <= x < self.grid_size and 0 <= y < self.grid_size):
+            raise ValueError(f"({x}, {y}) is outside the {self.grid_size} x {self.grid_size} map")
+        
+    def _touch_rect(self, x0, y0, x1, y1):
+        """_touch() a rectangle given by any two corners, clipped to the grid."""
+        last = self.grid_size - 1
+        self._touch(max(0, min(x0, x1)), max(0, min(y0, y1)),
+                    min(last, max(x0, x1)), min(last, max(y0, y1)))
+        
+    def add_space(self, name, x, y, space_type, verbose=True):
+        """Add a space to the school map.
+        
+        Set verbose=False when loading many spaces at once.
+        """
         space_info = SCHOOL_SPACES.get(space_type, SCHOOL_SPACES["classroom"])
         
-        self.map_data.append({
-            "name": name,
-            "x": x,
-            "y": y,
-            "type": space_type,
-            "symbol": space_info["symbol"],
-            "multilingual": space_info
-        })
-        
-        print(f"\n✓ Added: {name}")
-        print(f"  Location: ({x}, {y})")
-        print(f"  Type: {space_info['en']} | {space_info['zu']} | {space_info['af']}")
-        print(f"  Symbol: {space_info['symbol']}")
-    
-    def display_map(self):
-        """Display the school map in ASCII format."""
-        print("\n" + "="*50)
-        print("🏫 SCHOOL MAP - IBALAZWE LESIKOLE - SKOOLKAART 🏫")
-        print("="*50)
+        self._check_cell(x, y)
+        self._touch(x, y, x, y)
+        space_idx = self.map_data.add(name, x, y, space_type)
+        self.index.insert(space_idx, x, y)
+        self.distances.append(x, y)
+        self.names.add(name, space_idx)
+        
+        if verbose:
+            print(f"\n✓ Added: {name}")
+            print(f"  Location: ({x}, {y})")
+            print(f"  Type: {space_info['en']} | {space_info['zu']} | {space_info['af']}")
+            print(f"  Symbol: {space_info['symbol']}")
+    
+    def remove_space(self, space_idx):
+        """Remove a space. Spaces after it move up one number."""
+        self._load_tiles()  # Space numbers only mean something once every space is read
+        spaces = self.map_data
+        if not 0 <= space_idx < len(spaces):
+            raise IndexError("Invalid space number!")
+        if self.map_file is not None:
+            # This space and every one after it is saved with a new number
+            for idx in range(space_idx, len(spaces)):
+                self._dirty_tiles.add(self.map_file.tile_of(spaces.xs[idx], spaces.ys[idx]))
+        space = spaces.pop(space_idx)
+        self.index.remove(space_idx, space["x"], space["y"])
+        self.index.renumber_after(space_idx)
+        self.distances.remove(space_idx)
+        self.names.remove(space["name"], space_idx)
+        self.names.renumber_after(space_idx)
+        return space
+    
+    def move_space(self, space_idx, x, y):
+        """Move a space to a new location."""
+        self._load_tiles()
+        if not 0 <= space_idx < len(self.map_data):
+            raise IndexError("Invalid space number!")
+        self._check_cell(x, y)
+        spaces = self.map_data
+        self._touch(spaces.xs[space_idx], spaces.ys[space_idx],
+                    spaces.xs[space_idx], spaces.ys[space_idx])
+        self._touch(x, y, x, y)
+        self.index.move(space_idx, spaces.xs[space_idx], spaces.ys[space_idx], x, y)
+        self.distances.move(space_idx, x, y)
+        spaces.move(space_idx, x, y)
+    
+    def nearest_spaces(self, x, y, count=1, space_type=None):
+        """The `count` spaces nearest to (x, y) as (grid distance, space number) pairs.
         
-        # Create empty grid
-        grid = [[" " for _ in range(self.grid_size)] for _ in range(self.grid_size)]
-        
-        # Place spaces on grid
-        for space in self.map_data:
-            x, y = space["x"], space["y"]
-            if 0 <= x < self.grid_size and 0 <= y < self.grid_size:
-                grid[y][x] = space["symbol"]
-        
-        # Display grid with coordinates
-        print("\n  ", end="")
-        for x in range(self.grid_size):
-            print(f"{x} ", end="")
-        print()
-        
-        for y in range(self.grid_size):
-            print(f"{y} ", end="")
-            for x in range(self.grid_size):
-                print(f"{grid[y][x]} ", end="")
-            print()
-        
-        # Display legend
-        print("\n" + "-"*50)
-        print("LEGEND - UMFANEKISO - LEGENDE:")
-        print("-"*50)
+        Pass space_type (e.g. "library") to only look for that kind of space.
+        """
+        accept = None
+        if space_type is not None:
+            accept = lambda idx: self.map_data.type_of(idx) == space_type
+        if self.map_file is None:
+            return self.index.nearest(x, y, count, accept)
+        # Read tiles in rings around (x, y) until no unread tile could
+        # hold anything nearer
+        tile_size = self.map_file.tile_size
+        ring = 0
+        while True:
+            reach = ring * tile_size
+            self._load_tiles(x - reach, y - reach, x + reach, y + reach)
+            found = self.index.nearest(x, y, count, accept)
+            if len(found) == count and found[-1][0] <= reach:
+                return found
+            if self._loaded_tiles.issuperset(self.map_file.tiles):
+                return found
+            ring += 1
+    
+    def spaces_within(self, x, y, radius):
+        """(distance, space number) pairs within `radius` grid units of (x, y), nearest first."""
+        self._load_tiles(x - radius, y - radius, x + radius, y + radius)
+        return self.index.in_radius(x, y, radius)
+    
+    def spaces_in_area(self, x0, y0, x1, y1):
+        """Numbers of the spaces inside the rectangle from (x0, y0) to (x1, y1)."""
+        self._load_tiles(x0, y0, x1, y1)
+        return sorted(self.index.in_rect(x0, y0, x1, y1))
+    
+    def display_map(self, route=None, viewport=None):
+        """Display the school map in ASCII format.
+        
+        Pass a route from find_route() to draw it on the map, and
+        viewport=(x0, y0, x1, y1) to draw only part of a big map.
+        """
+        # Only cells with something on them are stored (see map_renderer.py)
+        frame = MapFrame(self.grid_size, self.grid_size)
+        x0, y0, x1, y1 = frame.viewport(*(viewport or ()))
+        self._load_tiles(x0, y0, x1, y1)
+        
+        # Walls first, then the route, then spaces on top
+        walls = self.terrain.walls(x0, y0, x1, y1)
+        frame.put_all(walls, WALL_SYMBOL)
+        if route:
+            frame.put_all(route["path"], ROUTE_SYMBOL)
+        spaces = self.map_data
+        shown = self.spaces_in_area(x0, y0, x1, y1)
+        for idx in shown:
+            frame.put(spaces.xs[idx], spaces.ys[idx], spaces.symbol_of(idx))
+        
+        # Build the whole screen, then send it in one write
+        lines = ["\n" + "="*50,
+                 "🏫 SCHOOL MAP - IBALAZWE LESIKOLE - SKOOLKAART 🏫",
+                 "="*50]
+        if viewport:
+            lines.append(f"Showing ({x0}, {y0}) to ({x1}, {y1})")
+        lines.append("")
+        lines.append(frame.render(x0, y0, x1, y1))
+        
+        # Legend
+        lines.append("\n" + "-"*50)
+        lines.append("LEGEND - UMFANEKISO - LEGENDE:")
+        lines.append("-"*50)
+        if walls:
+            lines.append(f"{WALL_SYMBOL} = Wall | Udonga | Muur")
+        if route:
+            lines.append(f"{ROUTE_SYMBOL} = Route | Indlela | Roete")
         displayed_types = set()
-        for space in self.map_data:
+        for idx in shown:
+            space = self.map_data[idx]
             space_type = space["type"]
             if space_type not in displayed_types:
                 ml = space["multilingual"]
-                print(f"{space['symbol']} = {ml['en']} | {ml['zu']} | {ml['af']}")
+                lines.append(f"{space['symbol']} = {ml['en']} | {ml['zu']} | {ml['af']}")
                 displayed_types.add(space_type)
         
-        # Display list of spaces
-        print("\n" + "-"*50)
-        print("SPACES IN OUR SCHOOL:")
-        print("-"*50)
-        for i, space in enumerate(self.map_data, 1):
-            print(f"{i}. {space['name']} at ({space['x']}, {space['y']})")
+        # List of spaces
+        lines.append("\n" + "-"*50)
+        lines.append("SPACES IN OUR SCHOOL:")
+        lines.append("-"*50)
+        listed = shown if viewport else range(len(self.map_data))
+        for idx in listed:
+            space = self.map_data[idx]
+            lines.append(f"{idx + 1}. {space['name']} at ({space['x']}, {space['y']})")
+        print("\n".join(lines))
+    
+    def distance_between(self, space1_idx, space2_idx, metric="manhattan"):
+        """Distance between two spaces in grid units, without printing.
+        
+        metric: "manhattan" (grid steps) or "euclidean" (straight line)
+        """
+        self._load_tiles()
+        count = len(self.map_data)
+        if not (0 <= space1_idx < count and 0 <= space2_idx < count):
+            raise IndexError("Invalid space numbers!")
+        return self.distances.distance(space1_idx, space2_idx, metric)
+    
+    def distance_table(self, metric="manhattan"):
+        """All pairwise distances as an n x n NumPy array (row i = from space i)."""
+        self._load_tiles()
+        return self.distances.matrix(metric)
+    
+    def match_space_type(self, text):
+        """The space type whose name in any language starts with `text`, or None.
+        
+        "bib", "Umtapo" and "library" all give "library".
+        """
+        if text in SCHOOL_SPACES:
+            return text
+        for item in self.names.items(self.names.node(fold(text))):
+            if isinstance(item, str):
+                return item
+        return None
+    
+    def search(self, text, limit=10):
+        """Spaces found by the first letters of their name or type.
+        
+        `text` can be typed letters ("bib" finds every library and any
+        space called "Bibi's Room") or a PrefixSearch being typed into,
+        for search-as-you-type. Returns (space number, x, y) for up to
+        `limit` spaces, best matches first.
+        """
+        self._load_tiles()  # Names are only known for spaces in memory
+        node = text.node if isinstance(text, PrefixSearch) else self.names.node(fold(text))
+        spaces = self.map_data
+        found = []
+        seen = set()
+        for item in self.names.items(node):
+            if isinstance(item, str):
+                # A space type: every space of that type
+                code = bytes([spaces.type_code(item)])
+                matches = []
+                i = spaces.types.find(code)
+                while i != -1 and len(found) + len(matches) < limit:
+                    matches.append(i)
+                    i = spaces.types.find(code, i + 1)
+            else:
+                matches = [item]
+            for idx in matches:
+                if idx not in seen:
+                    seen.add(idx)
+                    found.append((idx, spaces.xs[idx], spaces.ys[idx]))
+            if len(found) >= limit:
+                break
+        return found[:limit]
+    
+    def live_search(self):
+        """A PrefixSearch to type into letter by letter; pass it to search()."""
+        return PrefixSearch(self.names)
+    
+    def add_wall(self, x0, y0, x1=None, y1=None):
+        """Block a cell, or every cell in a rectangle (walls, fences, locked areas)."""
+        self.set_terrain(x0, y0, x0 if x1 is None else x1, y0 if y1 is None else y1, WALL)
+    
+    def remove_wall(self, x0, y0, x1=None, y1=None):
+        """Open up a cell or rectangle again."""
+        self.set_terrain(x0, y0, x0 if x1 is None else x1, y0 if y1 is None else y1, OPEN)
+    
+    def set_terrain(self, x0, y0, x1, y1, cost):
+        """Set how slow a rectangle is to cross (0 = wall, 1 = corridor, 3 = sand...)."""
+        self._touch_rect(x0, y0, x1, y1)
+        self.terrain.fill(x0, y0, x1, y1, cost)
+    
+    def paint_area(self, x0, y0, x1, y1, space_type):
+        """Paint a rectangle of cells as part of an area ("classroom", "corridor"...).
+        
+        Touching cells painted with the same type join into one area.
+        """
+        self._touch_rect(x0, y0, x1, y1)
+        self.areas.paint_rect(x0, y0, x1, y1, self.map_data.type_code(space_type) + 1)
+    
+    def erase_area(self, x0, y0, x1, y1):
+        """Take the paint off a rectangle of cells."""
+        self._touch_rect(x0, y0, x1, y1)
+        self.areas.paint_rect(x0, y0, x1, y1, 0)
+    
+    def _area_details(self, region):
+        info = self.areas.info(region)
+        info["region"] = region
+        info["type"] = self.map_data.type_names[info.pop("kind") - 1]
+        info["touches"] = sorted(self.areas.neighbours(region))
+        return info
+    
+    def area_at(self, x, y):
+        """The painted area covering (x, y), or None.
+        
+        A dict with 'region' (its number), 'type', 'area' in cells,
+        'centroid' (x, y), 'bbox' and 'touches' (numbers of the areas
+        next to it).
+        """
+        self._load_tiles()  # An area can reach into any tile
+        region = self.areas.region_at(x, y)
+        return None if region is None else self._area_details(region)
+    
+    def all_areas(self):
+        """Every painted area (see area_at()), biggest first."""
+        self._load_tiles()
+        areas = [self._area_details(region) for region in self.areas.regions()]
+        areas.sort(key=lambda info: -info["area"])
+        return areas
+    
+    def find_route(self, space1_idx, space2_idx, method="astar"):
+        """Walking route between two spaces, around walls.
+        
+        method: "astar" (quickest, fast), "dijkstra" (quickest) or
+        "bfs" (fewest steps). Returns a dict with 'path' (list of (x, y)),
+        'steps' and 'cost', or None if the way is blocked.
+        """
+        self._load_tiles()  # Routes need every wall on the map, and every space
+        count = len(self.map_data)
+        if not (0 <= space1_idx < count and 0 <= space2_idx < count):
+            raise IndexError("Invalid space numbers!")
+        space1 = self.map_data[space1_idx]
+        space2 = self.map_data[space2_idx]
+        return self.routes.find((space1["x"], space1["y"]), (space2["x"], space2["y"]), method)
+    
+    def add_measured_space(self, sensor, name, space_type, from_x, from_y,
+                           direction, cm_per_cell=CM_PER_CELL):
+        """Measure how far away a space is, then add it to the map.
+        
+        Stand at (from_x, from_y) and point the sensor "north", "south",
+        "east" or "west" at the space. Returns its (x, y), or None if the
+        sensor got no good echoes. Raises ValueError if the measured
+        position is off the map (the space is not added).
+        """
+        self._check_cell(from_x, from_y)
+        dx, dy = DIRECTIONS[direction]
+        distance_cm = sensor.measure()
+        if distance_cm is None:
+            print("\n📡 No clear echo - point the sensor straight at the space and try again")
+            return None
+        cells = round(distance_cm / cm_per_cell)
+        x = from_x + dx * cells
+        y = from_y + dy * cells
+        print(f"\n📡 Measured {distance_cm} cm {direction} = {cells} grid squares")
+        self._check_cell(x, y)
+        self.add_space(name, x, y, space_type)
+        return x, y
+    
+    def plan_tour(self, space_indices, start_idx=None, round_trip=False,
+                  metric="manhattan", time_budget_ms=250):
+        """A short order to visit several spaces (see tour_planner.py).
+        
+        The tour starts at start_idx (default: the first space listed)
+        and comes back there if round_trip is True. Returns a dict with
+        'order' (space numbers), 'length' in grid units, 'first_length'
+        (before improving) and 'time_ms'.
+        """
+        self._load_tiles()
+        count = len(self.map_data)
+        stops = []
+        seen = set()
+        for idx in ([] if start_idx is None else [start_idx]) + list(space_indices):
+            if not 0 <= idx < count:
+                raise IndexError("Invalid space numbers!")
+            if idx not in seen:
+                seen.add(idx)
+                stops.append(idx)
+        if not stops:
+            raise ValueError("A tour needs at least one space")
+        table = self.distances.sub_table(stops, metric)
+        tour = plan_tour(table, 0, round_trip, time_budget_ms)
+        tour["order"] = [stops[k] for k in tour["order"]]
+        return tour
+    
+    def print_tour(self, tour):
+        """Print the stops of a tour from plan_tour() in order."""
+        for step, idx in enumerate(tour["order"], 1):
+            print(f"   {step}. {self.map_data[idx]['name']}")
+        print(f"   Total walk: {tour['length']:g} grid units "
+              f"(first guess: {tour['first_length']:g})")
     
     def measure_distance(self, space1_idx, space2_idx):
         """Calculate simple distance between two spaces."""
+        self._load_tiles()
         if space1_idx >= len(self.map_data) or space2_idx >= len(self.map_data):
             print("Invalid space numbers!")
             return
@@ -114,12 +558,13 @@ class SchoolMapper:
         space2 = self.map_data[space2_idx]
         
         # Manhattan distance (grid-based)
-        distance = abs(space1["x"] - space2["x"]) + abs(space1["y"] - space2["y"])
+        distance = int(self.distance_between(space1_idx, space2_idx))
         
         print(f"\n📍 Distance from {space1['name']} to {space2['name']}:")
         print(f"   {distance} grid units")
         print(f"   Pattern: Move {abs(space1['x'] - space2['x'])} steps horizontally")
         print(f"           Move {abs(space1['y'] - space2['y'])} steps vertically")
+        return distance
 
 def demo_mapping():
     """Demonstrate school mapping with sample data."""
@@ -156,6 +601,54 @@ def demo_mapping():
     print("="*50)
     mapper.measure_distance(0, 3)  # From classroom to library
     
+    # Real schools have walls - find the way around
+    time.sleep(1)
+    mapper.add_wall(0, 4, 3, 4)  # A wall between the classroom and the library
+    route = mapper.find_route(0, 3)
+    print(f"\n🧱 With a wall in the way, the walk is {route['steps']} steps:")
+    mapper.display_map(route)
+    
+    # Measure a space with sound instead of counting squares
+    if PICO_AVAILABLE:
+        time.sleep(1)
+        print("\n" + "="*50)
+        print("MEASURING WITH SOUND: ULTRASONIC SENSOR")
+        print("="*50)
+        print(f"Standing at the Main Entrance, pointing south (1 square = {CM_PER_CELL} cm)")
+        sensor = DistanceSensor()
+        try:
+            mapper.add_measured_space(sensor, "Sports Field", "playground", 5, 1, "south")
+        except ValueError as error:
+            print(f"⚠️ {error} - the Sports Field is further away than the map reaches")
+    
+    # Plan a visitors' tour of every space
+    time.sleep(1)
+    print("\n" + "="*50)
+    print("ALGORITHMS: PLANNING A VISITORS' TOUR")
+    print("="*50)
+    print("Start at the Main Entrance, visit every space, and come back:")
+    tour = mapper.plan_tour(range(len(mapper.map_data)), start_idx=4, round_trip=True)
+    mapper.print_tour(tour)
+    
+    # Decompose the school into areas
+    time.sleep(1)
+    print("\n" + "="*50)
+    print("DECOMPOSITION: AREAS OF OUR SCHOOL")
+    print("="*50)
+    mapper.paint_area(0, 0, 3, 3, "classroom")
+    mapper.paint_area(5, 0, 9, 3, "office")
+    mapper.paint_area(4, 0, 4, 9, "corridor")
+    mapper.paint_area(0, 5, 3, 9, "library")
+    mapper.paint_area(5, 5, 9, 9, "playground")
+    areas = mapper.all_areas()
+    names = {info["region"]: SCHOOL_SPACES.get(info["type"], {}).get("en", info["type"].title())
+             for info in areas}
+    for info in areas:
+        cx, cy = info["centroid"]
+        touches = ", ".join(names[region] for region in info["touches"])
+        print(f"   {names[info['region']]}: {info['area']} squares, centre ({cx:.1f}, {cy:.1f})")
+        print(f"      next to: {touches}")
+    
     # Ubuntu reflection
     print("\n" + "="*50)
     print("🌟 UBUNTU REFLECTION:")
@@ -172,15 +665,24 @@ def interactive_mode():
     print("Create your own school map!\n")
     
     mapper = SchoolMapper()
+    sensor = None  # Set up the first time it is used
     
     while True:
         print("\nWhat would you like to do?")
         print("1. Add a space to the map")
         print("2. Display the current map")
         print("3. Measure distance between spaces")
-        print("4. Exit")
+        print("4. Find the nearest spaces to a point")
+        print("5. Add a wall")
+        print("6. Find a walking route between spaces")
+        print("7. Measure a space with the distance sensor")
+        print("8. Save the map")
+        print("9. Open a saved map")
+        print("10. Plan a tour of several spaces")
+        print("11. Search for a space by name")
+        print("12. Exit")
         
-        choice = input("\nEnter choice (1-4): ").strip()
+        choice = input("\nEnter choice (1-12): ").strip()
         
         if choice == "1":
             name = input("Space name: ")
@@ -189,8 +691,12 @@ def interactive_mode():
             print("\nSpace types:")
             for i, (key, value) in enumerate(SCHOOL_SPACES.items(), 1):
                 print(f"{i}. {value['en']} ({key})")
-            space_type = input("Enter space type: ").strip().lower()
-            mapper.add_space(name, x, y, space_type)
+            typed = input("Enter space type (any language): ").strip().lower()
+            space_type = mapper.match_space_type(typed) or typed
+            try:
+                mapper.add_space(name, x, y, space_type)
+            except ValueError as error:
+                print(f"⚠️ {error} - try again!")
         
         elif choice == "2":
             mapper.display_map()
@@ -205,6 +711,99 @@ def interactive_mode():
                 mapper.measure_distance(idx1, idx2)
         
         elif choice == "4":
+            if not mapper.map_data:
+                print("Add a space first!")
+            else:
+                x = int(input("X coordinate: "))
+                y = int(input("Y coordinate: "))
+                count = int(input("How many spaces? "))
+                space_type = input("Space type (or press Enter for any): ").strip().lower() or None
+                nearest = mapper.nearest_spaces(x, y, count, space_type)
+                if not nearest:
+                    print("No spaces of that type yet!")
+                for distance, idx in nearest:
+                    space = mapper.map_data[idx]
+                    print(f"   {idx + 1}. {space['name']} at ({space['x']}, {space['y']}) - {distance} grid units")
+        
+        elif choice == "5":
+            print("A wall goes from one corner to the other (use the same corner twice for one block)")
+            x0 = int(input("Corner 1 X: "))
+            y0 = int(input("Corner 1 Y: "))
+            x1 = int(input("Corner 2 X: "))
+            y1 = int(input("Corner 2 Y: "))
+            mapper.add_wall(x0, y0, x1, y1)
+            mapper.display_map()
+        
+        elif choice == "6":
+            if len(mapper.map_data) < 2:
+                print("Add at least 2 spaces first!")
+            else:
+                mapper.display_map()
+                idx1 = int(input("From space number: ")) - 1
+                idx2 = int(input("To space number: ")) - 1
+                route = mapper.find_route(idx1, idx2)
+                if route is None:
+                    print("🚧 No way through - walls block every route!")
+                else:
+                    mapper.display_map(route)
+                    print(f"\n🚶 Walking route: {route['steps']} steps")
+        
+        elif choice == "7":
+            if not PICO_AVAILABLE:
+                print("The distance sensor needs a Pico (or the host HAL)!")
+            else:
+                if sensor is None:
+                    sensor = DistanceSensor()
+                name = input("Space name: ")
+                from_x = int(input("Your X coordinate (0-9): "))
+                from_y = int(input("Your Y coordinate (0-9): "))
+                direction = input("Sensor points (north/south/east/west): ").strip().lower()
+                if direction not in DIRECTIONS:
+                    print("Please choose north, south, east or west!")
+                else:
+                    typed = input("Enter space type (any language): ").strip().lower()
+                    space_type = mapper.match_space_type(typed) or typed
+                    try:
+                        if mapper.add_measured_space(sensor, name, space_type, from_x, from_y, direction):
+                            mapper.display_map()
+                    except ValueError as error:
+                        print(f"⚠️ {error} - try again!")
+        
+        elif choice == "8":
+            path = input("Map name (press Enter for 'school_map'): ").strip() or "school_map"
+            tiles = mapper.save_map(path)
+            print(f"💾 Saved to the '{path}' folder ({tiles} tiles written)")
+        
+        elif choice == "9":
+            path = input("Map name (press Enter for 'school_map'): ").strip() or "school_map"
+            try:
+                mapper = SchoolMapper.open_map(path)
+            except OSError:
+                print(f"No saved map called '{path}' yet!")
+            else:
+                print(f"📂 Opened '{path}': {mapper.map_file.space_count()} spaces")
+                mapper.display_map()
+        
+        elif choice == "10":
+            if len(mapper.map_data) < 2:
+                print("Add at least 2 spaces first!")
+            else:
+                mapper.display_map()
+                numbers = input("Space numbers to visit, start first (e.g. 1 3 4), or Enter for all: ").split()
+                stops = [int(n) - 1 for n in numbers] or list(range(len(mapper.map_data)))
+                back = input("Come back to the start? (yes/no): ").strip().lower() in ["yes", "y"]
+                print("\n🗺️ A short tour:")
+                mapper.print_tour(mapper.plan_tour(stops, round_trip=back))
+        
+        elif choice == "11":
+            text = input("First letters of a name or type (e.g. bib, klas, umtapo): ")
+            found = mapper.search(text)
+            if not found:
+                print("Nothing found - try fewer letters!")
+            for idx, x, y in found:
+                print(f"   {idx + 1}. {mapper.map_data[idx]['name']} at ({x}, {y})")
+        
+        elif choice == "12":
             print("\n🌟 Thank you for mapping our school!")
             print("Ubuntu: Understanding our spaces brings us together.")
             break
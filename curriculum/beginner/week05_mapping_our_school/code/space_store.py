@@ -0,0 +1,224 @@
+"""Space Store
+Keep thousands of map spaces in a few compact arrays
+
+The first SchoolMapper kept every space as a dictionary holding its
+name, x, y, type, symbol and a copy of the multilingual names. A Python
+dictionary costs around 100-200 bytes before anything is put in it, so
+on a Pico with about 200 KB free the map was full after a few hundred
+spaces.
+
+`SpaceStore` keeps the same information as columns instead of rows
+(a "struct of arrays"):
+
+- x and y:  two `array('h')` columns, 2 bytes per number
+- type:     one byte per space, a code into the space-type catalogue
+            (SCHOOL_SPACES), so symbol and multilingual names are
+            looked up, never copied
+- name:     a list of names; equal names share one string ("interned")
+
+That is about 5 bytes plus a name per space, and loops over x and y
+run over plain arrays.
+
+Reading a space with `store[i]` gives a `SpaceView`, which looks like
+the old dictionary (`space["name"]`, `space["x"]`, `space.get(...)`,
+`dict(space)`) but is made on the spot from the columns. A view follows
+the space NUMBER: after a space before it is removed, it shows the next
+space along.
+
+Usage:
+    store = SpaceStore(SCHOOL_SPACES, default_type="classroom")
+    store.add("Library", 2, 5, "library")
+    store[0]["symbol"]          # "◊"
+    store.xs, store.ys          # Every x and every y
+"""
+
+from array import array
+
+# Coordinates are stored as signed 16-bit numbers
+MIN_COORD = -32768
+MAX_COORD = 32767
+
+# Type codes are single bytes
+MAX_TYPES = 256
+
+FIELDS = ("name", "x", "y", "type", "symbol", "multilingual")
+
+
+class SpaceView:
+    """One space, read from the store columns like a dictionary."""
+
+    __slots__ = ("_store", "_i")
+
+    def __init__(self, store, i):
+        self._store = store
+        self._i = i
+
+    def __getitem__(self, key):
+        store, i = self._store, self._i
+        if key == "x":
+            return store.xs[i]
+        if key == "y":
+            return store.ys[i]
+        if key == "name":
+            return store.names[i]
+        if key == "type":
+            return store.type_names[store.types[i]]
+        if key == "symbol":
+            return store.type_info[store.types[i]]["symbol"]
+        if key == "multilingual":
+            return store.type_info[store.types[i]]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        return self[key] if key in FIELDS else default
+
+    def __contains__(self, key):
+        return key in FIELDS
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def keys(self):
+        return FIELDS
+
+    def values(self):
+        return [self[key] for key in FIELDS]
+
+    def items(self):
+        return [(key, self[key]) for key in FIELDS]
+
+    def __eq__(self, other):
+        try:
+            return all(self[key] == other[key] for key in FIELDS)
+        except (KeyError, TypeError, IndexError):
+            return False
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class SpaceStore:
+    """Columns of space names, positions and type codes.
+
+    Args:
+        catalogue: Space types, e.g. SCHOOL_SPACES ({type: {"symbol": ..., ...}})
+        default_type: Catalogue entry used for types it does not know
+    """
+
+    def __init__(self, catalogue, default_type):
+        self.catalogue = catalogue
+        self.default_type = default_type
+        self.xs = array("h")
+        self.ys = array("h")
+        self.types = bytearray()
+        self.names = []
+        self.type_names = []     # Type code -> type name as given
+        self.type_info = []      # Type code -> catalogue entry (shared, not copied)
+        self._codes = {}         # Type name -> type code
+        self._interned = {}      # Name -> the one stored copy of it
+        for space_type in catalogue:
+            self.type_code(space_type)
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __getitem__(self, i):
+        n = len(self.xs)
+        if isinstance(i, slice):
+            return [SpaceView(self, j) for j in range(*i.indices(n))]
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("space number out of range")
+        return SpaceView(self, i)
+
+    def __iter__(self):
+        for i in range(len(self.xs)):
+            yield SpaceView(self, i)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def type_code(self, space_type):
+        """The code for `space_type`, adding it if it is new."""
+        code = self._codes.get(space_type)
+        if code is None:
+            code = len(self.type_names)
+            if code >= MAX_TYPES:
+                raise ValueError(f"too many space types (at most {MAX_TYPES})")
+            self._codes[space_type] = code
+            self.type_names.append(space_type)
+            self.type_info.append(self.catalogue.get(space_type, self.catalogue[self.default_type]))
+        return code
+
+    def intern(self, name):
+        """Return the stored copy of `name`, so equal names share memory."""
+        stored = self._interned.get(name)
+        if stored is None:
+            self._interned[name] = stored = name
+        return stored
+
+    def add(self, name, x, y, space_type):
+        """Add a space and return its number."""
+        if not (MIN_COORD <= x <= MAX_COORD and MIN_COORD <= y <= MAX_COORD):
+            raise ValueError(f"coordinates must be between {MIN_COORD} and {MAX_COORD}")
+        code = self.type_code(space_type)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.types.append(code)
+        self.names.append(self.intern(name))
+        return len(self.xs) - 1
+
+    def reserve(self, count):
+        """Make numbers 0 to count - 1 exist, as blank spaces to put() later.
+
+        A saved map reserves all its space numbers when it is opened, so
+        spaces keep their numbers whichever are read first.
+        """
+        extra = count - len(self.xs)
+        if extra > 0:
+            self.xs.extend(array("h", [0]) * extra)
+            self.ys.extend(array("h", [0]) * extra)
+            self.types.extend(bytes([self.type_code(self.default_type)]) * extra)
+            self.names.extend([""] * extra)
+
+    def put(self, i, name, x, y, space_type):
+        """Fill in space i (made by reserve())."""
+        if not (MIN_COORD <= x <= MAX_COORD and MIN_COORD <= y <= MAX_COORD):
+            raise ValueError(f"coordinates must be between {MIN_COORD} and {MAX_COORD}")
+        self.types[i] = self.type_code(space_type)
+        self.xs[i] = x
+        self.ys[i] = y
+        self.names[i] = self.intern(name)
+
+    def move(self, i, x, y):
+        """Move space i to (x, y)."""
+        self.xs[i] = x
+        self.ys[i] = y
+
+    def pop(self, i):
+        """Remove space i and return it as a plain dictionary."""
+        space = dict(self[i].items())
+        del self.xs[i]
+        del self.ys[i]
+        del self.types[i]
+        del self.names[i]
+        return space
+
+    def clear(self):
+        self.xs = array("h")
+        self.ys = array("h")
+        self.types = bytearray()
+        self.names = []
+        self._interned = {}
+
+    def type_of(self, i):
+        """Type name of space i, without making a view."""
+        return self.type_names[self.types[i]]
+
+    def symbol_of(self, i):
+        """Map symbol of space i, without making a view."""
+        return self.type_info[self.types[i]]["symbol"]
@@ -0,0 +1,224 @@
+"""Spatial Index
+Find spaces near a point without checking every space on the map
+
+A list of spaces is fine for a classroom map, but a whole campus or
+district has thousands of points, and "what is near here?" would have to
+look at every one of them. A SPATIAL INDEX sorts the points into
+buckets by where they are, like the squares on a map book page:
+
+- the map is cut into squares of `cell_size` x `cell_size` grid units
+- each square (cell) keeps a list of the points inside it
+- a query only looks at the cells that overlap the area it asks about
+
+Finding the nearest points searches rings of cells around the query
+point, starting with its own cell, and stops as soon as no unvisited
+cell could hold anything closer.
+
+Items are usually the space numbers used by SchoolMapper, but any value
+can be stored.
+
+Usage:
+    index = SpatialIndex()
+    index.insert(0, 2, 2)                      # item 0 at (2, 2)
+    index.insert(1, 7, 2)
+    index.nearest(3, 3, n=1)                   # [(2, 0)] - distance 2, item 0
+    index.in_radius(5, 2, 3)                   # [(2.0, 1), (3.0, 0)]
+
+Ubuntu Connection: Knowing our neighbours helps us help each other!
+"""
+
+import math
+
+# Squares of 8 x 8 grid units: a 10 x 10 classroom map uses 4 cells,
+# a 1000 x 1000 district map about 16 000
+DEFAULT_CELL_SIZE = 8
+
+
+def manhattan(dx, dy):
+    """Grid distance: steps left/right plus steps up/down."""
+    return abs(dx) + abs(dy)
+
+
+def euclidean(dx, dy):
+    """Straight-line distance ("as the crow flies")."""
+    return math.sqrt(dx * dx + dy * dy)
+
+
+METRICS = {'manhattan': manhattan, 'euclidean': euclidean}
+
+
+class SpatialIndex:
+    """Uniform grid hash of items with (x, y) positions.
+
+    Args:
+        cell_size: Width and height of each bucket in grid units
+    """
+
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self.buckets = {}      # (cell_x, cell_y) -> [[item, x, y], ...]
+        self.count = 0
+        self._bounds = None    # Occupied cells: [min_cx, min_cy, max_cx, max_cy]
+
+    def __len__(self):
+        return self.count
+
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def insert(self, item, x, y):
+        """Add `item` at position (x, y)."""
+        cell = self._cell(x, y)
+        bucket = self.buckets.get(cell)
+        if bucket is None:
+            bucket = self.buckets[cell] = []
+        bucket.append([item, x, y])
+        self.count += 1
+
+        cx, cy = cell
+        if self._bounds is None:
+            self._bounds = [cx, cy, cx, cy]
+        else:
+            b = self._bounds
+            b[0], b[1] = min(b[0], cx), min(b[1], cy)
+            b[2], b[3] = max(b[2], cx), max(b[3], cy)
+
+    def remove(self, item, x, y):
+        """Remove `item` from position (x, y). Returns False if it was not there."""
+        cell = self._cell(x, y)
+        bucket = self.buckets.get(cell)
+        if bucket:
+            for i, entry in enumerate(bucket):
+                if entry[0] == item:
+                    bucket.pop(i)
+                    if not bucket:
+                        del self.buckets[cell]
+                    self.count -= 1
+                    return True
+        return False
+
+    def move(self, item, old_x, old_y, x, y):
+        """Move `item` from (old_x, old_y) to (x, y)."""
+        if not self.remove(item, old_x, old_y):
+            raise KeyError(item)
+        self.insert(item, x, y)
+
+    def renumber_after(self, removed):
+        """After list item `removed` is deleted, shift later numbers down by one.
+
+        Takes one pass over all items, so remove spaces in batches where
+        possible on very large maps.
+        """
+        for bucket in self.buckets.values():
+            for entry in bucket:
+                if entry[0] > removed:
+                    entry[0] -= 1
+
+    def clear(self):
+        self.buckets = {}
+        self.count = 0
+        self._bounds = None
+
+    def _cells_in(self, cx0, cy0, cx1, cy1):
+        """Buckets for occupied cells in the inclusive cell rectangle."""
+        b = self._bounds
+        if b is None:
+            return
+        cx0, cy0 = max(cx0, b[0]), max(cy0, b[1])
+        cx1, cy1 = min(cx1, b[2]), min(cy1, b[3])
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.buckets):
+            # Big, mostly empty area: cheaper to check the occupied cells
+            for (cx, cy), bucket in self.buckets.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    yield bucket
+            return
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = self.buckets.get((cx, cy))
+                if bucket:
+                    yield bucket
+
+    def in_rect(self, x0, y0, x1, y1):
+        """Items inside the rectangle from (x0, y0) to (x1, y1), edges included."""
+        if x0 > x1:
+            x0, x1 = x1, x0
+        if y0 > y1:
+            y0, y1 = y1, y0
+        cx0, cy0 = self._cell(x0, y0)
+        cx1, cy1 = self._cell(x1, y1)
+        found = []
+        for bucket in self._cells_in(cx0, cy0, cx1, cy1):
+            for item, x, y in bucket:
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    found.append(item)
+        return found
+
+    def in_radius(self, x, y, radius, metric='euclidean'):
+        """(distance, item) pairs within `radius` of (x, y), nearest first."""
+        distance = METRICS[metric]
+        cx0, cy0 = self._cell(x - radius, y - radius)
+        cx1, cy1 = self._cell(x + radius, y + radius)
+        found = []
+        for bucket in self._cells_in(cx0, cy0, cx1, cy1):
+            for item, px, py in bucket:
+                d = distance(px - x, py - y)
+                if d <= radius:
+                    found.append((d, item))
+        found.sort()
+        return found
+
+    def _ring(self, cx, cy, k):
+        """Buckets in the square ring of cells k steps from (cx, cy)."""
+        if k == 0:
+            bucket = self.buckets.get((cx, cy))
+            if bucket:
+                yield bucket
+            return
+        b = self._bounds
+        for ring_y in (cy - k, cy + k):
+            if b[1] <= ring_y <= b[3]:
+                for ring_x in range(max(cx - k, b[0]), min(cx + k, b[2]) + 1):
+                    bucket = self.buckets.get((ring_x, ring_y))
+                    if bucket:
+                        yield bucket
+        for ring_x in (cx - k, cx + k):
+            if b[0] <= ring_x <= b[2]:
+                for ring_y in range(max(cy - k + 1, b[1]), min(cy + k - 1, b[3]) + 1):
+                    bucket = self.buckets.get((ring_x, ring_y))
+                    if bucket:
+                        yield bucket
+
+    def nearest(self, x, y, n=1, accept=None, metric='manhattan'):
+        """The `n` nearest items to (x, y) as (distance, item) pairs, nearest first.
+
+        Args:
+            accept: Optional test, `accept(item)`, for items to include
+                (e.g. only libraries)
+            metric: 'manhattan' (grid steps) or 'euclidean' (straight line)
+        """
+        if self._bounds is None or n <= 0:
+            return []
+        distance = METRICS[metric]
+        cx, cy = self._cell(x, y)
+        b = self._bounds
+        # Beyond this ring there are no occupied cells at all
+        last_ring = max(cx - b[0], b[2] - cx, cy - b[1], b[3] - cy)
+
+        best = []
+        k = 0
+        while k <= last_ring:
+            for bucket in self._ring(cx, cy, k):
+                for item, px, py in bucket:
+                    if accept is None or accept(item):
+                        best.append((distance(px - x, py - y), item))
+            if len(best) >= n:
+                best.sort()
+                del best[n:]
+                # Everything outside ring k is more than k cells away
+                if best[-1][0] <= k * self.cell_size:
+                    break
+            k += 1
+        best.sort()
+        return best[:n]
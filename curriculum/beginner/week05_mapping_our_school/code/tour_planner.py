@@ -0,0 +1,265 @@
+"""Tour Planner
+Find a short order to visit many spaces
+
+A fire drill check, a tour for visitors, handing out the lunch boxes:
+we want to visit MANY spaces and walk as little as possible. Trying
+every order is impossible - 10 stops already have 3 628 800 orders - so
+the planner uses two ideas that give a short (not always the shortest)
+tour quickly:
+
+1. NEAREST NEIGHBOUR: from where you stand, always walk to the closest
+   space you have not visited yet. Quick, but the last few steps are
+   often long walks back across the map.
+2. IMPROVE IT, one small change at a time, keeping a change only if it
+   makes the tour shorter:
+   - 2-opt: take two legs of the tour that cross (or nearly), and turn
+     the part between them around, so they no longer cross.
+   - Or-opt: pick up a run of 1-3 stops and put it somewhere else in
+     the tour, the right way round or backwards.
+
+Only changes involving each stop's few NEAREST stops are tried, so big
+tours improve quickly. The planner stops when no change helps, or when
+its time budget runs out.
+
+Distances come from a table: distances[i][j] is the distance from
+stop i to stop j (see distance_matrix.py).
+
+Usage:
+    table = [[0, 2, 9], [2, 0, 6], [9, 6, 0]]
+    tour = plan_tour(table)
+    print(tour['order'], tour['length'])        # [0, 1, 2] 8
+
+Ubuntu Connection: A good plan lets us visit everyone without leaving anyone out!
+"""
+
+import time
+
+# Each stop only tries changes with this many of its nearest stops
+NEIGHBOURS = 8
+
+# Longest run of stops moved by one Or-opt change
+MAX_SEGMENT = 3
+
+# Default time budget for improving a tour
+DEFAULT_BUDGET_MS = 250
+
+# A time budget is about computing time, so use the real clock where
+# there is one (on a computer the program's own clock may be simulated)
+if hasattr(time, 'monotonic'):
+    def _now_ms():
+        return time.monotonic() * 1000
+
+    def _since_ms(start):
+        return time.monotonic() * 1000 - start
+else:
+    def _now_ms():
+        return time.ticks_ms()
+
+    def _since_ms(start):
+        return time.ticks_diff(time.ticks_ms(), start)
+
+
+def tour_length(distances, order, round_trip=False):
+    """Total distance of visiting the stops in `order`."""
+    total = 0
+    for k in range(len(order) - 1):
+        total += distances[order[k]][order[k + 1]]
+    if round_trip and len(order) > 1:
+        total += distances[order[-1]][order[0]]
+    return total
+
+
+def nearest_neighbour(distances, start=0):
+    """Visiting order that always walks to the closest unvisited stop."""
+    n = len(distances)
+    unvisited = set(range(n))
+    unvisited.discard(start)
+    order = [start]
+    here = start
+    while unvisited:
+        row = distances[here]
+        here = min(unvisited, key=row.__getitem__)
+        unvisited.discard(here)
+        order.append(here)
+    return order
+
+
+def _near_lists(distances, count):
+    """For every stop, its `count` nearest other stops, nearest first."""
+    n = len(distances)
+    stops = range(n)
+    near = []
+    for i in stops:
+        row = distances[i]
+        ordered = sorted(stops, key=row.__getitem__)
+        near.append([j for j in ordered if j != i][:count])
+    return near
+
+
+class _Tour:
+    """A visiting order with the first stop fixed, and how to improve it."""
+
+    def __init__(self, distances, order, round_trip):
+        self.d = distances
+        self.order = order
+        self.round_trip = round_trip
+        self.pos = [0] * len(order)
+        self._renumber(0, len(order))
+
+    def _renumber(self, first, stop):
+        order, pos = self.order, self.pos
+        for k in range(first, stop):
+            pos[order[k]] = k
+
+    def _after(self, k):
+        """Stop after position k, or None at the end of a one-way tour."""
+        if k + 1 < len(self.order):
+            return self.order[k + 1]
+        return self.order[0] if self.round_trip else None
+
+    def _reverse(self, i, j):
+        """Turn positions i..j around."""
+        self.order[i:j + 1] = self.order[i:j + 1][::-1]
+        self._renumber(i, j + 1)
+
+    def two_opt(self, near, deadline):
+        """One pass of 2-opt moves. Returns True if the tour got shorter."""
+        d, order, pos = self.d, self.order, self.pos
+        n = len(order)
+        improved = False
+        i = 1
+        while i < n:
+            if deadline():
+                return improved
+            a, b = order[i - 1], order[i]
+            ab = d[a][b]
+            for c in near[a]:
+                ac = d[a][c]
+                if ac >= ab:
+                    break   # The new leg a-c must be shorter than a-b to help
+                j = pos[c]
+                if j > i:
+                    # a b ... c e  ->  a c ... b e
+                    e = self._after(j)
+                    gain = ab - ac
+                    if e is not None:
+                        gain += d[c][e] - d[b][e]
+                    if gain > 1e-9:
+                        self._reverse(i, j)
+                        improved = True
+                        break
+                elif j < i - 1:
+                    # c f ... a b  ->  c a ... f b
+                    f = order[j + 1]
+                    gain = ab + d[c][f] - ac - d[f][b]
+                    if gain > 1e-9:
+                        self._reverse(j + 1, i - 1)
+                        improved = True
+                        break
+            i += 1
+        return improved
+
+    def or_opt(self, near, deadline):
+        """One pass of Or-opt moves. Returns True if the tour got shorter."""
+        d = self.d
+        n = len(self.order)
+        improved = False
+        for length in range(1, MAX_SEGMENT + 1):
+            i = 1
+            while i + length <= n:
+                if deadline():
+                    return improved
+                if self._move_segment(i, length, near, d):
+                    improved = True
+                i += 1
+        return improved
+
+    def _move_segment(self, i, length, near, d):
+        order, pos = self.order, self.pos
+        first, last = order[i], order[i + length - 1]
+        before = order[i - 1]
+        after = self._after(i + length - 1)
+        # What taking the run out of the tour saves
+        saved = d[before][first]
+        if after is not None:
+            saved += d[last][after] - d[before][after]
+
+        best_gain, best = 1e-9, None
+        for end in (first, last):
+            for c in near[end]:
+                p = pos[c]
+                if i - 1 <= p <= i + length - 1:
+                    continue   # Next to or inside the run: nothing would change
+                for x_pos in (p - 1, p):
+                    if x_pos < 0 or i - 1 <= x_pos <= i + length - 1:
+                        continue
+                    x = order[x_pos]
+                    y = self._after(x_pos)
+                    xy = 0 if y is None else d[x][y]
+                    # Forwards (x first ... last y) or backwards (x last ... first y)
+                    for head, tail, backwards in ((first, last, False), (last, first, True)):
+                        cost = d[x][head] + (0 if y is None else d[tail][y]) - xy
+                        gain = saved - cost
+                        if gain > best_gain:
+                            best_gain, best = gain, (x_pos, backwards)
+        if best is None:
+            return False
+
+        x_pos, backwards = best
+        run = order[i:i + length]
+        if backwards:
+            run.reverse()
+        rest = order[:i] + order[i + length:]
+        at = x_pos + 1 if x_pos < i else x_pos + 1 - length
+        self.order = order = rest[:at] + run + rest[at:]
+        self._renumber(0, len(order))
+        return True
+
+
+def plan_tour(distances, start=0, round_trip=False, time_budget_ms=DEFAULT_BUDGET_MS,
+              neighbours=NEIGHBOURS):
+    """A short order to visit every stop in a distance table.
+
+    Args:
+        distances: n x n table, distances[i][j] from stop i to stop j
+        start: Stop the tour starts from
+        round_trip: True to come back to the start at the end
+        time_budget_ms: Most time to spend improving the tour
+        neighbours: Nearest stops tried for each change
+
+    Returns a dict with 'order' (stop numbers, start first), 'length',
+    'first_length' (the nearest neighbour tour), 'improvements' (passes
+    that helped), 'time_ms' and 'finished' (False if the time budget ran
+    out before no change could help).
+    """
+    started = _now_ms()
+    n = len(distances)
+    if not 0 <= start < n:
+        raise IndexError("start must be one of the stops")
+
+    order = nearest_neighbour(distances, start)
+    first_length = tour_length(distances, order, round_trip)
+    tour = _Tour(distances, order, round_trip)
+    improvements = 0
+    finished = True
+    if n > 3:
+        near = _near_lists(distances, neighbours)
+        out_of_time = lambda: _since_ms(started) > time_budget_ms
+        while True:
+            changed = tour.two_opt(near, out_of_time)
+            changed = tour.or_opt(near, out_of_time) or changed
+            if out_of_time():
+                finished = False
+                break
+            if not changed:
+                break
+            improvements += 1
+
+    return {
+        'order': tour.order,
+        'length': tour_length(distances, tour.order, round_trip),
+        'first_length': first_length,
+        'improvements': improvements,
+        'time_ms': _since_ms(started),
+        'finished': finished,
+    }
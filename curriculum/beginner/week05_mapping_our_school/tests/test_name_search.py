@@ -0,0 +1,32 @@
+"""Checks for name_search.py that need no Pico (run with pytest)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'code'))
+
+import name_search
+
+
+class PicoLetter(str):
+    """A letter whose isalpha() is True for a-z and A-Z only, as on MicroPython."""
+
+    def isalpha(self):
+        return self.isascii() and str.isalpha(self)
+
+
+def pico_fold(text):
+    return ''.join(name_search.fold_letter(PicoLetter(letter)) for letter in text)
+
+
+def test_accents_fold_without_unicodedata(monkeypatch):
+    monkeypatch.setattr(name_search, 'unicodedata', None)
+    assert pico_fold("Café") == "cafe"
+    assert pico_fold("Kantóór") == "kantoor"
+    assert pico_fold("Señor") == "senor"
+
+
+def test_gaps_and_apostrophes_without_unicodedata(monkeypatch):
+    monkeypatch.setattr(name_search, 'unicodedata', None)
+    assert pico_fold("Principal's Office") == "principals office"
+    assert pico_fold("Room 2-B") == "room 2 b"
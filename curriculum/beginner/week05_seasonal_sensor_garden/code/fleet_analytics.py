@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""Fleet Analytics - Week 5
+Analyse garden and weather logs from many schools together (runs on a computer)
+
+Every Pico in the programme saves its readings in the binary sensor log
+format (see common/lib/sensor_log.py). This tool collects the logs of
+many schools, splits the work across all CPU cores with a process pool,
+and produces one row per school per day:
+
+- number of readings and devices
+- temperature min / max / mean, mean humidity and light
+- how often the temperature and light were good for the season, and how
+  often watering was needed (using the same rules as the live garden:
+  get_current_season, check_planting_conditions, light_level_description)
+- a short planting advice summary for the day
+
+Each log file is processed independently and returns small partial
+totals, so the work grows with the number of files and the merge at the
+end stays cheap - doubling the cores roughly halves the run time.
+
+Log folder layout:
+    logs/
+        thornhill_primary/        <- one folder per school
+            garden_pico1.log
+            weather_pico2.log
+        mamelodi_west.log         <- or one file per school
+
+Usage:
+    export PYTHONPATH="$PWD/curriculum/common/lib"
+    python fleet_analytics.py logs/ --output daily_rollup.csv
+
+Requires NumPy.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from sensor_log import read_log, log_columns, FLAG_ALERT
+from garden_batch import evaluate_planting_conditions, MONTH_SEASON
+from seasonal_sensor_garden import light_level_description
+
+SECONDS_PER_DAY = 86400
+
+# South Africa Standard Time (UTC+2) - days start at local midnight
+DEFAULT_UTC_OFFSET_HOURS = 2
+
+# Seconds from 1970-01-01 to 2000-01-01, for firmware that counts from 2000
+EPOCH_2000_OFFSET = 946684800
+
+# Partial totals kept per (school, day); all of them can simply be added
+SUM_FIELDS = (
+    'readings', 'temp_sum', 'temp_count', 'humidity_sum', 'humidity_count',
+    'light_sum', 'light_count', 'climate_count', 'temperature_ok', 'light_ok',
+    'watering_needed', 'alerts',
+)
+
+CSV_COLUMNS = (
+    'school', 'date', 'season', 'devices', 'readings',
+    'temp_min', 'temp_max', 'temp_mean', 'humidity_mean', 'light_mean',
+    'light_description', 'temperature_ok_pct', 'light_ok_pct',
+    'watering_needed_pct', 'alerts', 'advice',
+)
+
+
+def find_logs(root):
+    """Return (school, device, path) for every .log file under `root`.
+
+    The school is the folder a log is in; logs directly inside `root`
+    are named after the school.
+    """
+    jobs = []
+    for folder, _, files in os.walk(root):
+        for name in sorted(files):
+            if not name.endswith('.log'):
+                continue
+            path = os.path.join(folder, name)
+            device = name[:-4]
+            if os.path.abspath(folder) == os.path.abspath(root):
+                school = device
+            else:
+                school = os.path.basename(folder)
+            jobs.append((school, device, path))
+    return jobs
+
+
+def summarise_log(school, device, path, utc_offset_s=DEFAULT_UTC_OFFSET_HOURS * 3600,
+                  epoch_offset_s=0):
+    """Daily partial totals for one device log (runs in a worker process).
+
+    Returns:
+        dict: (school, day_number) -> partial totals (see SUM_FIELDS plus
+        'temp_min', 'temp_max' and 'devices')
+    """
+    records = read_log(path)
+    if len(records) == 0:
+        return {}
+    columns = log_columns(records)
+
+    local_seconds = columns['timestamp'].astype(np.int64) + epoch_offset_s + utc_offset_s
+    days = local_seconds // SECONDS_PER_DAY
+    months = (days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64) % 12) + 1
+
+    temps = columns['temp']
+    humidity = columns['humidity']
+    light = columns['light']
+    flags = evaluate_planting_conditions(temps, humidity, light, months)
+
+    # Group readings by day with one pass of bincount per column
+    unique_days, index = np.unique(days, return_inverse=True)
+    groups = len(unique_days)
+
+    def total(values):
+        return np.bincount(index, weights=values, minlength=groups)
+
+    def count_and_sum(values):
+        valid = ~np.isnan(values)
+        return total(valid.astype(np.float64)), total(np.where(valid, values, 0.0))
+
+    temp_count, temp_sum = count_and_sum(temps)
+    humidity_count, humidity_sum = count_and_sum(humidity)
+    light_count, light_sum = count_and_sum(light)
+    # Watering advice needs a temperature or a humidity reading
+    climate_count = total((~np.isnan(temps) | ~np.isnan(humidity)).astype(np.float64))
+
+    temp_min = np.full(groups, np.inf)
+    temp_max = np.full(groups, -np.inf)
+    valid = ~np.isnan(temps)
+    np.minimum.at(temp_min, index[valid], temps[valid])
+    np.maximum.at(temp_max, index[valid], temps[valid])
+
+    sums = {
+        'readings': np.bincount(index, minlength=groups),
+        'temp_sum': temp_sum, 'temp_count': temp_count,
+        'humidity_sum': humidity_sum, 'humidity_count': humidity_count,
+        'light_sum': light_sum, 'light_count': light_count,
+        'climate_count': climate_count,
+        'temperature_ok': total(flags['temperature_ok'].astype(np.float64)),
+        'light_ok': total(flags['light_ok'].astype(np.float64)),
+        'watering_needed': total(flags['watering_needed'].astype(np.float64)),
+        'alerts': total(((columns['flags'] & FLAG_ALERT) != 0).astype(np.float64)),
+    }
+
+    partials = {}
+    for g, day in enumerate(unique_days.tolist()):
+        partial = {field: float(sums[field][g]) for field in SUM_FIELDS}
+        partial['temp_min'] = float(temp_min[g])
+        partial['temp_max'] = float(temp_max[g])
+        partial['devices'] = {device}
+        partials[(school, day)] = partial
+    return partials
+
+
+def merge_partials(into, partials):
+    """Add the partial totals of one log into the running totals."""
+    for key, partial in partials.items():
+        current = into.get(key)
+        if current is None:
+            into[key] = partial
+            continue
+        for field in SUM_FIELDS:
+            current[field] += partial[field]
+        current['temp_min'] = min(current['temp_min'], partial['temp_min'])
+        current['temp_max'] = max(current['temp_max'], partial['temp_max'])
+        current['devices'] |= partial['devices']
+    return into
+
+
+def _percent(part, whole):
+    return round(100.0 * part / whole, 1) if whole else 0.0
+
+
+def _mean(total, count):
+    return round(total / count, 2) if count else None
+
+
+def daily_advice(row):
+    """One-line planting advice for a school day, like the garden's summary."""
+    if row['temperature_ok_pct'] >= 50 and row['light_ok_pct'] >= 50:
+        return "Conditions ideal for planting"
+    if row['watering_needed_pct'] >= 50:
+        return "Watering recommended"
+    if row['temp_mean'] is not None and row['temperature_ok_pct'] < 50:
+        return "Temperature outside seasonal range - protect plants"
+    if row['light_mean'] is not None and row['light_ok_pct'] < 50:
+        return "Low light - consider a sunnier spot"
+    return "Conditions acceptable"
+
+
+def finalise(totals):
+    """Turn merged totals into sorted report rows (one dict per school day)."""
+    rows = []
+    for (school, day), t in sorted(totals.items()):
+        date = np.datetime64(day, 'D')
+        month = int(str(date)[5:7])
+        has_temp = t['temp_count'] > 0
+        row = {
+            'school': school,
+            'date': str(date),
+            'season': MONTH_SEASON[month],
+            'devices': len(t['devices']),
+            'readings': int(t['readings']),
+            'temp_min': t['temp_min'] if has_temp else None,
+            'temp_max': t['temp_max'] if has_temp else None,
+            'temp_mean': _mean(t['temp_sum'], t['temp_count']),
+            'humidity_mean': _mean(t['humidity_sum'], t['humidity_count']),
+            'light_mean': _mean(t['light_sum'], t['light_count']),
+            # Out of the readings that had the channel (weather logs have no light)
+            'temperature_ok_pct': _percent(t['temperature_ok'], t['temp_count']),
+            'light_ok_pct': _percent(t['light_ok'], t['light_count']),
+            'watering_needed_pct': _percent(t['watering_needed'], t['climate_count']),
+            'alerts': int(t['alerts']),
+        }
+        row['light_description'] = light_level_description(row['light_mean'])
+        row['advice'] = daily_advice(row)
+        rows.append(row)
+    return rows
+
+
+def run_pipeline(root, workers=None, utc_offset_hours=DEFAULT_UTC_OFFSET_HOURS, epoch_offset_s=0):
+    """Process every log under `root` in parallel and return the daily rows.
+
+    Args:
+        root: Folder containing the logs
+        workers: Number of processes (default: one per CPU core)
+        utc_offset_hours: Local time zone used to split days
+        epoch_offset_s: Seconds to add to every timestamp (EPOCH_2000_OFFSET
+            for firmware whose time.time() counts from 2000)
+    """
+    jobs = find_logs(root)
+    # Biggest files first so no worker is left with a large file at the end
+    jobs.sort(key=lambda job: os.path.getsize(job[2]), reverse=True)
+    totals = {}
+    utc_offset_s = int(utc_offset_hours * 3600)
+
+    if workers == 1:
+        for school, device, path in jobs:
+            merge_partials(totals, summarise_log(school, device, path, utc_offset_s, epoch_offset_s))
+        return finalise(totals)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(summarise_log, school, device, path, utc_offset_s, epoch_offset_s)
+                   for school, device, path in jobs]
+        for future in as_completed(futures):
+            merge_partials(totals, future.result())
+    return finalise(totals)
+
+
+def write_csv(rows, output):
+    """Write report rows as CSV to a file name or an open file."""
+    if hasattr(output, 'write'):
+        writer = csv.DictWriter(output, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+        return
+    with open(output, 'w', newline='') as f:
+        write_csv(rows, f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daily garden/weather rollups for many schools")
+    parser.add_argument('log_dir', help="folder containing school logs")
+    parser.add_argument('--output', '-o', help="CSV file to write (default: print to screen)")
+    parser.add_argument('--workers', '-j', type=int, default=None,
+                        help="worker processes (default: all CPU cores)")
+    parser.add_argument('--utc-offset', type=float, default=DEFAULT_UTC_OFFSET_HOURS,
+                        help="hours added to UTC to find local days (default: 2, SAST)")
+    parser.add_argument('--epoch-2000', action='store_true',
+                        help="timestamps count from 2000-01-01 (older MicroPython firmware)")
+    args = parser.parse_args(argv)
+
+    started = time.time()
+    rows = run_pipeline(args.log_dir, args.workers, args.utc_offset,
+                        EPOCH_2000_OFFSET if args.epoch_2000 else 0)
+    write_csv(rows, args.output or sys.stdout)
+    schools = len(set(row['school'] for row in rows))
+    print(f"\n🌍 {len(rows)} school days from {schools} schools in {time.time() - started:.1f}s",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
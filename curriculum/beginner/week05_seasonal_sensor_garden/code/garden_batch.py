@@ -0,0 +1,144 @@
+"""Garden Batch Analysis - Week 5
+Re-score many logged garden readings at once (runs on a computer)
+
+`check_planting_conditions()` looks at ONE reading, builds advice
+messages and switches LEDs. That is perfect for a live garden, but far
+too slow for re-scoring months of logged data from many schools.
+
+`evaluate_planting_conditions()` answers the same three questions for a
+whole column of readings in one pass:
+- temperature_ok:  temperature inside the season's range
+- light_ok:        light level good for plant growth
+- watering_needed: too hot for the season, or humidity too low
+
+It uses the same SEASONAL_TEMPS table and thresholds as the live
+garden, has no side effects (no LEDs, no printing), and returns arrays
+of True/False flags.
+
+With NumPy installed the work is vectorised. Without NumPy (e.g. on a
+Pico) the same results are produced with a simple loop over typed
+arrays.
+
+Missing readings are NaN (or None in plain lists) and never count as ok.
+
+Example:
+    flags = evaluate_planting_conditions(temps, humidity, light, months)
+    print(flags['watering_needed'].sum(), "readings needed watering")
+"""
+
+from array import array
+
+from seasonal_sensor_garden import (
+    SEASONAL_TEMPS,
+    LIGHT_GOOD_THRESHOLD,
+    HUMIDITY_LOW,
+    get_current_season,
+)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Season for each month, worked out once with the live garden's own rule.
+# Index 0 is unused so that MONTH_SEASON[month] works for months 1-12.
+MONTH_SEASON = [None] + [get_current_season(month) for month in range(1, 13)]
+
+# Per-month temperature limits (index 0 unused)
+MONTH_TEMP_MIN = [0.0] + [float(SEASONAL_TEMPS[s]['min']) for s in MONTH_SEASON[1:]]
+MONTH_TEMP_MAX = [0.0] + [float(SEASONAL_TEMPS[s]['max']) for s in MONTH_SEASON[1:]]
+
+FLAG_NAMES = ('temperature_ok', 'light_ok', 'watering_needed')
+
+
+def _evaluate_numpy(temps, humidity, light, months):
+    temps = np.asarray(temps, dtype=np.float32)
+    humidity = np.asarray(humidity, dtype=np.float32)
+    light = np.asarray(light, dtype=np.float32)
+    months = np.asarray(months, dtype=np.intp)
+    if np.any((months < 1) | (months > 12)):
+        raise ValueError("months must be between 1 and 12")
+
+    # Look up each reading's seasonal limits in one step
+    temp_min = np.asarray(MONTH_TEMP_MIN, dtype=np.float32)[months]
+    temp_max = np.asarray(MONTH_TEMP_MAX, dtype=np.float32)[months]
+
+    # Comparisons with NaN are always False, so missing readings are never ok
+    temperature_ok = (temps >= temp_min) & (temps <= temp_max)
+    light_ok = light > LIGHT_GOOD_THRESHOLD
+    watering_needed = (temps > temp_max) | (humidity < HUMIDITY_LOW)
+
+    return {
+        'temperature_ok': temperature_ok,
+        'light_ok': light_ok,
+        'watering_needed': watering_needed,
+    }
+
+
+def _is_missing(value):
+    return value is None or value != value
+
+
+def _evaluate_loop(temps, humidity, light, months):
+    size = len(temps)
+    flags = {name: array('b', bytes(size)) for name in FLAG_NAMES}
+    temperature_ok = flags['temperature_ok']
+    light_ok = flags['light_ok']
+    watering_needed = flags['watering_needed']
+
+    for i in range(size):
+        month = months[i]
+        if not 1 <= month <= 12:
+            raise ValueError("months must be between 1 and 12")
+        temp = temps[i]
+        if not _is_missing(temp):
+            if MONTH_TEMP_MIN[month] <= temp <= MONTH_TEMP_MAX[month]:
+                temperature_ok[i] = 1
+            elif temp > MONTH_TEMP_MAX[month]:
+                watering_needed[i] = 1
+        value = light[i]
+        if not _is_missing(value) and value > LIGHT_GOOD_THRESHOLD:
+            light_ok[i] = 1
+        value = humidity[i]
+        if not _is_missing(value) and value < HUMIDITY_LOW:
+            watering_needed[i] = 1
+
+    return flags
+
+
+def evaluate_planting_conditions(temps, humidity, light, months):
+    """Score many readings at once - a side-effect-free batch check_planting_conditions.
+
+    Args:
+        temps: Temperatures in Celsius (NaN/None = missing)
+        humidity: Humidity percentages (NaN/None = missing)
+        light: Light sensor readings 0-65535 (NaN/None = missing)
+        months: Month number (1-12) of each reading
+
+    Returns:
+        dict: 'temperature_ok', 'light_ok' and 'watering_needed' flag arrays
+        (NumPy bool arrays, or array('b') of 0/1 without NumPy)
+    """
+    size = len(temps)
+    if not (len(humidity) == len(light) == len(months) == size):
+        raise ValueError("all inputs must have the same length")
+    if NUMPY_AVAILABLE:
+        return _evaluate_numpy(temps, humidity, light, months)
+    return _evaluate_loop(temps, humidity, light, months)
+
+
+def summarise_flags(flags):
+    """Count how many readings had each flag set.
+
+    Returns:
+        dict: flag name -> count, plus 'readings' for the total
+    """
+    summary = {}
+    readings = 0
+    for name in FLAG_NAMES:
+        values = flags[name]
+        readings = len(values)
+        summary[name] = int(sum(values)) if not NUMPY_AVAILABLE else int(np.count_nonzero(values))
+    summary['readings'] = readings
+    return summary
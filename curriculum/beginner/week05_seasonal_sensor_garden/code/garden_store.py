@@ -0,0 +1,245 @@
+"""Garden Data Store - Week 5
+Memory-safe storage for Seasonal Sensor Garden readings
+
+The sensor garden can run for weeks. If every reading is kept in a
+growing list of dictionaries the Pico eventually runs out of memory.
+This module keeps readings in RING BUFFERS instead: a fixed number of
+slots that are reused in a circle, so the newest reading always
+replaces the oldest one and memory use never grows.
+
+Each channel (temperature, humidity, light) is stored in its own typed
+`array`, which uses 4 bytes per value instead of the ~60 bytes a Python
+float inside a dict costs.
+
+Three resolutions are kept at the same time:
+- raw:    every reading as it arrives
+- minute: the average of each minute
+- hour:   the average of each hour
+
+Learning Objectives:
+- Understanding memory as a limited resource
+- Using loops that "wrap around" (modulo arithmetic)
+- Summarising data with min, max and mean
+
+Ubuntu Connection: Sharing limited resources fairly - old readings make
+room for new ones!
+"""
+
+from array import array
+
+# Channels stored for every reading
+CHANNELS = ('temperature', 'humidity', 'light')
+
+# Bucket size in seconds for each resolution (raw readings are not bucketed)
+RESOLUTION_SECONDS = {
+    'raw': 0,
+    'minute': 60,
+    'hour': 3600,
+}
+
+# Default number of slots per resolution.
+# 360 raw readings = 30 minutes at one reading every 5 seconds (up to
+# 6 hours at one a minute), 720 minutes = 12 hours, 336 hours = 14 days.
+DEFAULT_CAPACITY = {
+    'raw': 360,
+    'minute': 720,
+    'hour': 336,
+}
+
+# Marker for a missing reading (sensor not available)
+MISSING = float('nan')
+
+
+def _is_missing(value):
+    """Return True for None or NaN (NaN is the only value not equal to itself)."""
+    return value is None or value != value
+
+
+class RingBuffer:
+    """Fixed-capacity time series with one typed array per channel.
+
+    Appending overwrites the oldest slot once the buffer is full, so
+    append is O(1) and memory use is fixed when the buffer is created.
+    """
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.timestamps = array('I', [0] * capacity)
+        self.channels = {}
+        for name in CHANNELS:
+            self.channels[name] = array('f', [MISSING] * capacity)
+        self.head = 0   # Next slot to write
+        self.count = 0  # Number of slots holding data
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, values):
+        """Store one sample.
+
+        Args:
+            timestamp: Time of the sample in whole seconds
+            values: Dict mapping channel name to value (None = missing)
+        """
+        slot = self.head
+        self.timestamps[slot] = int(timestamp)
+        for name in CHANNELS:
+            value = values.get(name)
+            self.channels[name][slot] = MISSING if value is None else value
+        self.head = (slot + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def _slots(self, last_n=None):
+        """Yield slot indices from oldest to newest, limited to the last N."""
+        n = self.count if last_n is None else min(last_n, self.count)
+        start = (self.head - n) % self.capacity
+        for offset in range(n):
+            yield (start + offset) % self.capacity
+
+    def values(self, channel, last_n=None):
+        """Return (timestamp, value) pairs from oldest to newest."""
+        data = self.channels[channel]
+        return [(self.timestamps[slot], data[slot]) for slot in self._slots(last_n)]
+
+    def window(self, channel, last_n=None):
+        """Calculate min, max and mean of a channel over the last N samples.
+
+        Missing readings are skipped.
+
+        Returns:
+            dict: {'min', 'max', 'mean', 'count'} or None if there is no data
+        """
+        data = self.channels[channel]
+        low = high = None
+        total = 0.0
+        count = 0
+        for slot in self._slots(last_n):
+            value = data[slot]
+            if _is_missing(value):
+                continue
+            if low is None or value < low:
+                low = value
+            if high is None or value > high:
+                high = value
+            total += value
+            count += 1
+        if count == 0:
+            return None
+        return {'min': low, 'max': high, 'mean': total / count, 'count': count}
+
+
+class _Bucket:
+    """Running sum of the readings that fall inside one time bucket."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.start = None
+        self.sums = {}
+        self.counts = {}
+        self.reset(None)
+
+    def reset(self, start):
+        self.start = start
+        for name in CHANNELS:
+            self.sums[name] = 0.0
+            self.counts[name] = 0
+
+    def add(self, values):
+        for name in CHANNELS:
+            value = values.get(name)
+            if not _is_missing(value):
+                self.sums[name] += value
+                self.counts[name] += 1
+
+    def means(self):
+        means = {}
+        for name in CHANNELS:
+            if self.counts[name]:
+                means[name] = self.sums[name] / self.counts[name]
+            else:
+                means[name] = None
+        return means
+
+
+class GardenStore:
+    """Multi-resolution store for garden readings.
+
+    Example:
+        store = GardenStore()
+        store.append(time.time(), temp, humidity, light_value)
+        store.window('temperature', 12)            # last 12 raw readings
+        store.window('light', 60, 'minute')        # last hour of minutes
+    """
+
+    def __init__(self, capacity=None):
+        """Create the store.
+
+        Args:
+            capacity: Optional dict overriding DEFAULT_CAPACITY per resolution
+        """
+        sizes = dict(DEFAULT_CAPACITY)
+        if capacity:
+            sizes.update(capacity)
+        self.buffers = {}
+        self.buckets = {}
+        for resolution in RESOLUTION_SECONDS:
+            self.buffers[resolution] = RingBuffer(sizes[resolution])
+            if RESOLUTION_SECONDS[resolution]:
+                self.buckets[resolution] = _Bucket(RESOLUTION_SECONDS[resolution])
+        self.total_readings = 0
+
+    def append(self, timestamp, temp, humidity, light_value):
+        """Store one garden reading at every resolution. O(1).
+
+        Args:
+            timestamp: Time of the reading in seconds (e.g. time.time())
+            temp: Temperature in Celsius or None
+            humidity: Humidity percentage or None
+            light_value: Light sensor reading or None
+        """
+        timestamp = int(timestamp)
+        values = {'temperature': temp, 'humidity': humidity, 'light': light_value}
+        self.buffers['raw'].append(timestamp, values)
+
+        for resolution, bucket in self.buckets.items():
+            start = timestamp - timestamp % bucket.seconds
+            if bucket.start is not None and start != bucket.start:
+                # A new minute/hour has begun - save the finished bucket
+                self.buffers[resolution].append(bucket.start, bucket.means())
+                bucket.reset(start)
+            elif bucket.start is None:
+                bucket.reset(start)
+            bucket.add(values)
+
+        self.total_readings += 1
+
+    def flush(self):
+        """Save the partly filled minute and hour buckets (e.g. before stopping)."""
+        for resolution, bucket in self.buckets.items():
+            if bucket.start is not None:
+                self.buffers[resolution].append(bucket.start, bucket.means())
+                bucket.reset(None)
+
+    def window(self, channel, last_n=None, resolution='raw'):
+        """Min, max and mean of a channel over the last N samples of a resolution."""
+        return self.buffers[resolution].window(channel, last_n)
+
+    def series(self, channel, resolution='raw', last_n=None):
+        """Return (timestamp, value) pairs for graphing, oldest first."""
+        return self.buffers[resolution].values(channel, last_n)
+
+    def __len__(self):
+        return len(self.buffers['raw'])
+
+    def memory_bytes(self):
+        """Approximate bytes used by the sample arrays (fixed at creation)."""
+        total = 0
+        for buffer in self.buffers.values():
+            slots = buffer.capacity
+            total += slots * buffer.timestamps.itemsize
+            for data in buffer.channels.values():
+                total += slots * data.itemsize
+        return total
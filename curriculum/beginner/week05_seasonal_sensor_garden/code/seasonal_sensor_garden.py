@@ -21,31 +21,85 @@ Hardware Setup:
 Ubuntu Connection: Growing together feeds our community!
 """
 
-import machine
-import dht
 import time
-from machine import Pin, ADC
+from garden_store import GardenStore
+from sampling_scheduler import Scheduler
+from adaptive_sampling import AdaptiveSampler
+from sensor_cache import cached_reading, DHT11_MIN_INTERVAL_MS
+from stream_stats import TemperatureWatch, describe_alert
+from sensor_log import SensorLogWriter, FLAG_ALERT
+
+try:
+    import machine
+    import dht
+    from machine import Pin, ADC
+    PICO_AVAILABLE = True
+except ImportError:
+    # Running on a computer (e.g. analysing logged data with garden_batch.py)
+    PICO_AVAILABLE = False
 
 # ========== SENSOR SETUP ==========
 
-# Temperature and Humidity sensor (DHT11/DHT22)
-try:
-    dht_sensor = dht.DHT11(Pin(16))  # Change to DHT22 if using that sensor
-    sensor_type = "DHT11"
-except:
-    print("DHT sensor not found on GPIO 16. Check wiring!")
-    dht_sensor = None
+class _NoLED:
+    """Stand-in LED used when no Pico is connected."""
+    def on(self):
+        pass
+    
+    def off(self):
+        pass
 
-# Light sensor (LDR - Light Dependent Resistor)
-try:
-    ldr = ADC(Pin(26))  # ADC0 on GPIO 26
-except:
-    print("LDR not found on GPIO 26. Check wiring!")
+if PICO_AVAILABLE:
+    # Temperature and Humidity sensor (DHT11/DHT22)
+    try:
+        dht_sensor = dht.DHT11(Pin(16))  # Change to DHT22 if using that sensor
+        sensor_type = "DHT11"
+    except:
+        print("DHT sensor not found on GPIO 16. Check wiring!")
+        dht_sensor = None
+    
+    # Light sensor (LDR - Light Dependent Resistor)
+    try:
+        ldr = ADC(Pin(26))  # ADC0 on GPIO 26
+    except:
+        print("LDR not found on GPIO 26. Check wiring!")
+        ldr = None
+    
+    # Optional: LED indicators
+    temp_led = Pin(15, Pin.OUT)  # Red LED for high temperature warning
+    light_led = Pin(14, Pin.OUT) # Yellow LED for light level indicator
+else:
+    dht_sensor = None
     ldr = None
+    temp_led = _NoLED()
+    light_led = _NoLED()
+
+# Task periods in milliseconds - each sensor runs at its own speed
+LIGHT_PERIOD_MS = 100     # LDR: 10 readings per second
+LED_PERIOD_MS = 200
+
+# The climate reading and the report adapt: fast while conditions
+# change, slow while they are steady (see adaptive_sampling.py). The
+# light task still watches 10 times a second and brings them forward
+# when the light jumps.
+SAMPLE_MIN_PERIOD_MS = 5000   # Changing: a report every 5 seconds
+SAMPLE_MAX_PERIOD_MS = 60000  # Steady (e.g. at night): one a minute
+REPORT_AFTER_MS = 40          # The report runs just after each climate reading
+TEMP_STEP = 1.5     # °C change worth reading faster (DHT11 shows whole degrees)
+LIGHT_STEP = 4000   # LDR change worth reading faster (a passing cloud)
 
-# Optional: LED indicators
-temp_led = Pin(15, Pin.OUT)  # Red LED for high temperature warning
-light_led = Pin(14, Pin.OUT) # Yellow LED for light level indicator
+# On battery: sleep the Pico between readings (USB serial stops while asleep)
+LOW_POWER = False
+
+# Light level above which most plants grow well
+LIGHT_GOOD_THRESHOLD = 30000
+
+# Binary data log, analysed on a computer with fleet_analytics.py
+LOG_FILE = "garden.log"
+LOG_MAX_RECORDS = 50000  # About 600 KB, then the log starts again
+
+# Humidity limits for watering advice (percent)
+HUMIDITY_LOW = 40   # Below this: time to water
+HUMIDITY_HIGH = 80  # Above this: no watering needed
 
 # ========== SOUTH AFRICAN SEASONAL DATA ==========
 
@@ -87,9 +141,13 @@ SEASONAL_CROPS = {
 
 # ========== HELPER FUNCTIONS ==========
 
+@cached_reading(DHT11_MIN_INTERVAL_MS)  # Use DHT22_MIN_INTERVAL_MS for a DHT22
 def read_temperature_humidity():
     """Read temperature and humidity from DHT sensor.
     
+    Calls within DHT11_MIN_INTERVAL_MS share the last measurement
+    (see sensor_cache.py), so several tasks can ask safely.
+    
     Returns:
         tuple: (temperature_celsius, humidity_percent) or (None, None) if error
     """
@@ -197,7 +255,7 @@ def check_planting_conditions(temp, humidity, light_value, season):
     
     # Check light levels
     if light_value is not None:
-        if light_value > 30000:  # Good light for most plants
+        if light_value > LIGHT_GOOD_THRESHOLD:  # Good light for most plants
             advice['light_ok'] = True
             advice['messages'].append(f"☀️ Light level is good for plant growth!")
             light_led.on()
@@ -207,10 +265,10 @@ def check_planting_conditions(temp, humidity, light_value, season):
     
     # Check humidity for watering needs
     if humidity is not None:
-        if humidity < 40:
+        if humidity < HUMIDITY_LOW:
             advice['watering_needed'] = True
             advice['messages'].append(f"💧 Humidity {humidity}% is low. Time to water!")
-        elif humidity > 80:
+        elif humidity > HUMIDITY_HIGH:
             advice['messages'].append(f"💦 Humidity {humidity}% is high. No watering needed today.")
         else:
             advice['messages'].append(f"✓ Humidity {humidity}% is good.")
@@ -233,6 +291,19 @@ def display_seasonal_info(season):
         print(f"   • {crop}")
     print()
 
+def display_recent_summary(store, last_n):
+    """Show min/max/average of the last N readings kept in the garden store."""
+    print(f"\n📈 LAST {last_n} READINGS:")
+    units = {'temperature': '°C', 'humidity': '%', 'light': ''}
+    for channel in ('temperature', 'humidity', 'light'):
+        stats = store.window(channel, last_n)
+        if stats is None:
+            print(f"   {channel.title()}: no data")
+        else:
+            unit = units[channel]
+            print(f"   {channel.title()}: min {stats['min']:.0f}{unit}, "
+                  f"max {stats['max']:.0f}{unit}, average {stats['mean']:.1f}{unit}")
+
 def sensor_garden_demo():
     """Main demonstration - collect data and provide planting advice."""
     print("\n" + "*"*60)
@@ -253,56 +324,121 @@ def sensor_garden_demo():
     display_seasonal_info(season)
     
     print("\n📊 STARTING SENSOR MONITORING...")
-    print("(Taking readings every 5 seconds. Press Ctrl+C to stop)\n")
+    print("(Reporting every 5 to 60 seconds. Press Ctrl+C to stop)\n")
     
-    reading_count = 0
+    # Latest readings shared between the tasks
+    state = {'temp': None, 'humidity': None, 'light': None, 'reading_count': 0}
     
-    try:
-        while True:
-            reading_count += 1
-            print(f"\n--- Reading #{reading_count} ---")
-            
-            # Read sensors
-            temp, humidity = read_temperature_humidity()
-            light_value = read_light_level()
-            
-            # Display readings
-            if temp is not None:
-                print(f"🌡️  Temperature: {temp}°C")
-            else:
-                print("🌡️  Temperature: Sensor not available")
-            
-            if humidity is not None:
-                print(f"💧 Humidity: {humidity}%")
-            else:
-                print("💧 Humidity: Sensor not available")
-            
-            if light_value is not None:
-                print(f"☀️  Light Level: {light_value} ({light_level_description(light_value)})")
+    # Fixed-size memory for readings - safe to run for weeks
+    store = GardenStore()
+    
+    # Frost warning system: watches the temperature trend and warns
+    # before it gets too cold (or hot enough to stress the plants). The
+    # season's 'max' is only a typical day, so it is not a heat limit.
+    temp_watch = TemperatureWatch()
+    
+    # Every reading is also saved to flash (12 bytes each, see sensor_log.py)
+    data_logger = SensorLogWriter(LOG_FILE, max_records=LOG_MAX_RECORDS)
+    
+    # Reads often while conditions change, rarely while they are steady
+    sampler = AdaptiveSampler(SAMPLE_MIN_PERIOD_MS, SAMPLE_MAX_PERIOD_MS)
+    sampler.watch('temp', step=TEMP_STEP)
+    sampler.watch('light', step=LIGHT_STEP)
+    
+    def read_light():
+        # The LDR is fast, so we can check it 10 times a second
+        light_value = state['light'] = read_light_level()
+        # A big jump (a cloud, lights switched off): read and report now
+        if sampler.moved('light', light_value) >= 1:
+            set_period(sampler.update(time.time(), light=light_value))
+            scheduler.run_soon(climate_task)
+            scheduler.run_soon(report_task, REPORT_AFTER_MS)
+    
+    def read_climate():
+        # The DHT sensor is slow - at most one reading per second
+        state['temp'], state['humidity'] = read_temperature_humidity()
+        # Choose when to read and report next
+        set_period(sampler.update(time.time(), temp=state['temp'], light=state['light']))
+    
+    def set_period(period):
+        climate_task.period_ms = period
+        report_task.period_ms = period
+    
+    def refresh_light_led():
+        light_value = state['light']
+        if light_value is not None:
+            if light_value > LIGHT_GOOD_THRESHOLD:
+                light_led.on()
             else:
-                print("☀️  Light Level: Sensor not available")
-            
-            # Analyze conditions and provide advice
-            if temp is not None or light_value is not None:
-                advice = check_planting_conditions(temp, humidity, light_value, season)
-                
-                print("\n📝 PLANTING ADVICE:")
-                for message in advice['messages']:
-                    print(f"   {message}")
-                
-                # Summary
-                if advice['temperature_ok'] and advice['light_ok']:
-                    print("\n✅ CONDITIONS ARE IDEAL FOR PLANTING!")
-                elif advice['watering_needed']:
-                    print("\n💧 WATERING RECOMMENDED TODAY")
+                light_led.off()
+    
+    def report():
+        state['reading_count'] += 1
+        reading_count = state['reading_count']
+        print(f"\n--- Reading #{reading_count} ---")
+        
+        temp, humidity, light_value = state['temp'], state['humidity'], state['light']
+        store.append(time.time(), temp, humidity, light_value)
+        
+        # Display readings
+        if temp is not None:
+            print(f"🌡️  Temperature: {temp}°C")
+        else:
+            print("🌡️  Temperature: Sensor not available")
+        
+        if humidity is not None:
+            print(f"💧 Humidity: {humidity}%")
+        else:
+            print("💧 Humidity: Sensor not available")
+        
+        if light_value is not None:
+            print(f"☀️  Light Level: {light_value} ({light_level_description(light_value)})")
+        else:
+            print("☀️  Light Level: Sensor not available")
+        
+        # Analyze conditions and provide advice
+        if temp is not None or light_value is not None:
+            advice = check_planting_conditions(temp, humidity, light_value, season)
             
-            # Wait before next reading
-            time.sleep(5)
+            print("\n📝 PLANTING ADVICE:")
+            for message in advice['messages']:
+                print(f"   {message}")
             
+            # Summary
+            if advice['temperature_ok'] and advice['light_ok']:
+                print("\n✅ CONDITIONS ARE IDEAL FOR PLANTING!")
+            elif advice['watering_needed']:
+                print("\n💧 WATERING RECOMMENDED TODAY")
+        
+        # Early frost/heat warnings
+        alerts = temp_watch.update(time.time(), temp)
+        for alert in alerts:
+            print(f"\n{describe_alert(alert)}")
+        
+        # Save the reading for long-term analysis
+        data_logger.append(time.time(), temp, humidity, light_value, FLAG_ALERT if alerts else 0)
+        
+        # Every 12 readings, summarise the recent data
+        if reading_count % 12 == 0:
+            display_recent_summary(store, 12)
+    
+    # Each job runs at its own speed (see sampling_scheduler.py)
+    scheduler = Scheduler(low_power=LOW_POWER)
+    scheduler.every("light", LIGHT_PERIOD_MS, read_light)
+    climate_task = scheduler.every("climate", sampler.period_ms, read_climate, offset_ms=20)
+    scheduler.every("led", LED_PERIOD_MS, refresh_light_led, offset_ms=40)
+    report_task = scheduler.every("report", sampler.period_ms, report, offset_ms=20 + REPORT_AFTER_MS)
+    
+    try:
+        scheduler.run()
     except KeyboardInterrupt:
         print("\n\n" + "="*60)
         print("SENSOR MONITORING STOPPED")
-        print(f"Total readings collected: {reading_count}")
+        print(f"Total readings collected: {state['reading_count']}")
+        store.flush()
+        display_recent_summary(store, len(store))
+        scheduler.print_stats()
+        sampler.print_stats()
         print("="*60)
         print("\n🌟 COMPUTATIONAL THINKING CONCEPTS USED:")
         print("   • Data Collection: Gathering sensor information")
@@ -315,6 +451,9 @@ def sensor_garden_demo():
         print("\n   Ubuntu ngumuntu ngabantu - I am because we are! 🌱")
         print("="*60 + "\n")
     finally:
+        # Save readings still waiting in memory
+        data_logger.close()
+        
         # Turn off LEDs
         temp_led.off()
         light_led.off()
@@ -329,10 +468,13 @@ if __name__ == "__main__":
 #
 # 1. Add soil moisture sensor for automatic watering alerts
 # 2. Log data to a file for long-term analysis
+#    (readings are saved to garden.log - analyse many schools' logs
+#    together on a computer with fleet_analytics.py)
 # 3. Create graphs showing daily/weekly temperature patterns
 # 4. Add more indigenous crops to the seasonal database
 # 5. Interview community elders and add their traditional planting wisdom
 # 6. Create a "frost warning" system for winter
+#    (stream_stats.TemperatureWatch already warns early - try changing frost_temp)
 # 7. Build a mini weather station with multiple sensors
 # 8. Design a seasonal planting calendar based on local climate
 #
@@ -1,27 +1,33 @@
 import time
 import board
 import neopixel
+from pattern_tree import Repeat, steps
 
 
 pixels = neopixel.NeoPixel(board.NEOPIXEL, 10, brightness=0.3, auto_write=False)
 
 
+# Each pattern is its repeating unit and how many times it repeats
+# (see common/lib/pattern_tree.py): the beads are made one at a time
+# as they are shown, never stored as a long list.
 ZULU_PATTERNS = [
-    [(255, 0, 0), (0, 0, 0)] * 5,
-    [(0, 255, 0), (255, 255, 0)] * 5,
-    [(255, 0, 0), (255, 255, 255), (0, 0, 0), (255, 255, 255), (255, 0, 0)] * 2,
+    Repeat(5, (255, 0, 0), (0, 0, 0)),
+    Repeat(5, (0, 255, 0), (255, 255, 0)),
+    Repeat(2, (255, 0, 0), (255, 255, 255), (0, 0, 0), (255, 255, 255), (255, 0, 0)),
 ]
 
 NDEBELE_PATTERNS = [
-    [(0, 0, 255), (255, 255, 0)] * 5,
-    [(255, 0, 0), (0, 0, 255), (255, 255, 255), (0, 0, 255), (255, 0, 0)] * 2,
+    Repeat(5, (0, 0, 255), (255, 255, 0)),
+    Repeat(2, (255, 0, 0), (0, 0, 255), (255, 255, 255), (0, 0, 255), (255, 0, 0)),
 ]
 
 ALL_PATTERNS = ZULU_PATTERNS + NDEBELE_PATTERNS
 
 
 def show_pattern(pattern, pause=0.5) -> None:
-    for index, colour in enumerate(pattern[:10]):
+    for index, colour in enumerate(steps(pattern)):
+        if index == 10:
+            break
         pixels[index] = colour
     pixels.show()
     time.sleep(pause)
@@ -0,0 +1,72 @@
+"""Host version of the `adafruit_circuitplayground` library (see sam_hal.py).
+
+Provides the `cp` object with the buttons, switch, touch pads, shake
+detection, pixels, red LED and tone player used by the curriculum.
+"""
+
+import time
+
+import sam_hal
+from neopixel import NeoPixel
+
+_INPUTS = ('button_a', 'button_b', 'touch_A1', 'touch_A2', 'touch_A3',
+           'touch_A4', 'touch_A5', 'touch_A6', 'touch_TX', 'shake')
+
+
+class _CircuitPlayground:
+    def __init__(self):
+        self.pixels = NeoPixel("NEOPIXEL", 10, brightness=0.2)
+        self._red_led = False
+        self._registered = False
+
+    def _read(self, name, default=False):
+        backend = sam_hal.get_backend()
+        if not self._registered:
+            # Register buttons in a fixed order so the simulator presses
+            # them in turn, whichever one the program checks first
+            for input_name in _INPUTS:
+                backend.register_input('cp:' + input_name)
+            self._registered = True
+        return backend.read('cp:' + name, default)
+
+    def __getattr__(self, name):
+        if name in _INPUTS:
+            return bool(self._read(name))
+        raise AttributeError(name)
+
+    @property
+    def switch(self):
+        return bool(self._read('switch'))
+
+    def shake(self, shake_threshold=30):
+        return bool(self._read('shake'))
+
+    @property
+    def temperature(self):
+        return self._read('temperature', 22.0)
+
+    @property
+    def light(self):
+        return self._read('light', 300)
+
+    @property
+    def red_led(self):
+        return self._red_led
+
+    @red_led.setter
+    def red_led(self, value):
+        self._red_led = bool(value)
+        sam_hal.get_backend().output('cp:red_led', self._red_led)
+
+    def play_tone(self, frequency, duration):
+        sam_hal.get_backend().output('cp:tone', [frequency, duration])
+        time.sleep(duration)
+
+    def start_tone(self, frequency):
+        sam_hal.get_backend().output('cp:tone', [frequency, None])
+
+    def stop_tone(self):
+        sam_hal.get_backend().output('cp:tone', [0, None])
+
+
+cp = _CircuitPlayground()
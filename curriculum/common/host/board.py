@@ -0,0 +1,12 @@
+"""Host version of the CircuitPython `board` module (see sam_hal.py).
+
+Pins are just names here: board.NEOPIXEL == "NEOPIXEL", board.A1 == "A1".
+"""
+
+NEOPIXEL = "NEOPIXEL"
+
+
+def __getattr__(name):
+    if name[:1].isupper():
+        return name
+    raise AttributeError(name)
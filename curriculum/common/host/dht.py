@@ -0,0 +1,38 @@
+"""Host version of MicroPython's `dht` module (see sam_hal.py)."""
+
+import sam_hal
+
+
+class DHTBase:
+    """Temperature/humidity sensor. measure() takes a reading from the backend."""
+
+    decimals = 1
+
+    def __init__(self, pin):
+        self.channel = f"dht:{getattr(pin, 'id', pin)}"
+        self._temperature = None
+        self._humidity = None
+
+    def measure(self):
+        value = sam_hal.get_backend().read(self.channel, None)
+        if value is None:
+            raise OSError(110, "ETIMEDOUT")  # What a disconnected sensor gives
+        temperature, humidity = value
+        self._temperature = round(temperature, self.decimals)
+        self._humidity = round(humidity, self.decimals)
+
+    def temperature(self):
+        return self._temperature
+
+    def humidity(self):
+        return self._humidity
+
+
+class DHT11(DHTBase):
+    """DHT11 - whole degrees and whole percent."""
+
+    decimals = None  # round(x, None) gives an int
+
+
+class DHT22(DHTBase):
+    """DHT22 - one decimal place."""
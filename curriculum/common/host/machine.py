@@ -0,0 +1,237 @@
+"""Host version of MicroPython's `machine` module (see sam_hal.py).
+
+Only the parts used by the curriculum programs are provided.
+"""
+
+import threading
+import time
+
+import sam_clock
+import sam_hal
+
+# Held while "interrupts are disabled"; timer callbacks wait for it
+_irq_lock = threading.RLock()
+
+
+def _pin_id(pin):
+    return pin.id if isinstance(pin, Pin) else pin
+
+
+class Pin:
+    """A GPIO pin. Outputs are recorded; inputs come from the HAL backend."""
+
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.channel = f"pin:{id}"
+        self._value = 0
+        self._handler = None
+        self._trigger = 0
+        self.init(mode, pull, value)
+
+    def init(self, mode=-1, pull=-1, value=None):
+        if mode != -1:
+            self.mode = mode
+        elif not hasattr(self, 'mode'):
+            self.mode = self.IN
+        if pull != -1:
+            self.pull = pull
+        elif not hasattr(self, 'pull'):
+            self.pull = None
+        if self.mode == self.IN:
+            sam_hal.get_backend().register_input(self.channel)
+        if value is not None:
+            self.value(value)
+
+    def value(self, x=None):
+        if x is None:
+            if self.mode == self.OUT:
+                return self._value
+            pressed = sam_hal.get_backend().read(self.channel, None)
+            if pressed is None:
+                # Nothing connected: the pull resistor decides
+                return 1 if self.pull == self.PULL_UP else 0
+            if isinstance(pressed, bool):
+                # Pressed buttons pull the pin away from its resting level
+                return (0 if pressed else 1) if self.pull == self.PULL_UP else int(pressed)
+            return int(pressed)
+        self._value = 1 if x else 0
+        sam_hal.get_backend().output(self.channel, self._value)
+
+    def __call__(self, x=None):
+        return self.value(x)
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    high = on
+    low = off
+
+    def toggle(self):
+        self.value(0 if self._value else 1)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING):
+        self._handler = handler
+        self._trigger = trigger
+
+    def __repr__(self):
+        return f"Pin({self.id})"
+
+
+class ADC:
+    """Analog input. ADC(26), ADC(Pin(26)) and ADC(0) all mean GPIO 26."""
+
+    def __init__(self, pin):
+        gpio = _pin_id(pin)
+        if isinstance(gpio, int) and 0 <= gpio <= 4:
+            gpio += 26  # ADC channel number -> GPIO
+        self.channel = f"adc:{gpio}"
+
+    def read_u16(self):
+        value = sam_hal.get_backend().read(self.channel, 0)
+        return int(value)
+
+
+class PWM:
+    """PWM output (buzzers, dimmable LEDs). Settings are recorded as outputs."""
+
+    def __init__(self, pin, freq=None, duty_u16=None):
+        self.channel = f"pwm:{_pin_id(pin)}"
+        self._freq = 1000
+        self._duty = 0
+        if freq is not None:
+            self.freq(freq)
+        if duty_u16 is not None:
+            self.duty_u16(duty_u16)
+
+    def freq(self, value=None):
+        if value is None:
+            return self._freq
+        self._freq = int(value)
+        sam_hal.get_backend().output(self.channel + ':freq', self._freq)
+
+    def duty_u16(self, value=None):
+        if value is None:
+            return self._duty
+        self._duty = int(value)
+        sam_hal.get_backend().output(self.channel + ':duty', self._duty)
+
+    def deinit(self):
+        self._duty = 0
+        sam_hal.get_backend().output(self.channel + ':deinit', True)
+
+
+class Timer:
+    """Software timer calling `callback(timer)` after `period` ms, once or repeatedly.
+
+    Runs on the HAL clock (see sam_clock.py). A periodic timer is re-armed
+    from its last due time, not from when its callback ran, so it does not
+    drift, as on the board.
+    """
+
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, **kwargs):
+        self.id = id
+        self._call = None
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, mode=PERIODIC, freq=-1, period=-1, callback=None, hard=None):
+        self.deinit()
+        if freq > 0:
+            self._period_us = max(1, round(1_000_000 / freq))
+        elif period >= 0:
+            self._period_us = max(1, int(period) * 1000)
+        else:
+            raise ValueError("Timer needs a period or a freq")
+        self.mode = mode
+        self._callback = callback
+        self._clock = sam_clock.get_clock()
+        if freq > 0:
+            self._due_us = self._clock.ticks_us() + self._period_us
+        else:
+            # Counted in whole ticks_ms(), as on the board
+            self._due_us = self._clock.ticks_ms() * 1000 + self._period_us
+        self._call = self._clock.call_at_us(self._due_us, self._fire)
+
+    def _fire(self):
+        if self.mode == self.PERIODIC:
+            self._due_us += self._period_us
+            self._call = self._clock.call_at_us(self._due_us, self._fire)
+        else:
+            self._call = None
+        if self._callback is not None:
+            with _irq_lock:
+                self._callback(self)
+
+    def deinit(self):
+        if self._call is not None:
+            self._call.cancel()
+            self._call = None
+
+    def __repr__(self):
+        return f"Timer({self.id})"
+
+
+def time_pulse_us(pin, pulse_level, timeout_us=1000000):
+    """Length in µs of the next pulse at `pulse_level` on `pin`.
+
+    Returns -2 if no pulse starts within `timeout_us` and -1 if the pulse
+    is longer than that, as on the board. On the host the length comes
+    from the backend channel "echo:<gpio>" (e.g. an HC-SR04 echo pin),
+    and the wait passes on the HAL clock.
+    """
+    width = sam_hal.get_backend().read(f"echo:{_pin_id(pin)}", None)
+    if width is None:
+        time.sleep_us(timeout_us)
+        return -2
+    width = int(width)
+    if width > timeout_us:
+        time.sleep_us(timeout_us)
+        return -1
+    time.sleep_us(width)
+    return width
+
+
+def freq():
+    """CPU frequency of a Raspberry Pi Pico."""
+    return 125_000_000
+
+
+def lightsleep(time_ms=None):
+    """Low-power sleep. Recorded as an output, then waits on the HAL clock."""
+    sam_hal.get_backend().output('machine:lightsleep', time_ms)
+    if time_ms is not None:
+        time.sleep_ms(time_ms)
+
+
+def disable_irq():
+    """Hold back timer callbacks until enable_irq(); returns the state to pass it."""
+    _irq_lock.acquire()
+    return True
+
+
+def enable_irq(state=True):
+    """Let timer callbacks run again (undoes one disable_irq())."""
+    if state:
+        _irq_lock.release()
+
+
+def unique_id():
+    return b'SAMHOST0'
+
+
+def reset():
+    raise SystemExit("machine.reset()")
@@ -0,0 +1,39 @@
+"""Host version of the CircuitPython `neopixel` module (see sam_hal.py)."""
+
+import sam_hal
+
+
+class NeoPixel:
+    """A strip of RGB pixels. Every update of the strip is recorded as an output."""
+
+    def __init__(self, pin, n, brightness=1.0, auto_write=True, pixel_order=None, bpp=3):
+        self.channel = f"neopixel:{pin}"
+        self.n = n
+        self.brightness = brightness
+        self.auto_write = auto_write
+        self._pixels = [(0, 0, 0)] * n
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, index):
+        return self._pixels[index]
+
+    def __setitem__(self, index, colour):
+        if isinstance(index, slice):
+            self._pixels[index] = [tuple(c) for c in colour]
+        else:
+            self._pixels[index] = tuple(colour)
+        if self.auto_write:
+            self.show()
+
+    def fill(self, colour):
+        self._pixels = [tuple(colour)] * self.n
+        if self.auto_write:
+            self.show()
+
+    def show(self):
+        sam_hal.get_backend().output(self.channel, list(self._pixels))
+
+    def deinit(self):
+        self.fill((0, 0, 0))
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Run a curriculum program on a computer using the SAM HAL.
+
+Examples:
+    python curriculum/common/host/run_program.py \\
+        curriculum/beginner/week05_seasonal_sensor_garden/code/seasonal_sensor_garden.py --seconds 30
+
+    python curriculum/common/host/run_program.py weather_sensor.py \\
+        --backend replay --trace weather_trace.jsonl
+
+    python curriculum/common/host/run_program.py story_script.py --clock virtual
+
+After `--seconds` of program time the program is interrupted exactly as if
+Ctrl+C had been pressed, so its clean-up code runs. With `--clock virtual`
+sleeps return at once, so that can be hours of program time in a few
+seconds. A summary of inputs read and outputs written is printed at the end.
+"""
+
+import argparse
+import os
+import runpy
+import signal
+import sys
+import threading
+import _thread
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+LIB_DIR = os.path.join(os.path.dirname(HOST_DIR), 'lib')
+
+
+def _interrupt():
+    """Press Ctrl+C for the program: a real SIGINT also wakes a sleeping event loop."""
+    if os.name == 'posix':
+        os.kill(os.getpid(), signal.SIGINT)
+    else:
+        _thread.interrupt_main()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a curriculum program under the SAM HAL")
+    parser.add_argument('program', help="path to the curriculum .py file")
+    parser.add_argument('--backend', choices=('sim', 'replay'), default=None,
+                        help="HAL backend (default: $SAM_HAL or sim)")
+    parser.add_argument('--trace', help="trace file for the replay backend")
+    parser.add_argument('--record', help="record inputs and outputs to this file")
+    parser.add_argument('--seed', type=int, help="simulator noise seed")
+    parser.add_argument('--clock', choices=('real', 'virtual', 'accelerated'), default=None,
+                        help="program clock (default: $SAM_CLOCK or real)")
+    parser.add_argument('--speed', type=float, help="speed-up for --clock accelerated")
+    parser.add_argument('--seconds', type=float,
+                        help="stop the program (like Ctrl+C) after this much program time")
+    args = parser.parse_args(argv)
+
+    if args.backend:
+        os.environ['SAM_HAL'] = args.backend
+    if args.trace:
+        os.environ['SAM_HAL_TRACE'] = args.trace
+    if args.record:
+        os.environ['SAM_HAL_RECORD'] = args.record
+    if args.seed is not None:
+        os.environ['SAM_HAL_SEED'] = str(args.seed)
+    if args.clock:
+        os.environ['SAM_CLOCK'] = args.clock
+    if args.speed:
+        os.environ['SAM_CLOCK_SPEED'] = str(args.speed)
+
+    program = os.path.abspath(args.program)
+    # Same import order as on a board: the program's own folder, then /lib
+    sys.path[:0] = [os.path.dirname(program), HOST_DIR, LIB_DIR]
+    # The program sees itself as run with no arguments, not run_program's
+    sys.argv = [program]
+
+    # The clock goes in first, so `from time import sleep` gets the right one
+    import sam_clock
+    import sam_hal
+    clock = sam_clock.get_clock()
+    backend = sam_hal.get_backend()
+
+    timer = None
+    if args.seconds and clock.virtual:
+        clock.stop_after(args.seconds)
+    elif args.seconds:
+        timer = threading.Timer(args.seconds / clock.speed, _interrupt)
+        timer.daemon = True
+        timer.start()
+
+    try:
+        runpy.run_path(program, run_name='__main__')
+    except KeyboardInterrupt:
+        pass  # Programs without their own Ctrl+C handling
+    finally:
+        if timer:
+            timer.cancel()
+        backend.close()
+        print(f"\n[SAM HAL] backend={backend.name} clock={clock.name} reads={backend.read_count} "
+              f"outputs={backend.output_count} time={backend.now():.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
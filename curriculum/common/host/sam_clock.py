@@ -0,0 +1,228 @@
+"""SAM Clock - real, virtual or accelerated time for curriculum programs on a computer
+
+Curriculum programs pace themselves with `time.sleep()` and stamp
+readings with `time.time()` / `time.localtime()`. On a Pico that is the
+firmware's real clock, and nothing in this file is used.
+
+On a computer, `install()` points those `time` functions (plus
+MicroPython's `sleep_ms`, `ticks_ms` and friends) at one of three clocks:
+
+- real (default): ordinary wall-clock time.
+- virtual: time only moves when the program sleeps, and a sleep returns
+  immediately. A program that would take ten minutes finishes in a
+  moment, with the same order of events and the same timestamps it
+  would have had in real time.
+- accelerated: real time running SPEED times faster, for watching a
+  program at a glance (sleeps are shortened, timestamps stretched).
+
+Choose the clock with environment variables:
+
+    SAM_CLOCK=real | virtual | accelerated   clock (default: real)
+    SAM_CLOCK_SPEED=10                       speed-up for accelerated
+    SAM_CLOCK_START=1735718400               virtual start time (Unix seconds)
+
+The sampling scheduler notices a virtual clock and runs its tasks in
+release order without waiting (see sampling_scheduler.py).
+
+Clocks also run `machine.Timer` callbacks: on a background thread for
+the real and accelerated clocks (like an interrupt), and at their exact
+due time while the program sleeps on the virtual clock.
+"""
+
+import heapq
+import os
+import threading
+import time as _time
+
+DEFAULT_SPEED = 10.0
+
+# The real functions, kept before install() replaces them
+_real_sleep = _time.sleep
+_real_time = _time.time
+_real_localtime = _time.localtime
+_real_monotonic = _time.monotonic
+
+
+class RealClock:
+    """Wall-clock time, as on the board."""
+
+    name = 'real'
+    virtual = False
+    speed = 1.0
+
+    def __init__(self, start=None):
+        self._mono0 = _real_monotonic()
+        self._start = _real_time() if start is None else start
+
+    def monotonic(self):
+        """Seconds since the clock was created."""
+        return (_real_monotonic() - self._mono0) * self.speed
+
+    def time(self):
+        return self._start + self.monotonic()
+
+    def localtime(self, secs=None):
+        return _real_localtime(self.time() if secs is None else secs)
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            _real_sleep(seconds / self.speed)
+
+    def sleep_ms(self, ms):
+        self.sleep(ms / 1000)
+
+    def sleep_us(self, us):
+        self.sleep(us / 1_000_000)
+
+    def ticks_ms(self):
+        return int(self.monotonic() * 1000)
+
+    def ticks_us(self):
+        return int(self.monotonic() * 1_000_000)
+
+    def call_at_us(self, due_us, callback):
+        """Call `callback()` when ticks_us() reaches `due_us`. Returns a handle with cancel()."""
+        delay = max(0.0, (due_us - self.ticks_us()) / 1_000_000 / self.speed)
+        timer = threading.Timer(delay, callback)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+
+class _TimedCall:
+    """A callback waiting on the virtual clock."""
+
+    __slots__ = ('callback', 'cancelled')
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class AcceleratedClock(RealClock):
+    """Real time running `speed` times faster."""
+
+    name = 'accelerated'
+
+    def __init__(self, speed=DEFAULT_SPEED, start=None):
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.speed = float(speed)
+        super().__init__(start)
+
+
+class VirtualClock(RealClock):
+    """Time that only moves when the program sleeps.
+
+    Sleeping advances the clock instantly, so runs are fast and exactly
+    repeatable. Timer callbacks that fall due during a sleep run at their
+    due time, in order. With `stop_after()`, a sleep that would pass the
+    limit moves the clock to the limit and raises KeyboardInterrupt instead.
+    """
+
+    name = 'virtual'
+    virtual = True
+
+    def __init__(self, start=None):
+        super().__init__(start)
+        self._now_us = 0  # Whole microseconds, so ticks never drift from rounding
+        self.limit = None
+        self._timers = []   # Heap of (due_us, order, _TimedCall)
+        self._order = 0
+
+    def monotonic(self):
+        return self._now_us / 1_000_000
+
+    def ticks_ms(self):
+        return self._now_us // 1000
+
+    def ticks_us(self):
+        return self._now_us
+
+    def sleep(self, seconds):
+        if seconds <= 0:
+            return
+        now_us = self._now_us + round(seconds * 1_000_000)
+        if self.limit is not None and now_us > self.limit * 1_000_000:
+            limit_us = max(self._now_us, round(self.limit * 1_000_000))
+            self._run_timers(limit_us)
+            self._now_us = limit_us
+            raise KeyboardInterrupt("virtual time limit reached")
+        self._run_timers(now_us)
+        self._now_us = max(self._now_us, now_us)  # A callback may have slept too
+
+    def call_at_us(self, due_us, callback):
+        """Call `callback()` when a sleep reaches `due_us`. Returns a handle with cancel()."""
+        call = _TimedCall(callback)
+        self._order += 1
+        heapq.heappush(self._timers, (max(due_us, self._now_us), self._order, call))
+        return call
+
+    def _run_timers(self, until_us):
+        """Run the callbacks due by `until_us`, moving the clock to each one's time."""
+        timers = self._timers
+        while timers and timers[0][0] <= until_us:
+            due_us, _, call = heapq.heappop(timers)
+            if not call.cancelled:
+                self._now_us = max(self._now_us, due_us)
+                call.callback()
+
+    def stop_after(self, seconds):
+        """Stop the program (like Ctrl+C) after `seconds` of program time."""
+        self.limit = seconds
+
+    def advance_to(self, seconds):
+        """Jump forward to `seconds` of program time (never backwards)."""
+        self.sleep(seconds - self.monotonic())
+
+
+_clock = None
+
+
+def create_clock(name=None, speed=None, start=None):
+    """Create a clock by name ('real', 'virtual' or 'accelerated') using SAM_CLOCK_* settings."""
+    name = name or os.environ.get('SAM_CLOCK', 'real')
+    if start is None and os.environ.get('SAM_CLOCK_START'):
+        start = float(os.environ['SAM_CLOCK_START'])
+    if name == 'real':
+        return RealClock(start)
+    if name == 'virtual':
+        return VirtualClock(start)
+    if name == 'accelerated':
+        if speed is None:
+            speed = float(os.environ.get('SAM_CLOCK_SPEED', DEFAULT_SPEED))
+        return AcceleratedClock(speed, start)
+    raise ValueError(f"Unknown SAM_CLOCK '{name}' (use 'real', 'virtual' or 'accelerated')")
+
+
+def install(clock):
+    """Route the `time` module's sleep, time and tick functions through `clock`.
+
+    Programs that did `from time import sleep` before this call keep the
+    real function, so install the clock before running the program
+    (run_program.py does this).
+    """
+    global _clock
+    _clock = clock
+    _time.sleep = clock.sleep
+    _time.time = clock.time
+    _time.localtime = clock.localtime
+    # MicroPython extras, so shared /lib code sees the same clock
+    _time.sleep_ms = clock.sleep_ms
+    _time.sleep_us = clock.sleep_us
+    _time.ticks_ms = clock.ticks_ms
+    _time.ticks_us = clock.ticks_us
+    _time.ticks_diff = lambda end, start: end - start
+    _time.ticks_add = lambda ticks, delta: ticks + delta
+    _time.sam_clock = clock
+    return clock
+
+
+def get_clock():
+    """The installed clock (created from SAM_CLOCK and installed on first use)."""
+    if _clock is None:
+        install(create_clock())
+    return _clock
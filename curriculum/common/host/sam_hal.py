@@ -0,0 +1,297 @@
+"""SAM HAL - Hardware Abstraction Layer for running curriculum programs on a computer
+
+Every curriculum program talks to hardware through the standard board
+modules: `machine`, `dht`, `neopixel`, `board` and
+`adafruit_circuitplayground`. On a Raspberry Pi Pico or Circuit
+Playground those modules are built into the firmware - that is the
+HARDWARE backend, and nothing in this folder is needed.
+
+On a computer, this folder provides modules with the same names. They
+pass every sensor read and every output to one of two backends:
+
+- sim (default): a deterministic simulator. Temperature, humidity and
+  light follow a day/night cycle with repeatable noise, and buttons,
+  touch pads and shake are "pressed" in turn on a fixed schedule, so
+  programs that wait for input still run on their own. Ultrasonic
+  echo pulses (machine.time_pulse_us) come from a wall that drifts
+  between 1.5 and 2.7 m, with some lost and stray echoes.
+- replay: plays back a recorded trace of sensor and button values
+  (JSON lines, see below). When the trace ends the backend raises
+  `ReplayFinished`, a KeyboardInterrupt, so programs stop exactly as if
+  Ctrl+C had been pressed.
+
+Choose the backend with environment variables:
+
+    SAM_HAL=sim | replay        backend (default: sim)
+    SAM_HAL_TRACE=trace.jsonl   trace to replay
+    SAM_HAL_RECORD=out.jsonl    record inputs and outputs of this run
+    SAM_HAL_SEED=7              simulator noise seed (default: 1)
+
+Time comes from sam_clock.py, so with SAM_CLOCK=virtual a simulated day
+(or a long replay) passes in seconds.
+
+Trace format - one JSON object per line, times in seconds from start:
+
+    {"t": 0.0, "channel": "dht:16", "value": [21.0, 55.0]}
+    {"t": 0.0, "channel": "adc:26", "value": 41000}
+    {"t": 2.5, "channel": "pin:16", "value": 1}
+    {"t": 3.0, "channel": "cp:button_a", "value": true}
+    {"t": 4.0, "channel": "echo:17", "value": 8745}
+
+A recording made with SAM_HAL_RECORD can be replayed directly; output
+lines (marked "output": true) are ignored during replay.
+
+Usage (from the repository root):
+    export PYTHONPATH="$PWD/curriculum/common/host:$PWD/curriculum/common/lib"
+    python curriculum/beginner/week04_weather_environment_sensing/code/weather_sensor.py
+"""
+
+import json
+import math
+import os
+import random
+import zlib
+from collections import deque
+
+import sam_clock
+
+# Simulated day starts at this hour, so light and temperature are interesting
+SIM_START_HOUR = 10.0
+
+# Simulated inputs: one input is pressed every BUTTON_PERIOD_S for PRESS_S
+BUTTON_PERIOD_S = 3.0
+PRESS_S = 0.5
+
+# Simulated ultrasonic sensors face a wall that drifts between these
+# distances (cm) over ECHO_PERIOD_S; some echoes are lost or bounce
+ECHO_NEAR_CM = 150.0
+ECHO_FAR_CM = 270.0
+ECHO_PERIOD_S = 60.0
+ECHO_LOST = 0.05       # No echo comes back (timeout)
+ECHO_STRAY = 0.08      # Echo off something else: a wrong distance
+US_PER_CM = 58.3       # Echo pulse length per cm at 20 °C (there and back)
+
+# Extra time after the last trace event before a replay finishes
+REPLAY_TAIL_S = 1.0
+
+# Output events kept in memory for inspection and benchmarks
+MAX_EVENTS = 10000
+
+
+class ReplayFinished(KeyboardInterrupt):
+    """Raised when a replayed trace has no more events (acts like Ctrl+C)."""
+
+
+class Backend:
+    """Shared bookkeeping: time, input registration and output events."""
+
+    name = 'base'
+
+    def __init__(self, record_path=None):
+        self.clock = sam_clock.get_clock()
+        self.started = self.clock.monotonic()
+        self.inputs = []                 # Input channels in registration order
+        self.events = deque((), MAX_EVENTS)
+        self.output_count = 0
+        self.read_count = 0
+        self._recorder = open(record_path, 'w') if record_path else None
+        self._last_recorded = {}
+
+    def now(self):
+        """Seconds of program time since the backend started (see sam_clock.py)."""
+        return self.clock.monotonic() - self.started
+
+    def register_input(self, channel):
+        """Declare a button-like input so the simulator can press it."""
+        if channel not in self.inputs:
+            self.inputs.append(channel)
+
+    def read(self, channel, default=None):
+        """Return the current value of an input channel."""
+        self.read_count += 1
+        value = self._read(channel, default)
+        if self._recorder and self._last_recorded.get(channel, ()) != value:
+            self._last_recorded[channel] = value
+            self._write_record({'t': round(self.now(), 4), 'channel': channel, 'value': value})
+        return value
+
+    def _read(self, channel, default):
+        raise NotImplementedError
+
+    def output(self, channel, value):
+        """Record that a program wrote to an output (LED, buzzer, pixels)."""
+        self.output_count += 1
+        event = (self.now(), channel, value)
+        self.events.append(event)
+        if self._recorder:
+            self._write_record({'t': round(event[0], 4), 'channel': channel,
+                                'value': value, 'output': True})
+
+    def _write_record(self, record):
+        self._recorder.write(json.dumps(record) + '\n')
+        self._recorder.flush()
+
+    def close(self):
+        if self._recorder:
+            self._recorder.close()
+            self._recorder = None
+
+
+class SimBackend(Backend):
+    """Deterministic simulator: same seed and same timing give the same values."""
+
+    name = 'sim'
+
+    def __init__(self, seed=1, start_hour=SIM_START_HOUR, record_path=None):
+        super().__init__(record_path)
+        self.seed = seed
+        self.start_hour = start_hour
+        self._pings = {}
+
+    def _noise(self, channel, t, scale):
+        """Repeatable noise: the same channel and 0.1 s step always give the same value."""
+        step = int(t * 10)
+        rng = random.Random(zlib.crc32(f"{self.seed}:{channel}:{step}".encode()))
+        return rng.gauss(0, scale)
+
+    def hour(self, t=None):
+        """Simulated hour of day (0-24)."""
+        t = self.now() if t is None else t
+        return (self.start_hour + t / 3600.0) % 24
+
+    def temperature(self, channel, t):
+        # Coolest around 04:00, warmest around 16:00
+        phase = 2 * math.pi * (self.hour(t) - 10) / 24
+        return 18.0 + 8.0 * math.sin(phase) + self._noise(channel + ':t', t, 0.3)
+
+    def humidity(self, channel, t):
+        phase = 2 * math.pi * (self.hour(t) - 10) / 24
+        value = 60.0 - 20.0 * math.sin(phase) + self._noise(channel + ':h', t, 1.0)
+        return min(100.0, max(0.0, value))
+
+    def light(self, channel, t):
+        # Daylight between 06:00 and 18:00
+        sun = math.sin(math.pi * (self.hour(t) - 6) / 12)
+        value = 2000 + 58000 * max(0.0, sun) + self._noise(channel, t, 800)
+        return int(min(65535, max(0, value)))
+
+    def echo(self, channel, t):
+        """Echo pulse length in µs, or None when the echo is lost.
+
+        Every ping gets its own noise (bursts of pings come within
+        milliseconds of each other, closer than the 0.1 s noise steps).
+        """
+        ping = self._pings.get(channel, 0)
+        self._pings[channel] = ping + 1
+        rng = random.Random(zlib.crc32(f"{self.seed}:{channel}:{ping}".encode()))
+        chance = rng.random()
+        if chance < ECHO_LOST:
+            return None
+        if chance < ECHO_LOST + ECHO_STRAY:
+            distance = rng.uniform(5.0, 2 * ECHO_FAR_CM)
+        else:
+            wave = 0.5 - 0.5 * math.cos(2 * math.pi * t / ECHO_PERIOD_S)
+            distance = ECHO_NEAR_CM + (ECHO_FAR_CM - ECHO_NEAR_CM) * wave + rng.gauss(0, 0.5)
+        return int(distance * US_PER_CM)
+
+    def pressed(self, channel, t):
+        """True while the simulator is 'pressing' this registered input."""
+        if channel not in self.inputs:
+            return False
+        turn = int(t // BUTTON_PERIOD_S)
+        if t - turn * BUTTON_PERIOD_S >= PRESS_S:
+            return False
+        return self.inputs[turn % len(self.inputs)] == channel
+
+    def _read(self, channel, default):
+        t = self.now()
+        kind = channel.split(':', 1)[0]
+        if kind == 'dht':
+            return [self.temperature(channel, t), self.humidity(channel, t)]
+        if kind == 'adc':
+            return self.light(channel, t)
+        if kind == 'echo':
+            return self.echo(channel, t)
+        if channel == 'cp:temperature':
+            return self.temperature(channel, t)
+        if channel == 'cp:light':
+            return self.light(channel, t) // 64
+        if channel in self.inputs:
+            return self.pressed(channel, t)
+        return default
+
+
+class ReplayBackend(Backend):
+    """Plays back recorded input values at the times they were recorded."""
+
+    name = 'replay'
+
+    def __init__(self, trace_path, record_path=None):
+        super().__init__(record_path)
+        self.timeline = {}
+        end = 0.0
+        with open(trace_path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event.get('output'):
+                    continue
+                self.timeline.setdefault(event['channel'], []).append((event['t'], event['value']))
+                end = max(end, event['t'])
+        for events in self.timeline.values():
+            events.sort(key=lambda e: e[0])
+        self.end = end + REPLAY_TAIL_S
+        self._cursor = {}
+
+    def _read(self, channel, default):
+        t = self.now()
+        if t > self.end:
+            raise ReplayFinished("replay trace finished")
+        events = self.timeline.get(channel)
+        if not events:
+            return default
+        # Readings move forward in time, so remember where we got to
+        i = self._cursor.get(channel, 0)
+        if i and events[i][0] > t:
+            i = 0
+        while i + 1 < len(events) and events[i + 1][0] <= t:
+            i += 1
+        self._cursor[channel] = i
+        # Before a channel's first event, hold its first recorded value
+        return events[i][1]
+
+
+_backend = None
+
+
+def create_backend(name=None, **options):
+    """Create a backend by name ('sim' or 'replay') using SAM_HAL_* settings."""
+    name = name or os.environ.get('SAM_HAL', 'sim')
+    record = options.pop('record_path', os.environ.get('SAM_HAL_RECORD'))
+    if name == 'sim':
+        seed = options.pop('seed', int(os.environ.get('SAM_HAL_SEED', '1')))
+        return SimBackend(seed=seed, record_path=record, **options)
+    if name == 'replay':
+        trace = options.pop('trace_path', os.environ.get('SAM_HAL_TRACE'))
+        if not trace:
+            raise ValueError("SAM_HAL=replay needs SAM_HAL_TRACE=<trace file>")
+        return ReplayBackend(trace, record_path=record)
+    raise ValueError(f"Unknown SAM_HAL backend '{name}' (use 'sim' or 'replay')")
+
+
+def get_backend():
+    """The backend shared by all board modules (created on first use)."""
+    global _backend
+    if _backend is None:
+        _backend = create_backend()
+    return _backend
+
+
+def set_backend(backend):
+    """Swap the active backend (e.g. in a benchmark) and return the old one."""
+    global _backend
+    previous = _backend
+    _backend = backend
+    return previous
@@ -0,0 +1,170 @@
+"""Adaptive Sampling
+Read sensors often while things change, and rarely while they don't
+
+A fixed sampling period is a compromise. At night the temperature and
+light hardly move, so most readings repeat the last one - they waste
+battery, wake the Pico for nothing and fill the flash log. At noon a
+passing cloud or a sudden cold front changes things within seconds, and
+a slow fixed rate would miss it.
+
+`AdaptiveSampler` chooses the next period after every reading:
+
+- A channel is BUSY when it moved by at least its `step` since the last
+  reading, or when its recent readings are spread out by at least `step`
+  (exponentially weighted standard deviation). The period is divided by
+  2 x how busy the busiest channel is, so a big jump goes straight back
+  to a fast rate.
+- After `calm_samples` calm readings in a row the period grows by
+  `backoff` (up to `max_period_ms`).
+
+Because a long period lets more change pile up between two readings,
+the rate settles where each reading moves about one `step`: fast while
+things change, slow while they are flat. Pick `step` just above the
+sensor's own noise (a DHT11 only reports whole degrees, so 1.5 °C).
+
+A fast sensor (an LDR read 10 times a second) can keep watch between
+slow readings: when `moved()` says it has changed by a whole step, give
+the sampler that reading at once and bring the slow task forward.
+
+Usage:
+    sampler = AdaptiveSampler(2000, 60000)
+    sampler.watch('temp', step=1.5)
+    sampler.watch('light', step=4000)
+    task = scheduler.every("sample", sampler.period_ms, take_sample)
+
+    def take_sample():
+        ...
+        task.period_ms = sampler.update(time.time(), temp=temp, light=light)
+
+    def watch_light():                          # A fast task
+        if sampler.moved('light', light) >= 1:
+            task.period_ms = sampler.update(time.time(), light=light)
+            scheduler.run_soon(task)
+
+Ubuntu Connection: Save energy so the whole class can share the batteries!
+"""
+
+import math
+
+from stream_stats import EWStats
+
+# Activity below this counts as calm
+BUSY = 1.0
+
+
+class _Channel:
+    def __init__(self, step, alpha):
+        if step <= 0:
+            raise ValueError("step must be positive")
+        self.step = step
+        self.stats = EWStats(alpha)
+        self.last = None
+
+    def activity(self, value):
+        """How busy the channel is, in steps (0 = flat, 1 = one step)."""
+        moved = 0.0 if self.last is None else abs(value - self.last) / self.step
+        self.last = value
+        self.stats.add(value)
+        spread = math.sqrt(self.stats.variance) / self.step
+        return max(moved, spread)
+
+
+class AdaptiveSampler:
+    """Chooses each sampling period from how fast the readings change.
+
+    Args:
+        min_period_ms: Fastest period, used while readings change quickly
+            (never faster than the slowest sensor allows)
+        max_period_ms: Slowest period, used while readings are flat
+        start_period_ms: First period (defaults to min_period_ms)
+        calm_samples: Calm readings in a row before slowing down
+        backoff: How much each slow-down stretches the period
+    """
+
+    def __init__(self, min_period_ms, max_period_ms, start_period_ms=None,
+                 calm_samples=3, backoff=2.0):
+        if not 0 < min_period_ms <= max_period_ms:
+            raise ValueError("need 0 < min_period_ms <= max_period_ms")
+        if backoff <= 1:
+            raise ValueError("backoff must be bigger than 1")
+        self.min_period_ms = min_period_ms
+        self.max_period_ms = max_period_ms
+        self.period_ms = min_period_ms if start_period_ms is None else start_period_ms
+        self.calm_samples = calm_samples
+        self.backoff = backoff
+        self.channels = {}
+        self.activity = 0.0
+        self._calm = 0
+        self.samples = 0
+        self.speedups = 0
+        self.slowdowns = 0
+        self._first_time = None
+        self._last_time = None
+
+    def watch(self, name, step, alpha=0.3):
+        """Watch a channel. `step` is the change worth a faster rate."""
+        self.channels[name] = _Channel(step, alpha)
+
+    def moved(self, name, value):
+        """How far `value` is from the channel's last reading, in steps (0 if unknown)."""
+        channel = self.channels[name]
+        if channel.last is None or value is None:
+            return 0.0
+        return abs(value - channel.last) / channel.step
+
+    def update(self, timestamp, **values):
+        """Add one reading per channel and return the next period in ms.
+
+        Missing values (None) are skipped, so a failed sensor read keeps
+        the current rate instead of looking calm.
+        """
+        self.samples += 1
+        if self._first_time is None:
+            self._first_time = timestamp
+        self._last_time = timestamp
+
+        activity = None
+        for name, value in values.items():
+            channel = self.channels.get(name)
+            if channel is None or value is None or value != value:
+                continue
+            level = channel.activity(value)
+            if activity is None or level > activity:
+                activity = level
+        if activity is None:
+            return self.period_ms
+        self.activity = activity
+
+        if activity >= BUSY:
+            self._calm = 0
+            period = max(self.min_period_ms, int(self.period_ms / (2 * activity)))
+            if period < self.period_ms:
+                self.speedups += 1
+            self.period_ms = period
+        else:
+            self._calm += 1
+            if self._calm >= self.calm_samples and self.period_ms < self.max_period_ms:
+                self._calm = 0
+                self.slowdowns += 1
+                self.period_ms = min(self.max_period_ms, int(self.period_ms * self.backoff))
+        return self.period_ms
+
+    def stats(self):
+        """Return sample counts, including how many a fixed fast rate would take."""
+        elapsed_s = 0 if self._first_time is None else self._last_time - self._first_time
+        return {
+            'samples': self.samples,
+            'fixed_rate_samples': int(elapsed_s * 1000 / self.min_period_ms) + (1 if self.samples else 0),
+            'period_ms': self.period_ms,
+            'speedups': self.speedups,
+            'slowdowns': self.slowdowns,
+            'elapsed_s': elapsed_s,
+        }
+
+    def print_stats(self):
+        """Print how many readings adaptive sampling saved."""
+        s = self.stats()
+        print(f"\n🔋 ADAPTIVE SAMPLING: {s['samples']} readings "
+              f"(a fixed {self.min_period_ms / 1000:g} s rate would take {s['fixed_rate_samples']})")
+        print(f"   Sped up {s['speedups']} times, slowed down {s['slowdowns']} times; "
+              f"now every {s['period_ms'] / 1000:g} s")
@@ -0,0 +1,143 @@
+"""Pattern Tree
+Write long patterns with repeats, sections and tempo changes, and play them step by step
+
+`[(255, 0, 0), (0, 0, 0)] * 5` builds all ten steps in memory before
+anything happens, and a song written out in full takes memory for every
+note of every verse. A PATTERN TREE writes down the repeats instead:
+
+    song = Section("Gumboot song",
+        Repeat(4, gumboot_pattern, 0.5),           # 4 times: the pattern, then a rest
+        Tempo(0.8, Repeat(3, call_pattern, response_pattern)),
+    )
+
+- Repeat(times, ...): the steps inside, `times` times (None = forever)
+- Section(name, ...): a named part of the piece, played once
+- Tempo(factor, ...): the steps inside with their durations multiplied by
+  `factor` (0.8 = faster, 1.2 = slower); tempos inside tempos multiply
+- Anything else is a STEP, used as it is: a colour for NeoPixels, a
+  (note, duration) pattern for the rhythm player, a rest in seconds...
+
+`expand()` walks the tree and hands out one step at a time (a
+generator), so the tree always stays small and playing starts at once,
+however long the piece is. Repeat(None, ...) even plays forever.
+
+Usage:
+    beads = Repeat(5, (255, 0, 0), (0, 0, 0))
+    for colour in steps(beads):                    # red, off, red, off, ...
+        ...
+    for step, tempo in expand(song):               # Each step with its tempo
+        ...
+    count(beads)                                   # 10, without expanding
+"""
+
+
+class Repeat:
+    """Play the children `times` times in a row (None = forever)."""
+
+    __slots__ = ('times', 'children')
+
+    def __init__(self, times, *children):
+        if times is not None and times < 0:
+            raise ValueError("times must be 0 or more (or None for forever)")
+        self.times = times
+        self.children = children
+
+
+class Section:
+    """A named group of children, played once (see expand(marks=True))."""
+
+    __slots__ = ('name', 'children')
+
+    def __init__(self, name, *children):
+        self.name = name
+        self.children = children
+
+
+class Tempo:
+    """Play the children with their durations multiplied by `factor`."""
+
+    __slots__ = ('factor', 'children')
+
+    def __init__(self, factor, *children):
+        if factor <= 0:
+            raise ValueError("tempo factor must be positive")
+        self.factor = factor
+        self.children = children
+
+
+def expand(tree, tempo=1.0, marks=False):
+    """Yield (step, tempo) for every step of `tree`, in playing order.
+
+    Args:
+        tree: A Repeat, Section or Tempo (or a single step)
+        tempo: Starting duration multiplier
+        marks: Also yield (section, tempo) when a named Section starts
+
+    Only the path from the top of the tree to the current step is kept,
+    never a list of the steps. Raises ValueError when a Repeat(None, ...)
+    goes round once without a step, as it would never play anything.
+    """
+    # Each frame: [children, next child, times left (None = forever), tempo,
+    #              steps yielded before this round]
+    stack = [[(tree,), 0, 1, tempo, 0]]
+    played = 0
+    while stack:
+        frame = stack[-1]
+        children, i, left, scale, before = frame
+        if i == len(children):
+            if left is None and played == before:
+                raise ValueError("Repeat(None, ...) has no steps to play")
+            if children and (left is None or left > 1):
+                frame[1] = 0                 # Round again
+                frame[4] = played
+                if left is not None:
+                    frame[2] = left - 1
+            else:
+                stack.pop()
+            continue
+        frame[1] = i + 1
+        child = children[i]
+        if isinstance(child, Repeat):
+            if child.times != 0:
+                stack.append([child.children, 0, child.times, scale, played])
+        elif isinstance(child, Tempo):
+            stack.append([child.children, 0, 1, scale * child.factor, played])
+        elif isinstance(child, Section):
+            if marks and child.name is not None:
+                yield child, scale
+            stack.append([child.children, 0, 1, scale, played])
+        else:
+            played += 1
+            yield child, scale
+
+
+def steps(tree):
+    """Yield just the steps of `tree`, in playing order."""
+    for step, _ in expand(tree):
+        yield step
+
+
+def count(tree):
+    """Number of steps in `tree` (None if it repeats forever), without expanding it."""
+    if isinstance(tree, Repeat):
+        if tree.times == 0:
+            return 0
+        inner = _count_children(tree.children)
+        if inner == 0:
+            return 0
+        if tree.times is None or inner is None:
+            return None
+        return tree.times * inner
+    if isinstance(tree, (Section, Tempo)):
+        return _count_children(tree.children)
+    return 1
+
+
+def _count_children(children):
+    total = 0
+    for child in children:
+        inner = count(child)
+        if inner is None:
+            return None
+        total += inner
+    return total
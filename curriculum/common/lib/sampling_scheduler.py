@@ -0,0 +1,350 @@
+"""Sampling Scheduler
+Shared helper for the SAM LMS sensor programs
+
+A `while True` loop with `time.sleep(5)` can only do one thing at a time:
+while it sleeps, nothing else runs. This scheduler lets each job (read
+the light sensor, read the DHT sensor, update the LEDs, print a report)
+be its own PERIODIC TASK with its own rate, all sharing one Pico.
+
+Tasks take turns cooperatively using asyncio (uasyncio on MicroPython),
+so a fast 10 Hz light reading keeps running while the slow 1 Hz DHT
+reading waits for its next turn.
+
+Every task keeps simple statistics so learners (and teachers) can see
+how well the timing worked:
+- jitter: how many milliseconds late a task started
+- overruns: how often a task finished after its deadline
+- missed: how many turns were skipped because the task fell behind
+
+A task may change its own `period_ms` while it runs (see
+adaptive_sampling.py); the new period applies from its next turn. A
+fast task that notices a big change can bring a slow task's next turn
+forward with `run_soon()`.
+
+On battery, `Scheduler(low_power=True)` puts the Pico into
+`machine.lightsleep()` whenever nothing is due for a while, instead of
+keeping the CPU awake while it waits. The USB serial connection stops
+while the Pico sleeps, so use it when running unplugged.
+
+Usage:
+    scheduler = Scheduler()
+    scheduler.every("light", 100, read_light)            # 10 times a second
+    scheduler.every("climate", 2000, read_climate)       # every 2 seconds
+    scheduler.run()                                      # Ctrl+C to stop
+
+Ubuntu Connection: Everyone gets a fair turn!
+"""
+
+import time
+
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio  # Older MicroPython firmware
+
+# MicroPython has wrap-around safe millisecond ticks; CPython does not.
+try:
+    ticks_ms = time.ticks_ms
+    ticks_diff = time.ticks_diff
+    ticks_add = time.ticks_add
+except AttributeError:
+    def ticks_ms():
+        return int(time.monotonic() * 1000)
+
+    def ticks_diff(end, start):
+        return end - start
+
+    def ticks_add(ticks, delta):
+        return ticks + delta
+
+# Shorter waits are not worth a light sleep (waking up takes time too)
+LIGHTSLEEP_MIN_MS = 50
+
+
+def _host_clock():
+    """The clock installed by the host HAL (common/host/sam_clock.py), if any."""
+    return getattr(time, 'sam_clock', None)
+
+
+async def sleep_ms(ms):
+    """Cooperative sleep that works on both MicroPython and CPython."""
+    if hasattr(asyncio, 'sleep_ms'):
+        await asyncio.sleep_ms(ms)
+        return
+    clock = _host_clock()
+    if clock is None:
+        await asyncio.sleep(ms / 1000)
+    elif clock.virtual:
+        clock.sleep_ms(ms)
+        await asyncio.sleep(0)
+    else:
+        await asyncio.sleep(ms / 1000 / clock.speed)
+
+
+class PeriodicTask:
+    """A job that runs every `period_ms` milliseconds.
+
+    Args:
+        name: Short name shown in statistics
+        callback: Function (or async function) to call each period
+        period_ms: Time between releases in milliseconds
+        deadline_ms: Time after release by which the callback must have
+            finished (defaults to the period)
+        offset_ms: Delay before the first release, used to spread tasks out
+    """
+
+    def __init__(self, name, callback, period_ms, deadline_ms=None, offset_ms=0):
+        if period_ms <= 0:
+            raise ValueError("period_ms must be positive")
+        self.name = name
+        self.callback = callback
+        self.period_ms = period_ms
+        self.deadline_ms = period_ms if deadline_ms is None else deadline_ms
+        self.offset_ms = offset_ms
+        self.next_release = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Clear the timing counters."""
+        self.runs = 0
+        self.overruns = 0
+        self.missed = 0
+        self.errors = 0
+        self.last_jitter_ms = 0
+        self.max_jitter_ms = 0
+        self.total_jitter_ms = 0
+        self.last_runtime_ms = 0
+        self.max_runtime_ms = 0
+
+    def record(self, jitter_ms, runtime_ms):
+        """Update the counters after one run."""
+        self.runs += 1
+        self.last_jitter_ms = jitter_ms
+        self.total_jitter_ms += jitter_ms
+        if jitter_ms > self.max_jitter_ms:
+            self.max_jitter_ms = jitter_ms
+        self.last_runtime_ms = runtime_ms
+        if runtime_ms > self.max_runtime_ms:
+            self.max_runtime_ms = runtime_ms
+        if jitter_ms + runtime_ms > self.deadline_ms:
+            self.overruns += 1
+
+    def stats(self):
+        """Return the timing counters as a dict."""
+        mean_jitter = self.total_jitter_ms / self.runs if self.runs else 0
+        return {
+            'name': self.name,
+            'period_ms': self.period_ms,
+            'runs': self.runs,
+            'overruns': self.overruns,
+            'missed': self.missed,
+            'errors': self.errors,
+            'last_jitter_ms': self.last_jitter_ms,
+            'mean_jitter_ms': mean_jitter,
+            'max_jitter_ms': self.max_jitter_ms,
+            'max_runtime_ms': self.max_runtime_ms,
+        }
+
+
+class Scheduler:
+    """Runs several periodic tasks cooperatively on one event loop.
+
+    Args:
+        low_power: Light-sleep between turns when nothing is due
+            (needs `machine.lightsleep`; otherwise waits normally)
+    """
+
+    def __init__(self, low_power=False):
+        self.tasks = []
+        self.running = False
+        self._runners = []
+        self._done = None
+        self._current = None     # Task whose callback is running
+        self._interrupt = None
+        self._lightsleep = None
+        if low_power:
+            try:
+                import machine
+                self._lightsleep = machine.lightsleep
+            except (ImportError, AttributeError):
+                pass  # No low-power sleep on this board: wait normally
+        self.lightsleeps = 0
+        self.lightsleep_ms = 0
+
+    def add(self, task):
+        """Add an existing PeriodicTask and return it."""
+        self.tasks.append(task)
+        return task
+
+    def every(self, name, period_ms, callback, deadline_ms=None, offset_ms=0):
+        """Create and add a PeriodicTask that calls `callback` every period."""
+        return self.add(PeriodicTask(name, callback, period_ms, deadline_ms, offset_ms))
+
+    async def _run_once(self, task, release):
+        """Run one turn of `task` and return its next release (None if interrupted)."""
+        start = ticks_ms()
+        self._current = task
+        try:
+            result = task.callback()
+            if result is not None and hasattr(result, 'send'):
+                await result  # Async callback
+        except KeyboardInterrupt as e:
+            # Ctrl+C arrived while this task was running: stop everything
+            self._interrupt = e
+            self._cancel_runners()
+            return None
+        except Exception as e:
+            task.errors += 1
+            print(f"Task '{task.name}' error: {e}")
+        finally:
+            self._current = None
+        end = ticks_ms()
+        task.record(ticks_diff(start, release), ticks_diff(end, start))
+
+        # Next release, skipping any turns we were too late for
+        release = ticks_add(release, task.period_ms)
+        late = ticks_diff(end, release)
+        if late > 0:
+            skipped = (late - 1) // task.period_ms + 1   # Turns due before `end`
+            task.missed += skipped
+            release = ticks_add(release, skipped * task.period_ms)
+        task.next_release = release
+        return release
+
+    def run_soon(self, task, delay_ms=0):
+        """Bring `task`'s next turn forward to `delay_ms` from now, if that is sooner.
+
+        Call it from another task, e.g. a fast sensor task that notices a
+        big change a slow task should deal with straight away. The slow
+        task's period counts on from that turn.
+        """
+        if not self.running or task is self._current:
+            return
+        release = ticks_add(ticks_ms(), delay_ms)
+        if ticks_diff(release, task.next_release) >= 0:
+            return
+        task.next_release = release
+        if self._runners:
+            # Its runner is asleep until the old release: start it again
+            i = self.tasks.index(task)
+            self._runners[i].cancel()
+            self._runners[i] = asyncio.create_task(self._run_task(task))
+
+    def _can_lightsleep(self, release, wait):
+        """True if no task is due before `release` and the wait is long enough."""
+        if self._lightsleep is None or wait < LIGHTSLEEP_MIN_MS:
+            return False
+        for task in self.tasks:
+            if ticks_diff(task.next_release, release) < 0:
+                return False
+        return True
+
+    def _sleep(self, wait):
+        """Light-sleep the whole board for `wait` ms (blocks every task)."""
+        self.lightsleeps += 1
+        self.lightsleep_ms += wait
+        self._lightsleep(wait)
+
+    async def _run_task(self, task):
+        release = task.next_release
+        while self.running:
+            wait = ticks_diff(release, ticks_ms())
+            if wait > 0 and self._can_lightsleep(release, wait):
+                self._sleep(wait)
+                await sleep_ms(0)
+            elif wait > 0:
+                await sleep_ms(wait)
+            else:
+                await sleep_ms(0)  # Give other tasks a turn
+            if not self.running:
+                break
+            release = await self._run_once(task, release)
+            if release is None:
+                return
+
+    async def _run_virtual(self, clock, duration_ms):
+        """Virtual clock on a computer: run turns in release order without waiting.
+
+        Each step jumps the clock to the earliest release, so tasks run in
+        the same order (and see the same timestamps) as in real time.
+        """
+        end = None if duration_ms is None else ticks_add(ticks_ms(), duration_ms)
+        while self.running and self.tasks:
+            # Earliest release first; ties go to the task added first
+            i = min(range(len(self.tasks)), key=lambda k: (self.tasks[k].next_release, k))
+            task = self.tasks[i]
+            if end is not None and ticks_diff(task.next_release, end) >= 0:
+                clock.sleep_ms(ticks_diff(end, ticks_ms()))
+                break
+            wait = ticks_diff(task.next_release, ticks_ms())
+            if wait > 0 and self._can_lightsleep(task.next_release, wait):
+                self._sleep(wait)
+            elif wait > 0:
+                clock.sleep_ms(wait)
+            if await self._run_once(task, task.next_release) is None:
+                break
+            await asyncio.sleep(0)  # Let any other coroutines run
+
+    async def run_async(self, duration_ms=None):
+        """Run all tasks until stopped (or for `duration_ms` milliseconds)."""
+        self.running = True
+        self._interrupt = None
+        now = ticks_ms()
+        for task in self.tasks:
+            task.next_release = ticks_add(now, task.offset_ms)
+        clock = _host_clock()
+        if clock is not None and clock.virtual:
+            try:
+                await self._run_virtual(clock, duration_ms)
+            finally:
+                self.running = False
+            return
+        # Runners may be replaced by run_soon(), so wait for the stop, not for them
+        self._done = asyncio.Event()
+        self._runners = [asyncio.create_task(self._run_task(task)) for task in self.tasks]
+        try:
+            if duration_ms is None:
+                await self._done.wait()
+            else:
+                await sleep_ms(duration_ms)
+        except asyncio.CancelledError:
+            if self._interrupt is None:
+                raise
+        finally:
+            self._cancel_runners()
+
+    def _cancel_runners(self):
+        self.running = False
+        for runner in self._runners:
+            runner.cancel()
+        if self._done is not None:
+            self._done.set()
+
+    def run(self, duration_ms=None):
+        """Start the scheduler. Blocks until Ctrl+C or the duration ends."""
+        try:
+            asyncio.run(self.run_async(duration_ms))
+        finally:
+            self.running = False
+        if self._interrupt is not None:
+            raise self._interrupt
+
+    def stop(self):
+        """Ask all tasks to finish after their current turn."""
+        self.running = False
+        if self._done is not None:
+            self._done.set()
+
+    def stats(self):
+        """Return a list of timing statistics, one dict per task."""
+        return [task.stats() for task in self.tasks]
+
+    def print_stats(self):
+        """Print a small timing table for every task."""
+        print("\n⏱️  TASK TIMING:")
+        print(f"   {'Task':<10} {'Runs':>6} {'Jitter avg/max (ms)':>20} {'Overruns':>9} {'Missed':>7}")
+        for s in self.stats():
+            jitter = f"{s['mean_jitter_ms']:.1f}/{s['max_jitter_ms']}"
+            print(f"   {s['name']:<10} {s['runs']:>6} {jitter:>20} {s['overruns']:>9} {s['missed']:>7}")
+        if self._lightsleep is not None:
+            print(f"   Light sleeps: {self.lightsleeps} ({self.lightsleep_ms / 1000:.1f} s asleep)")
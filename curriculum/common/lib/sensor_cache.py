@@ -0,0 +1,120 @@
+"""Sensor Cache
+Share one DHT measurement between everyone who asks for it
+
+DHT11 and DHT22 sensors need a rest between measurements (about 1 s for
+a DHT11 and 2 s for a DHT22). Asking again too soon gives errors
+(`OSError`) or old data, and wastes time on the sensor wire.
+
+`cached_reading` wraps a sensor-reading function. When it is called
+again within the sensor's minimum interval it does NOT talk to the
+sensor - it hands back the last reading, together with its age. Several
+tasks can therefore poll the same sensor as often as they like and still
+share one physical measurement.
+
+If a measurement fails, the last good reading is returned (while it is
+not too old) and the sensor is left alone for another full interval, so
+one error does not turn into a storm of errors.
+
+Usage:
+    @cached_reading(DHT11_MIN_INTERVAL_MS)
+    def read_sensor():
+        sensor.measure()
+        return sensor.temperature(), sensor.humidity()
+
+    temp, humidity = read_sensor()           # Same as before
+    (temp, humidity), age_ms = read_sensor.read_with_age()
+"""
+
+from sampling_scheduler import ticks_ms, ticks_diff
+
+# Minimum time between measurements (milliseconds)
+DHT11_MIN_INTERVAL_MS = 1000
+DHT22_MIN_INTERVAL_MS = 2000
+
+
+def _failed(value):
+    """A reading failed if it is None or a tuple of only None values."""
+    if value is None:
+        return True
+    if isinstance(value, tuple):
+        for item in value:
+            if item is not None:
+                return False
+        return True
+    return False
+
+
+class CachedSensor:
+    """Callable wrapper that rate-limits and memoises a sensor read function.
+
+    Args:
+        read_func: Function that measures the sensor and returns a value
+            (or a tuple of values, None on error)
+        min_interval_ms: Shortest time allowed between measurements
+        max_age_ms: Oldest cached reading to hand out after a failed
+            measurement (defaults to 5 x min_interval_ms)
+    """
+
+    def __init__(self, read_func, min_interval_ms, max_age_ms=None):
+        self.read_func = read_func
+        self.min_interval_ms = min_interval_ms
+        self.max_age_ms = 5 * min_interval_ms if max_age_ms is None else max_age_ms
+        self.value = None
+        self.value_ticks = None     # When the last good reading was taken
+        self.attempt_ticks = None   # When the sensor was last measured
+        self.failure_value = None
+        self.measurements = 0
+        self.cache_hits = 0
+        self.errors = 0
+
+    def age_ms(self):
+        """Milliseconds since the last good reading (None if there is none)."""
+        if self.value_ticks is None:
+            return None
+        return ticks_diff(ticks_ms(), self.value_ticks)
+
+    def _measure(self, now):
+        self.attempt_ticks = now
+        self.measurements += 1
+        try:
+            value = self.read_func()
+        except OSError:
+            value = None
+        if _failed(value):
+            self.errors += 1
+            self.failure_value = value
+        else:
+            self.value = value
+            self.value_ticks = now
+
+    def read_with_age(self):
+        """Return (reading, age_ms), measuring only if the interval has passed."""
+        now = ticks_ms()
+        if self.attempt_ticks is None or ticks_diff(now, self.attempt_ticks) >= self.min_interval_ms:
+            self._measure(now)
+        else:
+            self.cache_hits += 1
+
+        age = self.age_ms()
+        if age is None or age > self.max_age_ms:
+            return self.failure_value, None  # Nothing recent enough to share
+        return self.value, age
+
+    def __call__(self):
+        """Return just the reading, like the wrapped function."""
+        return self.read_with_age()[0]
+
+    def stats(self):
+        """Return counters showing how many measurements were saved."""
+        return {
+            'measurements': self.measurements,
+            'cache_hits': self.cache_hits,
+            'errors': self.errors,
+        }
+
+
+def cached_reading(min_interval_ms, max_age_ms=None):
+    """Decorator form of CachedSensor."""
+    def wrap(read_func):
+        return CachedSensor(read_func, min_interval_ms, max_age_ms)
+    return wrap
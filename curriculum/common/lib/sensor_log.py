@@ -0,0 +1,287 @@
+"""Sensor Log
+Compact binary data logging for the SAM LMS sensor programs
+
+Writing readings as text ("Temp=23°C, Humidity=55%\\n") uses 30-40 bytes
+per line and a 2 MB Pico fills up within days. This module stores every
+reading as a FIXED-SIZE 12-byte record instead:
+
+    offset  size  field         meaning
+    0       4     timestamp     seconds (from time.time())
+    4       2     temp_centi    temperature x 100 (e.g. 2350 = 23.50°C)
+    6       2     humidity_centi humidity x 100 (e.g. 5500 = 55.00%)
+    8       2     light         raw light reading 0-65535
+    10      1     flags         which values are present + alert bits
+    11      1     (padding)
+
+The file starts with an 8-byte header (magic "SAML", version, record
+size) so the reader can check it is a sensor log.
+
+On the Pico, records are collected in a small RAM buffer and written in
+blocks. Fewer, larger writes are faster and wear the flash less. Call
+`close()` (or `flush()`) before stopping so the last block is saved.
+
+On a computer, `read_log()` memory-maps the file and returns the records
+as a NumPy structured array WITHOUT copying or parsing any text, so even
+very large logs open instantly.
+
+Example (Pico):
+    log = SensorLogWriter("weather.log")
+    log.append(time.time(), temp, humidity)
+    ...
+    log.close()
+
+Example (computer):
+    records = read_log("weather.log")
+    temps = records['temp_centi'] / 100
+"""
+
+import struct
+
+try:
+    import os
+except ImportError:
+    import uos as os  # Older MicroPython firmware
+
+MAGIC = b'SAML'
+VERSION = 1
+RECORD_FORMAT = '<IhHHBx'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)  # 12 bytes
+HEADER_FORMAT = '<4sBBH'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)  # 8 bytes
+
+# Flag bits: which values were present when the reading was taken
+FLAG_TEMP = 0x01
+FLAG_HUMIDITY = 0x02
+FLAG_LIGHT = 0x04
+# Free for programs to mark special readings (e.g. frost or heat alerts)
+FLAG_ALERT = 0x08
+
+# Records kept in RAM before each write (32 x 12 = 384 bytes).
+# Larger blocks mean fewer flash writes but more readings lost on power cut.
+DEFAULT_BLOCK_RECORDS = 32
+
+# Bytes copied at a time when a damaged log has to be rewritten
+COPY_CHUNK = 1024
+
+
+def _clamp(value, low, high):
+    return low if value < low else high if value > high else value
+
+
+def pack_record(buffer, offset, timestamp, temp=None, humidity=None, light=None, flags=0):
+    """Pack one reading into `buffer` at `offset` (no memory allocation)."""
+    if temp is not None:
+        flags |= FLAG_TEMP
+        temp = _clamp(int(round(temp * 100)), -32767, 32767)
+    else:
+        temp = 0
+    if humidity is not None:
+        flags |= FLAG_HUMIDITY
+        humidity = _clamp(int(round(humidity * 100)), 0, 65535)
+    else:
+        humidity = 0
+    if light is not None:
+        flags |= FLAG_LIGHT
+        light = _clamp(int(light), 0, 65535)
+    else:
+        light = 0
+    struct.pack_into(RECORD_FORMAT, buffer, offset, int(timestamp), temp, humidity, light, flags)
+
+
+def unpack_record(data, offset=0):
+    """Unpack one record into a dict with None for missing values."""
+    timestamp, temp, humidity, light, flags = struct.unpack_from(RECORD_FORMAT, data, offset)
+    return {
+        'timestamp': timestamp,
+        'temp': temp / 100 if flags & FLAG_TEMP else None,
+        'humidity': humidity / 100 if flags & FLAG_HUMIDITY else None,
+        'light': light if flags & FLAG_LIGHT else None,
+        'flags': flags,
+    }
+
+
+def _check_header(header, path):
+    magic, version, record_size, _ = struct.unpack(HEADER_FORMAT, header)
+    if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+        raise ValueError(f"{path} is not a version {VERSION} sensor log")
+
+
+def _file_size(path):
+    try:
+        return os.stat(path)[6]
+    except OSError:
+        return None
+
+
+class SensorLogWriter:
+    """Block-buffered writer for fixed-size sensor records.
+
+    Args:
+        path: Log file name (created with a header if missing)
+        block_records: Records held in RAM before each write
+        max_records: Optional size limit. When the file is full it is
+            renamed to `path + '.old'` (replacing any older backup) and a
+            new log is started, so the log can never fill the flash.
+    """
+
+    def __init__(self, path, block_records=DEFAULT_BLOCK_RECORDS, max_records=None):
+        if block_records < 1:
+            raise ValueError("block_records must be at least 1")
+        self.path = path
+        self.block_records = block_records
+        self.max_records = max_records
+        self.buffer = bytearray(block_records * RECORD_SIZE)
+        self.pending = 0
+        self.records_on_disk = self._open_existing()
+        self.blocks_written = 0
+
+    def _open_existing(self):
+        size = _file_size(self.path)
+        if not size:
+            self._write_header()
+            return 0
+        with open(self.path, 'rb') as f:
+            _check_header(f.read(HEADER_SIZE), self.path)
+        count = (size - HEADER_SIZE) // RECORD_SIZE
+        end = HEADER_SIZE + count * RECORD_SIZE
+        if size > end:
+            # A power cut left part of a record at the end. Cut it off, or
+            # every record appended after it would be read out of step.
+            self._truncate(end)
+        return count
+
+    def _truncate(self, end):
+        try:
+            with open(self.path, 'r+b') as f:
+                f.truncate(end)
+            return
+        except AttributeError:
+            pass  # MicroPython files can't be truncated: copy the good part
+        temp_path = self.path + '.tmp'
+        with open(self.path, 'rb') as src, open(temp_path, 'wb') as dst:
+            left = end
+            while left:
+                data = src.read(min(left, COPY_CHUNK))
+                dst.write(data)
+                left -= len(data)
+        os.remove(self.path)
+        os.rename(temp_path, self.path)
+
+    def _write_header(self):
+        with open(self.path, 'wb') as f:
+            f.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, RECORD_SIZE, 0))
+
+    def _rotate(self):
+        backup = self.path + '.old'
+        try:
+            os.remove(backup)
+        except OSError:
+            pass
+        os.rename(self.path, backup)
+        self._write_header()
+        self.records_on_disk = 0
+
+    def append(self, timestamp, temp=None, humidity=None, light=None, flags=0):
+        """Add one reading. Writes to flash only when the block is full."""
+        pack_record(self.buffer, self.pending * RECORD_SIZE,
+                    timestamp, temp, humidity, light, flags)
+        self.pending += 1
+        if self.pending == self.block_records:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered records to the file."""
+        if not self.pending:
+            return
+        if self.max_records and self.records_on_disk + self.pending > self.max_records:
+            self._rotate()
+        with open(self.path, 'ab') as f:
+            f.write(memoryview(self.buffer)[:self.pending * RECORD_SIZE])
+        self.records_on_disk += self.pending
+        self.blocks_written += 1
+        self.pending = 0
+
+    def close(self):
+        """Save any buffered records. Call before the program stops."""
+        self.flush()
+
+    def __len__(self):
+        return self.records_on_disk + self.pending
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_log(path):
+    """Yield each record in a log as a dict (works without NumPy)."""
+    with open(path, 'rb') as f:
+        _check_header(f.read(HEADER_SIZE), path)
+        while True:
+            data = f.read(RECORD_SIZE)
+            if len(data) < RECORD_SIZE:
+                break  # End of file (or a record cut short by a power cut)
+            yield unpack_record(data)
+
+
+# ========== HOST-SIDE READER (needs NumPy and mmap) ==========
+
+def log_dtype():
+    """NumPy structured dtype matching RECORD_FORMAT."""
+    import numpy as np
+    return np.dtype([
+        ('timestamp', '<u4'),
+        ('temp_centi', '<i2'),
+        ('humidity_centi', '<u2'),
+        ('light', '<u2'),
+        ('flags', 'u1'),
+        ('pad', 'u1'),
+    ])
+
+
+def read_log(path):
+    """Memory-map a log and return its records as a NumPy structured array.
+
+    No data is copied or parsed: the array reads straight from the mapped
+    file, and the operating system loads pages only when they are used.
+    A partly written final record is ignored.
+
+    Returns:
+        numpy.ndarray with fields timestamp, temp_centi, humidity_centi,
+        light, flags (read-only)
+    """
+    import mmap
+    import numpy as np
+
+    dtype = log_dtype()
+    with open(path, 'rb') as f:
+        _check_header(f.read(HEADER_SIZE), path)
+        count = (os.fstat(f.fileno()).st_size - HEADER_SIZE) // RECORD_SIZE
+        if count <= 0:
+            return np.zeros(0, dtype=dtype)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    # The array keeps the mapping alive after the file is closed
+    return np.frombuffer(mapped, dtype=dtype, count=count, offset=HEADER_SIZE)
+
+
+def log_columns(records):
+    """Convert records from read_log() into float columns.
+
+    Missing values become NaN, ready for garden_batch or statistics.
+
+    Returns:
+        dict: 'timestamp' (int), 'temp', 'humidity', 'light' (float),
+        'flags' (uint8)
+    """
+    import numpy as np
+
+    flags = records['flags']
+    return {
+        'timestamp': records['timestamp'],
+        'temp': np.where(flags & FLAG_TEMP, records['temp_centi'] / 100.0, np.nan),
+        'humidity': np.where(flags & FLAG_HUMIDITY, records['humidity_centi'] / 100.0, np.nan),
+        'light': np.where(flags & FLAG_LIGHT, records['light'].astype(np.float64), np.nan),
+        'flags': flags,
+    }
@@ -0,0 +1,317 @@
+"""Stream Stats
+Running statistics and early frost/heat warnings for sensor readings
+
+Comparing each reading with a fixed threshold only tells us about a
+problem once it has already happened. This module watches the STREAM of
+readings and warns BEFORE the threshold is crossed:
+
+- RunningStats: mean, variance, min and max of every reading so far
+  (Welford's method - no list of old readings needed)
+- EWStats: exponentially weighted mean and variance that follow recent
+  readings more closely than old ones
+- Trend: how fast the temperature is changing (degrees per second)
+- TemperatureWatch: combines them into frost, heat and anomaly alerts.
+  It projects the smoothed temperature `horizon_s` seconds ahead using
+  the trend and warns if the projection crosses the frost or heat limit.
+  A reading far from the recent average (large z-score) is reported as
+  an anomaly - often a loose wire or a sensor in direct sun.
+
+Each update uses a fixed amount of memory and time (O(1)), so it runs on
+a Pico for weeks. On a computer, `watch_array()` gives the same answers
+for millions of logged readings using NumPy.
+
+Usage:
+    watch = TemperatureWatch(frost_temp=2, heat_temp=35)
+    for alert in watch.update(time.time(), temp):
+        print(alert['kind'], alert['projected'])
+"""
+
+import math
+
+# Default limits (Celsius)
+FROST_TEMP = 2.0    # Frost can form on plants below about 2°C
+HEAT_TEMP = 35.0    # Heat stress for most seedlings and learners
+
+# Default look-ahead for warnings (seconds)
+HORIZON_S = 1800    # 30 minutes
+
+
+def _is_missing(value):
+    return value is None or value != value
+
+
+class RunningStats:
+    """Mean, variance, min and max of all values so far (Welford's method)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        if _is_missing(value):
+            return
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def variance(self):
+        """Sample variance (0 until there are two values)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+
+class EWStats:
+    """Exponentially weighted mean and variance.
+
+    Args:
+        alpha: Weight of the newest value (0-1). Bigger = follows changes
+            faster, smaller = smoother.
+    """
+
+    def __init__(self, alpha=0.1):
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be between 0 and 1")
+        self.alpha = alpha
+        self.count = 0
+        self.mean = 0.0
+        self.variance = 0.0
+
+    def zscore(self, value):
+        """How many standard deviations `value` is from the current mean."""
+        if self.variance <= 0:
+            return 0.0
+        return (value - self.mean) / math.sqrt(self.variance)
+
+    def add(self, value):
+        """Add a value and return its z-score against the previous values."""
+        if self.count == 0:
+            self.count = 1
+            self.mean = value
+            return 0.0
+        z = self.zscore(value)
+        diff = value - self.mean
+        increment = self.alpha * diff
+        self.mean += increment
+        self.variance = (1 - self.alpha) * (self.variance + diff * increment)
+        self.count += 1
+        return z
+
+
+class Trend:
+    """Smoothed rate of change in units per second.
+
+    Args:
+        tau_s: Smoothing time in seconds. A single noisy step (a DHT11
+            only measures whole degrees) barely moves the trend, while a
+            change that lasts several minutes shows up clearly.
+    """
+
+    def __init__(self, tau_s=600):
+        self.tau_s = tau_s
+        self.slope = 0.0
+        self._last_time = None
+        self._last_value = None
+
+    def add(self, timestamp, value):
+        if self._last_time is not None:
+            dt = timestamp - self._last_time
+            if dt > 0:
+                weight = 1 - math.exp(-dt / self.tau_s)
+                slope = (value - self._last_value) / dt
+                self.slope += weight * (slope - self.slope)
+        self._last_time = timestamp
+        self._last_value = value
+        return self.slope
+
+
+class TemperatureWatch:
+    """Early frost and heat-stress warnings from a stream of temperatures.
+
+    Args:
+        frost_temp: Warn when the projected temperature falls to this
+        heat_temp: Warn when the projected temperature rises to this
+        horizon_s: How far ahead (seconds) to project the trend
+        alpha: Smoothing for the temperature mean/variance
+        trend_tau_s: Smoothing time (seconds) for the rate of change
+        z_limit: Readings further than this many standard deviations
+            from the recent mean are reported as anomalies
+        warmup: Readings to collect before anomalies are reported
+    """
+
+    def __init__(self, frost_temp=FROST_TEMP, heat_temp=HEAT_TEMP, horizon_s=HORIZON_S,
+                 alpha=0.1, trend_tau_s=600, z_limit=3.0, warmup=10):
+        self.frost_temp = frost_temp
+        self.heat_temp = heat_temp
+        self.horizon_s = horizon_s
+        self.z_limit = z_limit
+        self.warmup = warmup
+        self.stats = RunningStats()
+        self.recent = EWStats(alpha)
+        self.trend = Trend(trend_tau_s)
+        self.projected = None
+        self.frost_active = False
+        self.heat_active = False
+
+    def update(self, timestamp, temp):
+        """Add a reading and return a list of new alerts (often empty).
+
+        Each alert is a dict with 'kind' ('frost', 'heat' or 'anomaly'),
+        'timestamp', 'temp', 'projected' and 'z'. Frost and heat alerts
+        are reported once when the risk starts, not on every reading.
+        """
+        if _is_missing(temp):
+            return []
+        ready = self.recent.count >= self.warmup
+        z = self.recent.add(temp)
+        self.stats.add(temp)
+        slope = self.trend.add(timestamp, temp)
+        self.projected = self.recent.mean + slope * self.horizon_s
+
+        alerts = []
+        frost = self.projected <= self.frost_temp
+        heat = self.projected >= self.heat_temp
+        if frost and not self.frost_active:
+            alerts.append(self._alert('frost', timestamp, temp, z))
+        if heat and not self.heat_active:
+            alerts.append(self._alert('heat', timestamp, temp, z))
+        if ready and abs(z) > self.z_limit:
+            alerts.append(self._alert('anomaly', timestamp, temp, z))
+        self.frost_active = frost
+        self.heat_active = heat
+        return alerts
+
+    def _alert(self, kind, timestamp, temp, z):
+        return {'kind': kind, 'timestamp': timestamp, 'temp': temp,
+                'projected': self.projected, 'z': z}
+
+
+def describe_alert(alert):
+    """Short learner-friendly message for an alert."""
+    if alert['kind'] == 'frost':
+        return f"❄️ FROST WARNING: temperature heading for {alert['projected']:.1f}°C. Cover the seedlings!"
+    if alert['kind'] == 'heat':
+        return f"🔥 HEAT WARNING: temperature heading for {alert['projected']:.1f}°C. Water and shade the plants!"
+    return f"❓ Unusual reading {alert['temp']}°C (z = {alert['z']:.1f}). Check the sensor."
+
+
+# ========== HOST-SIDE BATCH VERSION (needs NumPy) ==========
+
+# Largest drop in log(weight) inside one block, keeps exp() within float64 range
+_BLOCK_LOG_LIMIT = 600.0
+
+
+def _ewma(values, decay, initial):
+    """y[t] = decay[t] * y[t-1] + (1 - decay[t]) * values[t], starting from `initial`.
+
+    `decay` may be one number or one per value. The recurrence is solved
+    in closed form with cumulative sums, block by block, so the Python
+    loop runs once per block (usually a handful) instead of per sample.
+    """
+    import numpy as np
+
+    values = np.asarray(values, dtype=np.float64)
+    decay = np.broadcast_to(np.asarray(decay, dtype=np.float64), values.shape)
+    size = len(values)
+    out = np.empty(size, dtype=np.float64)
+    if size and not decay.any():
+        out[:] = values  # No memory at all
+        return out
+
+    # exp(-50) is already far below float precision, so clamp to keep blocks long
+    log_decay = np.maximum(np.log(np.maximum(decay, 1e-300)), -50.0)
+    cumulative = -np.cumsum(log_decay)  # Rising
+    y = initial
+    start = 0
+    while start < size:
+        base = cumulative[start - 1] if start else 0.0
+        end = int(np.searchsorted(cumulative, base + _BLOCK_LOG_LIMIT, side='right'))
+        end = max(end, start + 1)
+        weights = np.exp(base - cumulative[start:end])  # Product of decays so far
+        terms = (1.0 - decay[start:end]) * values[start:end] / weights
+        chunk = weights * (y + np.cumsum(terms))
+        out[start:end] = chunk
+        y = chunk[-1]
+        start = end
+    return out
+
+
+def watch_array(timestamps, temps, frost_temp=FROST_TEMP, heat_temp=HEAT_TEMP,
+                horizon_s=HORIZON_S, alpha=0.1, trend_tau_s=600, z_limit=3.0, warmup=10):
+    """Vectorised TemperatureWatch for logged data (same results, same arguments).
+
+    Args:
+        timestamps: Reading times in seconds
+        temps: Temperatures (NaN = missing, skipped like the streaming version)
+
+    Returns:
+        dict of NumPy arrays, one value per reading:
+        'mean', 'variance', 'trend', 'projected', 'z' (NaN for missing
+        readings) and the boolean alert arrays 'frost', 'heat', 'anomaly'
+        (True where TemperatureWatch.update() would report that alert)
+    """
+    import numpy as np
+
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    temps = np.asarray(temps, dtype=np.float64)
+    size = len(temps)
+    valid = ~np.isnan(temps)
+    t = timestamps[valid]
+    x = temps[valid]
+    n = len(x)
+
+    mean = np.zeros(n)
+    variance = np.zeros(n)
+    trend = np.zeros(n)
+    z = np.zeros(n)
+    if n:
+        mean[0] = x[0]
+        if n > 1:
+            mean[1:] = _ewma(x[1:], 1 - alpha, x[0])
+            diff = x[1:] - mean[:-1]
+            variance[1:] = _ewma((1 - alpha) * diff * diff, 1 - alpha, 0.0)
+            prev_var = variance[:-1]
+            safe = prev_var > 0
+            z[1:][safe] = diff[safe] / np.sqrt(prev_var[safe])
+
+            dt = np.diff(t)
+            dx = np.diff(x)
+            slope = np.zeros(n - 1)
+            moving = dt > 0
+            slope[moving] = dx[moving] / dt[moving]
+            # No time passed = no update, just like Trend.add()
+            trend[1:] = _ewma(slope, np.exp(-np.maximum(dt, 0) / trend_tau_s), 0.0)
+    projected = mean + trend * horizon_s
+
+    frost_risk = projected <= frost_temp
+    heat_risk = projected >= heat_temp
+    frost = frost_risk & ~np.concatenate(([False], frost_risk[:-1]))
+    heat = heat_risk & ~np.concatenate(([False], heat_risk[:-1]))
+    anomaly = (np.arange(n) >= warmup) & (np.abs(z) > z_limit)
+
+    def expand(values, fill):
+        full = np.full(size, fill, dtype=values.dtype)
+        full[valid] = values
+        return full
+
+    return {
+        'mean': expand(mean, np.nan),
+        'variance': expand(variance, np.nan),
+        'trend': expand(trend, np.nan),
+        'projected': expand(projected, np.nan),
+        'z': expand(z, np.nan),
+        'frost': expand(frost, False),
+        'heat': expand(heat, False),
+        'anomaly': expand(anomaly, False),
+    }